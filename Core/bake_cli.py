@@ -0,0 +1,180 @@
+"""
+Batch bake tanpa UI untuk pre-processing di render farm.
+
+Jalankan per file shot (bisa banyak proses paralel, satu per node/core):
+
+    blender -b shot.blend --python <raha tools>/Core/bake_cli.py -- job.json
+
+atau lewat --python-expr:
+
+    blender -b shot.blend --python-expr "import sys; sys.path.append('<raha tools>'); from Core import bake_cli; bake_cli.main()" -- job.json
+
+Contoh job spec:
+
+    {
+      "scene": "Scene",                  (opsional, default scene aktif)
+      "frame_start": 1, "frame_end": 250, (opsional, default range scene)
+      "targets": [
+        {"object": "Hero_Rig", "bones": ["hand.*", "spine_01"]},
+        {"object": "Sword"}
+      ],
+      "location": true, "rotation": true, "scale": true, "custom": true,
+      "interpolation": null, "handle_type": null,
+      "clean_tolerance": null,           (angka = reduksi key RDP setelah bake)
+      "delete_constraints": false,
+      "output": "shot_baked.blend"       (opsional, default simpan ke file asal)
+    }
+
+"bones" berisi nama atau pola wildcard (fnmatch); tanpa "bones" armature
+di-bake semua bone-nya, object lain di-bake transform object-nya. Ringkasan
+hasil dicetak sebagai satu baris JSON berawalan "RAHA_BAKE ".
+"""
+
+import fnmatch
+import json
+import os
+import sys
+import types
+
+import bpy
+
+# Root folder Raha Tools supaya modul bersama (Core) bisa di-import saat file ini dijalankan sebagai script
+_RAHA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _RAHA_ROOT not in sys.path:
+    sys.path.append(_RAHA_ROOT)
+
+from Core import bake_engine, key_reduction
+from Core.fcurve_index import FCurveIndex
+
+RESULT_PREFIX = "RAHA_BAKE "
+
+
+class BakeJobError(Exception):
+    pass
+
+
+def _match_bones(pose_bones, patterns):
+    if not patterns:
+        return list(pose_bones)
+    return [pb for pb in pose_bones if any(fnmatch.fnmatchcase(pb.name, pattern) for pattern in patterns)]
+
+
+def _resolve_targets(spec):
+    targets = {}
+    for entry in spec.get("targets", []):
+        obj = bpy.data.objects.get(entry.get("object", ""))
+        if obj is None:
+            raise BakeJobError(f"Object tidak ditemukan: {entry.get('object')}")
+        if obj.type == 'ARMATURE':
+            bones = _match_bones(obj.pose.bones, entry.get("bones"))
+            if not bones:
+                raise BakeJobError(f"Tidak ada bone yang cocok di {obj.name}: {entry.get('bones')}")
+            existing = targets.setdefault(obj, [])
+            existing.extend(pb for pb in bones if pb not in existing)
+        else:
+            targets[obj] = None
+    if not targets:
+        raise BakeJobError("Job spec tidak punya target")
+    return targets
+
+
+def _job_context(spec):
+    """Pengganti bpy.context untuk bake_engine (scene dan depsgraph-nya)."""
+    name = spec.get("scene")
+    if not name:
+        return bpy.context
+    scene = bpy.data.scenes.get(name)
+    if scene is None:
+        raise BakeJobError(f"Scene tidak ditemukan: {name}")
+    view_layer = scene.view_layers[0]
+    return types.SimpleNamespace(scene=scene, evaluated_depsgraph_get=lambda: view_layer.depsgraph)
+
+
+def run_job(spec):
+    """Bake satu job spec (dict) di file yang sedang terbuka. Kembalikan ringkasan hasil."""
+    context = _job_context(spec)
+    scene = context.scene
+    frame_start = int(spec.get("frame_start", scene.frame_start))
+    frame_end = int(spec.get("frame_end", scene.frame_end))
+    if frame_end < frame_start:
+        raise BakeJobError(f"Frame range tidak valid: {frame_start}-{frame_end}")
+
+    targets = _resolve_targets(spec)
+    options = dict(location=spec.get("location", True), rotation=spec.get("rotation", True),
+                   scale=spec.get("scale", True), custom=spec.get("custom", True),
+                   interpolation=spec.get("interpolation"), handle_type=spec.get("handle_type"))
+    tolerance = spec.get("clean_tolerance")
+
+    keep = {}
+    if tolerance is not None:
+        # Key asli tetap dipertahankan saat reduksi, sama seperti Auto Clean di Smart Bake
+        for obj, bones in targets.items():
+            index = FCurveIndex.from_object(obj)
+            for name in ([pb.name for pb in bones] if bones is not None else [None]):
+                keep[(obj.name, name)] = index.bone_frames(name).tolist()
+
+    samples = bake_engine.sample(context, {obj: [pb.name for pb in bones] if bones is not None else None
+                                           for obj, bones in targets.items()},
+                                 frame_start, frame_end, custom_props=options["custom"])
+
+    written = removed = 0
+    for obj, bones in targets.items():
+        if bones is None:
+            written += bake_engine.write_object_keys(obj, samples[obj], **options)
+            owners = [(None, obj)]
+        else:
+            for pb in bones:
+                written += bake_engine.write_bone_keys(obj, samples[obj], pb, **options)
+            owners = [(pb.name, pb) for pb in bones]
+
+        for name, owner in owners:
+            if tolerance is not None:
+                # Hanya channel yang ikut di-bake; key channel lain tidak disentuh
+                props = bake_engine.baked_props(samples[obj], name, owner.rotation_mode,
+                                                location=options["location"], rotation=options["rotation"],
+                                                scale=options["scale"], custom=options["custom"])
+                removed += key_reduction.reduce_bone(obj, name, frame_start, frame_end, float(tolerance),
+                                                     props=props, keep_frames=keep.get((obj.name, name)))
+            if spec.get("delete_constraints"):
+                for constraint in reversed(owner.constraints):
+                    owner.constraints.remove(constraint)
+
+    return {
+        "frames": [frame_start, frame_end],
+        "targets": {obj.name: (len(bones) if bones is not None else 0) for obj, bones in targets.items()},
+        "keys_written": written,
+        "keys_removed": removed,
+    }
+
+
+def _spec_path(argv):
+    args = argv[argv.index("--") + 1:] if "--" in argv else []
+    if not args:
+        raise BakeJobError("Pakai: blender -b file.blend --python bake_cli.py -- job.json")
+    return args[0]
+
+
+def main(argv=None):
+    argv = sys.argv if argv is None else argv
+    try:
+        spec_path = _spec_path(argv)
+        with open(spec_path, "r") as f:
+            spec = json.load(f)
+        result = run_job(spec)
+        output = spec.get("output")
+        if output:
+            # Path relatif (atau //) dihitung dari folder file .blend
+            output = bpy.path.abspath(output if output.startswith("//") or os.path.isabs(output) else "//" + output)
+            bpy.ops.wm.save_as_mainfile(filepath=output, copy=True)
+        else:
+            bpy.ops.wm.save_mainfile()
+        result.update(status="DONE", blend=bpy.data.filepath, output=output or bpy.data.filepath)
+        print(RESULT_PREFIX + json.dumps(result), flush=True)
+    except (BakeJobError, OSError, ValueError) as e:
+        print(RESULT_PREFIX + json.dumps({"status": "FAILED", "blend": bpy.data.filepath, "error": str(e)}),
+              flush=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
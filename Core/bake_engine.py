@@ -0,0 +1,358 @@
+"""
+Bake visual transform bone/object dalam satu sweep frame.
+
+Bake lama mengulang bone di luar dan frame di dalam (frame_set berkali-kali
+per bone per frame). Di sini setiap frame hanya di-evaluasi sekali untuk
+semua target (beberapa armature dan object sekaligus): matrix pose semua
+bone dibaca dari depsgraph lewat foreach_get, matrix object dari object
+ter-evaluasi, lalu dikonversi ke matrix lokal (basis). Tidak ada pergantian
+mode. Penulisan key dilakukan setelah sweep selesai, per action target.
+"""
+
+import mathutils
+import numpy as np
+
+from Core import fcurve_writer, sample_cache
+
+# Nama group F-Curve transform object (sama seperti keyframe_insert Blender)
+OBJECT_GROUP = "Object Transforms"
+
+
+class BakeSamples:
+    """
+    Hasil sampling satu target: frames (n,), bones (nama; [None] untuk
+    object), world & local (n frame, n bone, 4, 4), custom
+    {bone: {prop: array (n,)}} dan object_world/object_local (n, 4, 4) untuk
+    armature.
+    """
+
+    def __init__(self, frames, bones, world, local, custom, object_world=None, object_local=None):
+        self.frames = frames
+        self.bones = list(bones)
+        self.world = world
+        self.local = local
+        self.custom = custom
+        self.object_world = object_world
+        self.object_local = object_local
+        self._rows = {name: i for i, name in enumerate(self.bones)}
+
+    def row(self, bone_name):
+        return self._rows[bone_name]
+
+
+def _read_pose_matrices(pose_bones):
+    """Matrix pose (ruang armature) semua bone sebagai array (n, 4, 4) row-major."""
+    count = len(pose_bones)
+    buf = np.empty(count * 16, dtype=np.float32)
+    pose_bones.foreach_get("matrix", buf)
+    # foreach_get memberi urutan memori Blender (column-major)
+    return buf.reshape(count, 4, 4).transpose(0, 2, 1).astype(np.float64)
+
+
+def _uses_default_inherit(bone):
+    """Bone dengan inherit standar bisa dikonversi ke lokal murni lewat numpy."""
+    return bone.use_inherit_rotation and bone.inherit_scale == 'FULL' and bone.use_local_location
+
+
+def _numeric_custom_props(id_props):
+    return [prop for prop in id_props.keys()
+            if prop != "_RNA_UI" and isinstance(id_props[prop], (int, float)) and not isinstance(id_props[prop], bool)]
+
+
+class _ArmatureSampler:
+    """Sampling bone terpilih satu armature."""
+
+    def __init__(self, obj, bone_names, frame_count, custom_props):
+        self.obj = obj
+        pose_bones = obj.pose.bones
+        self.names = [name for name in bone_names if name in pose_bones]
+        index = {pb.name: i for i, pb in enumerate(pose_bones)}
+        self.rows = np.array([index[name] for name in self.names], dtype=np.int64)
+
+        # Offset rest parent -> child (konstan selama bake)
+        self.offsets = np.empty((len(self.names), 4, 4), dtype=np.float64)
+        self.parent_rows = np.full(len(self.names), -1, dtype=np.int64)
+        self.fallback = []
+        for i, name in enumerate(self.names):
+            bone = pose_bones[name].bone
+            rest = np.array(bone.matrix_local, dtype=np.float64)
+            if bone.parent:
+                self.parent_rows[i] = index[bone.parent.name]
+                self.offsets[i] = np.linalg.inv(np.array(bone.parent.matrix_local, dtype=np.float64)) @ rest
+            else:
+                self.offsets[i] = rest
+            if not _uses_default_inherit(bone):
+                self.fallback.append(i)
+        self.has_parent = self.parent_rows >= 0
+
+        # Transform object armature-nya sendiri ikut di-sample (untuk ruang pose <-> world)
+        self.transform = _ObjectSampler(obj, frame_count, False)
+        self.world = np.empty((frame_count, len(self.names), 4, 4), dtype=np.float64)
+        self.local = np.empty_like(self.world)
+        self.custom = {}
+        if custom_props:
+            for name in self.names:
+                props = _numeric_custom_props(pose_bones[name])
+                if props:
+                    self.custom[name] = {prop: np.empty(frame_count, dtype=np.float64) for prop in props}
+
+    def capture(self, f, depsgraph):
+        self.transform.capture(f, depsgraph)
+        obj_eval = self.obj.evaluated_get(depsgraph)
+        pose = _read_pose_matrices(obj_eval.pose.bones)
+        selected = pose[self.rows]
+        self.world[f] = self.transform.world[f, 0] @ selected
+
+        # basis = (pose parent @ offset rest)^-1 @ pose bone
+        parent_space = self.offsets.copy()
+        parent_space[self.has_parent] = pose[self.parent_rows[self.has_parent]] @ self.offsets[self.has_parent]
+        self.local[f] = np.linalg.solve(parent_space, selected)
+
+        pose_bones = self.obj.pose.bones
+        for i in self.fallback:
+            matrix = self.obj.convert_space(pose_bone=pose_bones[self.names[i]],
+                                            matrix=mathutils.Matrix(selected[i].tolist()),
+                                            from_space='POSE', to_space='LOCAL')
+            self.local[f, i] = np.array(matrix, dtype=np.float64)
+
+        for name, props in self.custom.items():
+            pose_bone = pose_bones[name]
+            for prop, values in props.items():
+                values[f] = pose_bone.get(prop, 0.0)
+
+    def load_cached(self, f, frame, rev):
+        """Isi frame dari sample_cache; False kalau ada bone yang belum ter-cache."""
+        if self.custom or not self.transform.load_cached(f, frame, rev):
+            return False
+        hits = [sample_cache.lookup(self.obj, name, frame, rev) for name in self.names]
+        if any(hit is None for hit in hits):
+            return False
+        for i, (world, local) in enumerate(hits):
+            self.world[f, i] = world
+            self.local[f, i] = local
+        return True
+
+    def store_cached(self, f, frame, rev):
+        self.transform.store_cached(f, frame, rev)
+        for i, name in enumerate(self.names):
+            sample_cache.store(self.obj, name, frame, self.world[f, i], self.local[f, i], rev)
+
+    def result(self, frames):
+        return BakeSamples(frames, self.names, self.world, self.local, self.custom,
+                           self.transform.world[:, 0], self.transform.local[:, 0])
+
+
+class _ObjectSampler:
+    """Sampling transform object (bukan bone)."""
+
+    def __init__(self, obj, frame_count, custom_props):
+        self.obj = obj
+        self.world = np.empty((frame_count, 1, 4, 4), dtype=np.float64)
+        self.local = np.empty_like(self.world)
+        props = _numeric_custom_props(obj) if custom_props else []
+        self.custom = {None: {prop: np.empty(frame_count, dtype=np.float64) for prop in props}} if props else {}
+
+    def capture(self, f, depsgraph):
+        obj = self.obj
+        world = np.array(obj.evaluated_get(depsgraph).matrix_world, dtype=np.float64)
+        self.world[f, 0] = world
+        if obj.parent is None:
+            self.local[f, 0] = world
+        elif obj.parent_type == 'OBJECT':
+            parent_world = np.array(obj.parent.evaluated_get(depsgraph).matrix_world, dtype=np.float64)
+            parent_space = parent_world @ np.array(obj.matrix_parent_inverse, dtype=np.float64)
+            self.local[f, 0] = np.linalg.solve(parent_space, world)
+        else:
+            # Parent ke bone/vertex: serahkan konversi ke Blender
+            matrix = obj.convert_space(matrix=mathutils.Matrix(world.tolist()), from_space='WORLD', to_space='LOCAL')
+            self.local[f, 0] = np.array(matrix, dtype=np.float64)
+
+        for prop, values in self.custom.get(None, {}).items():
+            values[f] = obj.get(prop, 0.0)
+
+    def load_cached(self, f, frame, rev):
+        hit = None if self.custom else sample_cache.lookup(self.obj, None, frame, rev)
+        if hit is None:
+            return False
+        self.world[f, 0], self.local[f, 0] = hit
+        return True
+
+    def store_cached(self, f, frame, rev):
+        sample_cache.store(self.obj, None, frame, self.world[f, 0], self.local[f, 0], rev)
+
+    def result(self, frames):
+        return BakeSamples(frames, [None], self.world, self.local, self.custom)
+
+
+def sample(context, targets, frame_start, frame_end, custom_props=False):
+    """
+    Sampling transform visual (constraint, driver, parent ikut) banyak target
+    sekaligus. targets: {object: list nama bone} untuk armature, atau
+    {object: None} untuk transform object. Satu scene.frame_set() per frame
+    untuk seluruh target, dan frame yang sudah ada di sample_cache dilewati;
+    frame scene dikembalikan seperti semula. Kembalikan {object: BakeSamples}.
+    """
+    frames = np.arange(frame_start, frame_end + 1, dtype=np.int64)
+    return sample_frames(context, targets, frames, custom_props)
+
+
+def sample_frames(context, targets, frames, custom_props=False):
+    """Seperti sample(), tapi hanya di frame tertentu (mis. frame switch), urut naik."""
+    scene = context.scene
+    frames = np.unique(np.asarray(frames, dtype=np.int64))
+    samplers = {}
+    for obj, bone_names in targets.items():
+        if bone_names is None:
+            samplers[obj] = _ObjectSampler(obj, len(frames), custom_props)
+        else:
+            samplers[obj] = _ArmatureSampler(obj, bone_names, len(frames), custom_props)
+
+    # Frame yang semua targetnya sudah ada di sample_cache tidak perlu di-evaluasi lagi
+    revisions = {obj: sample_cache.revision(obj) for obj in samplers}
+    pending = [(f, frame) for f, frame in enumerate(frames)
+               if not all([sampler.load_cached(f, frame, revisions[obj]) for obj, sampler in samplers.items()])]
+
+    if pending:
+        original_frame = scene.frame_current
+        with sample_cache.suspended():
+            try:
+                for f, frame in pending:
+                    scene.frame_set(int(frame))
+                    depsgraph = context.evaluated_depsgraph_get()
+                    for obj, sampler in samplers.items():
+                        sampler.capture(f, depsgraph)
+                        sampler.store_cached(f, frame, revisions[obj])
+            finally:
+                scene.frame_set(original_frame)
+
+    return {obj: sampler.result(frames) for obj, sampler in samplers.items()}
+
+
+def sample_bones(context, obj, bone_names, frame_start, frame_end, custom_props=False):
+    """sample() untuk bone satu armature saja."""
+    return sample(context, {obj: list(bone_names)}, frame_start, frame_end, custom_props)[obj]
+
+
+def current_samples(context, obj, bone_names):
+    """
+    BakeSamples satu frame dari pose saat ini (termasuk edit yang belum
+    di-key), tanpa frame_set dan tanpa sample_cache.
+    """
+    sampler = _ArmatureSampler(obj, list(bone_names), 1, False)
+    sampler.capture(0, context.evaluated_depsgraph_get())
+    return sampler.result(np.array([context.scene.frame_current], dtype=np.int64))
+
+
+def decompose(samples, bone_name, rotation_mode='QUATERNION'):
+    """
+    Pecah matrix lokal satu bone jadi array location (n, 3), rotation_quaternion
+    (n, 4), rotation_euler (n, 3) dan scale (n, 3). Tanda quaternion dan euler
+    dijaga kontinu antar frame supaya interpolasi tidak flip.
+    """
+    row = samples.row(bone_name)
+    count = len(samples.frames)
+    location = np.empty((count, 3), dtype=np.float64)
+    quaternion = np.empty((count, 4), dtype=np.float64)
+    euler = np.empty((count, 3), dtype=np.float64)
+    scale = np.empty((count, 3), dtype=np.float64)
+
+    euler_order = rotation_mode if rotation_mode not in ('QUATERNION', 'AXIS_ANGLE') else 'XYZ'
+    prev_quat = None
+    prev_euler = None
+    for f in range(count):
+        loc, quat, scl = mathutils.Matrix(samples.local[f, row].tolist()).decompose()
+        if prev_quat is not None and prev_quat.dot(quat) < 0.0:
+            quat.negate()
+        eul = quat.to_euler(euler_order, prev_euler) if prev_euler is not None else quat.to_euler(euler_order)
+        location[f] = loc
+        quaternion[f] = quat
+        euler[f] = eul
+        scale[f] = scl
+        prev_quat, prev_euler = quat, eul
+
+    return {
+        "location": location,
+        "rotation_quaternion": quaternion,
+        "rotation_euler": euler,
+        "scale": scale,
+    }
+
+
+#============================== WRITE ==============================
+def rotation_property(rotation_mode):
+    """Property rotasi yang dipakai bone untuk rotation_mode tersebut."""
+    if rotation_mode == 'QUATERNION':
+        return "rotation_quaternion"
+    if rotation_mode == 'AXIS_ANGLE':
+        return "rotation_axis_angle"
+    return "rotation_euler"
+
+
+def baked_props(samples, name, rotation_mode, location=True, rotation=True, scale=True, custom=True):
+    """Property (nama seperti di FCurveIndex) yang ditulis write_bone_keys / write_object_keys."""
+    props = []
+    if location:
+        props.append("location")
+    if rotation:
+        props.append(rotation_property(rotation_mode))
+    if scale:
+        props.append("scale")
+    if custom:
+        props.extend(f'["{prop}"]' for prop in samples.custom.get(name, {}))
+    return props
+
+
+def _axis_angle(quaternion):
+    """Quaternion (n, 4) -> axis angle Blender (n, 4): angle, x, y, z."""
+    quaternion = quaternion * np.where(quaternion[:, :1] < 0.0, -1.0, 1.0)
+    angle = 2.0 * np.arccos(np.clip(quaternion[:, 0], -1.0, 1.0))
+    sin_half = np.sqrt(np.maximum(1.0 - quaternion[:, 0] ** 2, 0.0))
+    axis = np.where(sin_half[:, None] > 1e-6, quaternion[:, 1:] / np.maximum(sin_half, 1e-6)[:, None], [0.0, 1.0, 0.0])
+    return np.column_stack((angle, axis))
+
+
+def _write_transform(obj, samples, name, rotation_mode, path_prefix, group_name,
+                     location, rotation, scale, custom, interpolation, handle_type):
+    channels = decompose(samples, name, rotation_mode)
+    rotation_prop = rotation_property(rotation_mode)
+    if rotation_prop == "rotation_axis_angle":
+        channels[rotation_prop] = _axis_angle(channels["rotation_quaternion"])
+
+    props = baked_props(samples, name, rotation_mode, location, rotation, scale, custom=False)
+
+    action = fcurve_writer.ensure_action(obj)
+    frames = samples.frames.astype(np.float32)
+    options = dict(interpolation=interpolation, handle_type=handle_type, replace_range=True)
+    separator = "." if path_prefix else ""
+    written = 0
+    for prop in props:
+        values = channels[prop]
+        for index in range(values.shape[1]):
+            written += fcurve_writer.write_channel(action, f"{path_prefix}{separator}{prop}", index, frames,
+                                                   values[:, index], group_name=group_name, **options)
+    if custom:
+        for prop, values in samples.custom.get(name, {}).items():
+            written += fcurve_writer.write_channel(action, f'{path_prefix}["{prop}"]', 0, frames, values,
+                                                   group_name=group_name, **options)
+    # Animasi berubah: sample lama (termasuk bone/object yang bergantung) sudah basi
+    sample_cache.invalidate()
+    return written
+
+
+def write_bone_keys(obj, samples, pose_bone, location=True, rotation=True, scale=True, custom=True,
+                    interpolation=None, handle_type=None):
+    """
+    Tulis hasil bake satu bone lewat fcurve_writer (keyframe_points.add +
+    foreach_set), key lama di dalam range diganti. Hanya channel rotasi yang
+    sesuai rotation_mode bone yang ditulis. Kembalikan jumlah key.
+    """
+    return _write_transform(obj, samples, pose_bone.name, pose_bone.rotation_mode,
+                            f'pose.bones["{pose_bone.name}"]', pose_bone.name,
+                            location, rotation, scale, custom, interpolation, handle_type)
+
+
+def write_object_keys(obj, samples, location=True, rotation=True, scale=True, custom=True,
+                      interpolation=None, handle_type=None):
+    """Seperti write_bone_keys, untuk transform object ke action object itu sendiri."""
+    return _write_transform(obj, samples, None, obj.rotation_mode, "", OBJECT_GROUP,
+                            location, rotation, scale, custom, interpolation, handle_type)
@@ -0,0 +1,76 @@
+"""
+Snapshot / restore visibilitas bone dan bone collection secara batch.
+
+Dipakai hanya di jalur yang masih butuh operator (script clip .py lama yang
+memanggil bpy.ops.anim.keyframe_insert, yang butuh bone terlihat). Status
+hide dibaca dan ditulis sekali lewat foreach_get/foreach_set, dan kalau
+tidak ada yang tersembunyi rig tidak disentuh sama sekali (tidak ada redraw
+atau depsgraph tag tambahan).
+"""
+
+from contextlib import contextmanager
+
+import numpy as np
+
+
+def _bone_collections(arm):
+    # Blender 4.x: collections_all termasuk collection anak
+    if hasattr(arm, "collections_all"):
+        return arm.collections_all
+    return getattr(arm, "collections", None)
+
+
+def _read_flags(collection, attr):
+    flags = np.empty(len(collection), dtype=bool)
+    collection.foreach_get(attr, flags)
+    return flags
+
+
+def snapshot(arm):
+    """Kembalikan (bone_hide, collection_visible) atau None kalau semua terlihat."""
+    bone_hide = _read_flags(arm.bones, "hide")
+    collections = _bone_collections(arm)
+    coll_visible = _read_flags(collections, "is_visible") if collections is not None else None
+
+    if not bone_hide.any() and (coll_visible is None or coll_visible.all()):
+        return None
+    return bone_hide, coll_visible
+
+
+def reveal(arm, state):
+    """Tampilkan semua bone/collection yang tersembunyi menurut snapshot."""
+    if state is None:
+        return
+    bone_hide, coll_visible = state
+    if bone_hide.any():
+        arm.bones.foreach_set("hide", np.zeros(len(bone_hide), dtype=bool))
+    if coll_visible is not None and not coll_visible.all():
+        _bone_collections(arm).foreach_set("is_visible", np.ones(len(coll_visible), dtype=bool))
+
+
+def restore(arm, state):
+    """Kembalikan status hide persis seperti saat snapshot."""
+    if state is None:
+        return
+    bone_hide, coll_visible = state
+    # Bone/collection baru yang dibuat script tidak ada di snapshot: biarkan
+    if bone_hide.any() and len(arm.bones) == len(bone_hide):
+        arm.bones.foreach_set("hide", bone_hide)
+    collections = _bone_collections(arm)
+    if coll_visible is not None and not coll_visible.all() and len(collections) == len(coll_visible):
+        collections.foreach_set("is_visible", coll_visible)
+
+
+@contextmanager
+def revealed(arm):
+    """
+    with revealed(armature.data):
+        ...  # semua bone terlihat di sini
+    Status visibilitas dipulihkan juga kalau terjadi error.
+    """
+    state = snapshot(arm)
+    reveal(arm, state)
+    try:
+        yield
+    finally:
+        restore(arm, state)
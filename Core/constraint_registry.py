@@ -0,0 +1,179 @@
+"""
+Index constraint per nama untuk tombol parent (enable/disable/fix switch)
+dan panel Child-Of.
+
+Pencarian lama menyisir semua pose bone semua armature di bpy.data.objects
+setiap klik. Di sini satu pass membangun nama -> [(object, bone / None)]
+dan dipakai ulang sampai ada perubahan. Entry disimpan sebagai nama
+(bukan referensi bpy) lalu di-resolve lewat lookup nama, jadi referensi yang
+basi setelah undo / hapus tidak pernah dipakai; entry yang tidak lagi cocok,
+atau object aktif yang punya constraint tapi belum ter-index, memicu rebuild.
+
+Index dibuang oleh depsgraph_update_post saat object berubah di frame yang
+sama (tambah / hapus / rename constraint terjadi saat edit, bukan saat
+playback atau scrub), dan saat load file.
+"""
+
+from collections import defaultdict
+
+import bpy
+
+# nama constraint -> [(nama object, nama bone / None)]
+_index = None
+# (nama object, nama bone / None) -> tuple nama constraint CHILD_OF
+_child_of = {}
+_frame = None
+_users = 0
+
+
+def invalidate():
+    global _index
+    _index = None
+    _child_of.clear()
+
+
+def _build():
+    global _index
+    if _index is None:
+        _index = defaultdict(list)
+        for obj in bpy.data.objects:
+            for constraint in obj.constraints:
+                _index[constraint.name].append((obj.name, None))
+            if obj.type == 'ARMATURE' and obj.pose:
+                for pose_bone in obj.pose.bones:
+                    for constraint in pose_bone.constraints:
+                        _index[constraint.name].append((obj.name, pose_bone.name))
+    return _index
+
+
+def _resolve(name, obj_name, bone_name):
+    """(constraint, owner, 'BONE'/'OBJECT', object) atau None kalau entry sudah basi."""
+    obj = bpy.data.objects.get(obj_name)
+    if obj is None:
+        return None
+    if bone_name is None:
+        owner = obj
+    else:
+        owner = obj.pose.bones.get(bone_name) if obj.pose else None
+        if owner is None:
+            return None
+    constraint = owner.constraints.get(name)
+    if constraint is None:
+        return None
+    return constraint, owner, 'BONE' if bone_name is not None else 'OBJECT', obj
+
+
+def _search(name, bones, preferred):
+    """Entry bone (bones=True) atau object; entry milik object preferred didahulukan."""
+    entries = [entry for entry in _build().get(name, ()) if (entry[1] is not None) == bones]
+    if not entries:
+        return None
+    # None kalau entry teratas sudah basi (dihapus / di-rename)
+    obj_name, bone_name = min(entries, key=lambda entry: entry[0] != preferred)
+    return _resolve(name, obj_name, bone_name)
+
+
+def _unindexed(name, bones, preferred, hit):
+    """True kalau object preferred punya constraint name tapi hit bukan miliknya (index belum tahu)."""
+    if preferred is None or (hit is not None and hit[3].name == preferred):
+        return False
+    obj = bpy.data.objects.get(preferred)
+    if obj is None:
+        return False
+    if not bones:
+        return obj.constraints.get(name) is not None
+    return bool(obj.pose) and any(pose_bone.constraints.get(name) for pose_bone in obj.pose.bones)
+
+
+def _lookup(name, bones, preferred):
+    fresh = _index is None
+    hit = _search(name, bones, preferred)
+    if not fresh and (hit is None or _unindexed(name, bones, preferred, hit)):
+        # Entry basi atau constraint baru yang belum ter-index: bangun ulang sekali
+        invalidate()
+        hit = _search(name, bones, preferred)
+    return hit
+
+
+def find(name, context):
+    """
+    Constraint bernama name dengan prioritas yang sama seperti pencarian
+    lama: di Pose Mode bone aktif, bone armature aktif, bone armature lain;
+    lalu object aktif dan object lain. Kembalikan (constraint, owner,
+    'BONE'/'OBJECT', object), atau empat None.
+    """
+    obj = context.object
+    preferred = obj.name if obj else None
+    if context.mode == 'POSE':
+        active_pb = context.active_pose_bone
+        if active_pb:
+            constraint = active_pb.constraints.get(name)
+            if constraint:
+                return constraint, active_pb, 'BONE', active_pb.id_data
+        hit = _lookup(name, True, preferred)
+        if hit:
+            return hit
+    if obj:
+        constraint = obj.constraints.get(name)
+        if constraint:
+            return constraint, obj, 'OBJECT', obj
+    return _lookup(name, False, preferred) or (None, None, None, None)
+
+
+def child_of(owner):
+    """Constraint CHILD_OF milik object / pose bone, urut seperti stack constraint."""
+    if isinstance(owner, bpy.types.PoseBone):
+        key = (owner.id_data.name, owner.name)
+    else:
+        key = (owner.name, None)
+    names = _child_of.get(key)
+    if names is not None:
+        constraints = [owner.constraints.get(name) for name in names]
+        if None not in constraints:
+            return constraints
+    constraints = [c for c in owner.constraints if c.type == 'CHILD_OF']
+    _child_of[key] = tuple(c.name for c in constraints)
+    return constraints
+
+
+#============================== HANDLERS ==============================
+@bpy.app.handlers.persistent
+def _on_depsgraph_update(scene, depsgraph):
+    global _frame
+    # Update karena ganti frame (playback, scrub, sweep bake) tidak mengubah constraint
+    if scene.frame_current != _frame:
+        _frame = scene.frame_current
+        return
+    if _index is None and not _child_of:
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object):
+            invalidate()
+            return
+
+
+@bpy.app.handlers.persistent
+def _on_load(*_args):
+    invalidate()
+
+
+def register():
+    """Dipanggil oleh setiap modul pemakai; handler hanya dipasang sekali."""
+    global _users
+    _users += 1
+    if _on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    if _on_load not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load)
+
+
+def unregister():
+    global _users
+    _users = max(_users - 1, 0)
+    if _users:
+        return
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load)
+    invalidate()
@@ -0,0 +1,107 @@
+"""
+Index F-Curve satu kali jalan untuk sebuah action.
+
+Setiap data_path di-parse sekali menjadi (bone, property, array_index),
+sehingga operator tidak perlu lagi memindai action.fcurves per bone dengan
+pencocokan prefix string. Array keyframe (foreach_get "co") juga di-cache per
+F-Curve selama index dipakai dalam satu operasi.
+"""
+
+import re
+
+import numpy as np
+
+_BONE_PATH_RE = re.compile(r'^pose\.bones\["((?:[^"\\]|\\.)*)"\](.*)$')
+
+
+def parse_data_path(data_path):
+    """
+    'pose.bones["Hand"].location'  -> ("Hand", "location")
+    'pose.bones["Hand"]["ik_fk"]'  -> ("Hand", '["ik_fk"]')
+    'location' (object)            -> (None, "location")
+    """
+    match = _BONE_PATH_RE.match(data_path)
+    if not match:
+        return None, data_path
+    bone_name = match.group(1).replace('\\"', '"').replace('\\\\', '\\')
+    prop = match.group(2)
+    if prop.startswith("."):
+        prop = prop[1:]
+    return bone_name, prop
+
+
+def is_custom_prop(prop):
+    return prop.startswith('["')
+
+
+class FCurveIndex:
+    """Peta bone -> property -> {array_index: fcurve} untuk satu action."""
+
+    def __init__(self, action):
+        self.action = action
+        self.bones = {}
+        self._keys = {}
+        if action is None:
+            return
+        for fcurve in action.fcurves:
+            bone_name, prop = parse_data_path(fcurve.data_path)
+            props = self.bones.setdefault(bone_name, {})
+            props.setdefault(prop, {})[fcurve.array_index] = fcurve
+
+    @classmethod
+    def from_object(cls, obj):
+        anim_data = getattr(obj, "animation_data", None)
+        return cls(anim_data.action if anim_data else None)
+
+    def __bool__(self):
+        return bool(self.bones)
+
+    def channels(self, bone_name):
+        """Dict property -> {array_index: fcurve} untuk satu bone (None = object)."""
+        return self.bones.get(bone_name, {})
+
+    def fcurves(self, bone_name, props=None, custom=True):
+        """Yield (prop, array_index, fcurve) untuk satu bone."""
+        for prop, by_index in self.channels(bone_name).items():
+            if props is not None and prop not in props:
+                continue
+            if not custom and is_custom_prop(prop):
+                continue
+            for array_index, fcurve in by_index.items():
+                yield prop, array_index, fcurve
+
+    def get(self, bone_name, prop, array_index=0):
+        return self.channels(bone_name).get(prop, {}).get(array_index)
+
+    def keys(self, fcurve):
+        """Array (n, 2) frame/value, dibaca sekali per F-Curve lewat foreach_get."""
+        keys = self._keys.get(fcurve)
+        if keys is None:
+            points = fcurve.keyframe_points
+            keys = np.empty(len(points) * 2, dtype=np.float32)
+            points.foreach_get("co", keys)
+            keys = keys.reshape(-1, 2)
+            self._keys[fcurve] = keys
+        return keys
+
+    def refresh_keys(self, fcurve=None):
+        """Buang cache keyframe setelah F-Curve diubah."""
+        if fcurve is None:
+            self._keys.clear()
+        else:
+            self._keys.pop(fcurve, None)
+
+    def bone_frames(self, bone_name, props=None, custom=True):
+        """Frame (int, terurut, unik) yang punya keyframe pada bone tersebut."""
+        arrays = [self.keys(fc)[:, 0] for _, _, fc in self.fcurves(bone_name, props, custom)]
+        if not arrays:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(arrays).astype(np.int64))
+
+    def all_frames(self):
+        """Frame (int, terurut, unik) dari seluruh F-Curve di action."""
+        arrays = [self.keys(fc)[:, 0] for props in self.bones.values()
+                  for by_index in props.values() for fc in by_index.values()]
+        if not arrays:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(arrays).astype(np.int64))
@@ -0,0 +1,167 @@
+"""
+Penulisan keyframe F-Curve secara massal.
+
+Semua key ditulis lewat keyframe_points.add() + foreach_set(), jadi tidak ada
+scene.frame_set() maupun keyframe_insert() per frame. Key lama di frame yang
+sama diganti, key lain tetap dipertahankan (interpolasi & handle ikut).
+"""
+
+import bpy
+import numpy as np
+
+# Nilai integer enum keyframe Blender (urutan enum di RNA)
+INTERPOLATION_IDS = {
+    'CONSTANT': 0, 'LINEAR': 1, 'BEZIER': 2, 'SINE': 3, 'QUAD': 4, 'CUBIC': 5,
+    'QUART': 6, 'QUINT': 7, 'EXPO': 8, 'CIRC': 9, 'BACK': 10, 'BOUNCE': 11, 'ELASTIC': 12,
+}
+HANDLE_TYPE_IDS = {'FREE': 0, 'AUTO': 1, 'VECTOR': 2, 'ALIGNED': 3, 'AUTO_CLAMPED': 4}
+
+_FRAME_EPSILON = 1e-3
+
+
+def ensure_action(id_data):
+    """Ambil action dari object, buat baru kalau belum ada."""
+    if id_data.animation_data is None:
+        id_data.animation_data_create()
+    if id_data.animation_data.action is None:
+        id_data.animation_data.action = bpy.data.actions.new(name=f"{id_data.name}Action")
+    return id_data.animation_data.action
+
+
+def ensure_fcurve(action, data_path, index=0, group_name=None):
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        fcurve = action.fcurves.new(data_path, index=index, action_group=group_name or "")
+    return fcurve
+
+
+def read_keys(fcurve):
+    """Kembalikan array (n, 2) frame/value dari semua keyframe F-Curve."""
+    points = fcurve.keyframe_points
+    co = np.empty(len(points) * 2, dtype=np.float32)
+    points.foreach_get("co", co)
+    return co.reshape(-1, 2)
+
+
+def _get_enum(points, attr, count):
+    values = np.empty(count, dtype=np.int32)
+    try:
+        points.foreach_get(attr, values)
+    except (TypeError, RuntimeError):
+        names = HANDLE_TYPE_IDS if attr.startswith("handle") else INTERPOLATION_IDS
+        values[:] = [names.get(getattr(p, attr), 0) for p in points]
+    return values
+
+
+def _set_enum(points, attr, values):
+    try:
+        points.foreach_set(attr, values)
+    except (TypeError, RuntimeError):
+        names = HANDLE_TYPE_IDS if attr.startswith("handle") else INTERPOLATION_IDS
+        lookup = {v: k for k, v in names.items()}
+        for point, value in zip(points, values):
+            setattr(point, attr, lookup[int(value)])
+
+
+def write_keys(fcurve, frames, values, interpolation=None, handle_type=None, replace_range=False):
+    """
+    Tulis banyak keyframe ke satu F-Curve sekaligus.
+
+    frames/values: array 1D dengan panjang sama. interpolation/handle_type:
+    nama enum Blender; default mengikuti Preferences (sama seperti
+    keyframe_insert). replace_range=True menghapus key lama di antara frame
+    pertama dan terakhir yang ditulis.
+    """
+    frames = np.asarray(frames, dtype=np.float32).ravel()
+    values = np.asarray(values, dtype=np.float32).ravel()
+    if not len(frames):
+        return 0
+
+    # Frame ganda di data baru: pakai yang terakhir
+    order = np.argsort(frames, kind="stable")
+    frames, values = frames[order], values[order]
+    last = np.append(np.diff(frames) > _FRAME_EPSILON, True)
+    frames, values = frames[last], values[last]
+
+    if interpolation is None or handle_type is None:
+        edit_prefs = bpy.context.preferences.edit
+        interpolation = interpolation or edit_prefs.keyframe_new_interpolation_type
+        handle_type = handle_type or edit_prefs.keyframe_new_handle_type
+
+    points = fcurve.keyframe_points
+    old_count = len(points)
+    new_count = len(frames)
+
+    co_new = np.column_stack((frames, values))
+    ipo_new = np.full(new_count, INTERPOLATION_IDS[interpolation], dtype=np.int32)
+    handle_new = np.full(new_count, HANDLE_TYPE_IDS[handle_type], dtype=np.int32)
+
+    if old_count:
+        co_old = read_keys(fcurve)
+        handle_left_old = np.empty(old_count * 2, dtype=np.float32)
+        handle_right_old = np.empty(old_count * 2, dtype=np.float32)
+        points.foreach_get("handle_left", handle_left_old)
+        points.foreach_get("handle_right", handle_right_old)
+        ipo_old = _get_enum(points, "interpolation", old_count)
+        left_type_old = _get_enum(points, "handle_left_type", old_count)
+        right_type_old = _get_enum(points, "handle_right_type", old_count)
+
+        # Key lama yang tidak tertimpa frame baru
+        pos = np.clip(np.searchsorted(frames, co_old[:, 0]), 0, new_count - 1)
+        pos_prev = np.clip(pos - 1, 0, new_count - 1)
+        near = np.minimum(np.abs(frames[pos] - co_old[:, 0]), np.abs(frames[pos_prev] - co_old[:, 0]))
+        keep = near > _FRAME_EPSILON
+        if replace_range:
+            keep &= (co_old[:, 0] < frames[0]) | (co_old[:, 0] > frames[-1])
+
+        co_all = np.concatenate((co_old[keep], co_new))
+        handle_left_all = np.concatenate((handle_left_old.reshape(-1, 2)[keep], co_new))
+        handle_right_all = np.concatenate((handle_right_old.reshape(-1, 2)[keep], co_new))
+        ipo_all = np.concatenate((ipo_old[keep], ipo_new))
+        left_type_all = np.concatenate((left_type_old[keep], handle_new))
+        right_type_all = np.concatenate((right_type_old[keep], handle_new))
+
+        order = np.argsort(co_all[:, 0], kind="stable")
+        co_all = co_all[order]
+        handle_left_all = handle_left_all[order]
+        handle_right_all = handle_right_all[order]
+        ipo_all = ipo_all[order]
+        left_type_all = left_type_all[order]
+        right_type_all = right_type_all[order]
+    else:
+        co_all = co_new
+        handle_left_all = handle_right_all = co_new
+        ipo_all = ipo_new
+        left_type_all = right_type_all = handle_new
+
+    total = len(co_all)
+    if total > old_count:
+        points.add(total - old_count)
+    else:
+        for _ in range(old_count - total):
+            points.remove(points[-1], fast=True)
+
+    points.foreach_set("co", np.ascontiguousarray(co_all, dtype=np.float32).ravel())
+    points.foreach_set("handle_left", np.ascontiguousarray(handle_left_all, dtype=np.float32).ravel())
+    points.foreach_set("handle_right", np.ascontiguousarray(handle_right_all, dtype=np.float32).ravel())
+    _set_enum(points, "interpolation", ipo_all)
+    _set_enum(points, "handle_left_type", left_type_all)
+    _set_enum(points, "handle_right_type", right_type_all)
+    fcurve.update()
+    return new_count
+
+
+def write_channel(action, data_path, index, frames, values, group_name=None, **kwargs):
+    """Shortcut: cari/buat F-Curve lalu tulis key secara massal."""
+    fcurve = ensure_fcurve(action, data_path, index, group_name)
+    return write_keys(fcurve, frames, values, **kwargs)
+
+
+def write_array(action, data_path, frames, values, group_name=None, **kwargs):
+    """
+    Tulis property array (location, rotation, scale, ...) sekaligus: values
+    (n frame, ukuran array), satu F-Curve per kolom. Kembalikan jumlah key.
+    """
+    values = np.asarray(values, dtype=np.float32).reshape(len(frames), -1)
+    return sum(write_channel(action, data_path, index, frames, values[:, index], group_name=group_name, **kwargs)
+               for index in range(values.shape[1]))
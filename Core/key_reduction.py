@@ -0,0 +1,92 @@
+"""
+Reduksi keyframe hasil bake (Ramer-Douglas-Peucker) di array numpy.
+
+Komponen satu property (mis. rotation_quaternion w/x/y/z) direduksi bersama,
+jadi frame yang dipertahankan selalu sama untuk semua komponen dan vektor
+tidak pernah ter-key sebagian. Error diukur sebagai selisih nilai (bukan
+jarak tegak lurus) terhadap interpolasi linear antar key yang tersisa, jadi
+key yang dipertahankan ditulis LINEAR supaya toleransi itu benar-benar
+berlaku (handle bezier bisa overshoot di antara key).
+"""
+
+import numpy as np
+
+from Core import fcurve_writer, sample_cache
+from Core.fcurve_index import FCurveIndex
+
+
+def rdp_mask(frames, values, tolerance, keep=None):
+    """
+    frames (n,), values (n, k). Kembalikan mask bool key yang dipertahankan
+    sehingga semua key yang dibuang berada dalam tolerance dari garis antar
+    key tersisa. keep: mask tambahan key yang wajib dipertahankan.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64).reshape(len(frames), -1)
+    count = len(frames)
+    mask = np.zeros(count, dtype=bool) if keep is None else np.asarray(keep, dtype=bool).copy()
+    if count <= 2:
+        mask[:] = True
+        return mask
+    mask[0] = mask[-1] = True
+
+    # Key wajib memecah kurva jadi segmen yang direduksi sendiri-sendiri
+    anchors = np.flatnonzero(mask)
+    stack = list(zip(anchors[:-1], anchors[1:]))
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        inner = slice(start + 1, end)
+        t = (frames[inner] - frames[start]) / (frames[end] - frames[start])
+        line = values[start] + (values[end] - values[start]) * t[:, None]
+        error = np.abs(values[inner] - line).max(axis=1)
+        worst = int(np.argmax(error))
+        if error[worst] > tolerance:
+            split = start + 1 + worst
+            mask[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return mask
+
+
+def reduce_bone(obj, bone_name, frame_start, frame_end, tolerance, props=None, keep_frames=None, index=None):
+    """
+    Reduksi key bone_name di antara frame_start..frame_end. keep_frames
+    (mis. key asli sebelum bake) selalu dipertahankan. props: property yang
+    boleh direduksi (mis. hasil bake_engine.baked_props); None = semua
+    channel. Kembalikan jumlah key yang dihapus.
+    """
+    if index is None:
+        index = FCurveIndex.from_object(obj)
+    keep_frames = np.asarray(sorted(() if keep_frames is None else keep_frames), dtype=np.float64)
+    removed = 0
+    for prop, by_index in index.channels(bone_name).items():
+        if props is not None and prop not in props:
+            continue
+        curves = [by_index[i] for i in sorted(by_index)]
+        keys = [index.keys(fcurve) for fcurve in curves]
+
+        # Hanya frame yang ada di semua komponen yang direduksi bersama
+        frames = keys[0][:, 0]
+        frames = frames[(frames >= frame_start) & (frames <= frame_end)]
+        for co in keys[1:]:
+            frames = np.intersect1d(frames, co[:, 0])
+        if len(frames) <= 2:
+            continue
+
+        values = np.empty((len(frames), len(curves)), dtype=np.float64)
+        for col, co in enumerate(keys):
+            values[:, col] = co[np.searchsorted(co[:, 0], frames), 1]
+
+        mask = rdp_mask(frames, values, tolerance, keep=np.isin(frames, keep_frames))
+        if mask.all():
+            continue
+        for col, fcurve in enumerate(curves):
+            fcurve_writer.write_keys(fcurve, frames[mask], values[mask, col], interpolation='LINEAR',
+                                     replace_range=True)
+            index.refresh_keys(fcurve)
+        removed += int((~mask).sum()) * len(curves)
+    if removed:
+        sample_cache.invalidate()
+    return removed
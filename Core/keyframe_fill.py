@@ -0,0 +1,82 @@
+"""
+Lengkapi keyframe channel vektor yang hanya ter-key sebagian.
+
+Contoh: location X dan Z punya key di frame 12 tapi Y tidak. Semua channel
+dibaca sekali ke matrix okupansi (frame x komponen) lalu komponen yang hilang
+diisi dengan nilai F-Curve yang dievaluasi di frame itu (atau nilai pose saat
+ini kalau komponen belum punya F-Curve). Tidak ada scene.frame_set().
+"""
+
+import numpy as np
+
+from Core import fcurve_writer
+from Core.fcurve_index import FCurveIndex
+
+VECTOR_PROPS = {
+    "location": 3,
+    "rotation_euler": 3,
+    "rotation_quaternion": 4,
+    "scale": 3,
+}
+
+
+def fill_partial_vector_keys(obj, frames=None, bones=None, index=None):
+    """
+    Isi komponen yang hilang untuk pose bone obj. frames default = semua
+    frame yang punya key di action. Kembalikan jumlah key yang ditambahkan.
+    """
+    if index is None:
+        index = FCurveIndex.from_object(obj)
+    if not index:
+        return 0
+
+    frames = index.all_frames() if frames is None else np.unique(np.asarray(frames, dtype=np.int64))
+    if not len(frames):
+        return 0
+
+    # Kolom matrix okupansi: (bone, prop, komponen, fcurve atau None)
+    columns = []
+    groups = []
+    for bone in (bones if bones is not None else obj.pose.bones):
+        channels = index.channels(bone.name)
+        for prop, size in VECTOR_PROPS.items():
+            by_index = channels.get(prop)
+            if not by_index:
+                continue
+            first = len(columns)
+            for comp in range(size):
+                columns.append((bone, prop, comp, by_index.get(comp)))
+            groups.append((first, size))
+
+    if not columns:
+        return 0
+
+    occupancy = np.zeros((len(frames), len(columns)), dtype=bool)
+    for col, (_bone, _prop, _comp, fcurve) in enumerate(columns):
+        if fcurve is not None:
+            keyed = np.unique(index.keys(fcurve)[:, 0].astype(np.int64))
+            occupancy[:, col] = np.isin(frames, keyed, assume_unique=True)
+
+    # Frame di mana sebuah vektor ter-key sebagian (0 < jumlah < ukuran)
+    missing = np.zeros_like(occupancy)
+    for first, size in groups:
+        block = occupancy[:, first:first + size]
+        count = block.sum(axis=1)
+        partial = (count > 0) & (count < size)
+        missing[:, first:first + size] = partial[:, None] & ~block
+
+    action = index.action
+    added = 0
+    for col in np.flatnonzero(missing.any(axis=0)):
+        bone, prop, comp, fcurve = columns[col]
+        fill_frames = frames[missing[:, col]]
+        if fcurve is not None:
+            values = np.fromiter((fcurve.evaluate(float(f)) for f in fill_frames),
+                                 dtype=np.float32, count=len(fill_frames))
+        else:
+            values = np.full(len(fill_frames), getattr(bone, prop)[comp], dtype=np.float32)
+
+        data_path = f'pose.bones["{bone.name}"].{prop}'
+        added += fcurve_writer.write_channel(action, data_path, comp, fill_frames, values,
+                                             group_name=bone.name)
+    return added
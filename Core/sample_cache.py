@@ -0,0 +1,111 @@
+"""
+Cache transform ter-evaluasi (world & local) per (object, bone, frame).
+
+Bake, forward/backward snap dan tool parent constraint sama-sama membaca
+matrix bone per frame. Hasil sampling disimpan di sini supaya operasi
+berikutnya di range yang sama tidak perlu scrub timeline lagi.
+
+Setiap entry menyimpan revisi saat di-sample: (revisi global, nama action
+object). Revisi global naik setiap depsgraph_update_post yang mengubah
+transform/geometry object atau menyentuh action (edit key, constraint,
+driver, dll), jadi entry lama otomatis tidak terpakai. Perubahan seleksi
+tidak meng-invalidasi cache. Selama sweep sampling kita sendiri
+(suspended()) handler diabaikan.
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import bpy
+import numpy as np
+
+MAX_ENTRIES = 100000
+
+# (nama object, nama bone / None, frame) -> (revisi, world (4, 4), local (4, 4))
+_entries = OrderedDict()
+_revision = 0
+_suspended = 0
+_users = 0
+
+
+def _action_name(obj):
+    anim_data = getattr(obj, "animation_data", None)
+    action = anim_data.action if anim_data else None
+    return action.name if action else None
+
+
+def revision(obj):
+    return (_revision, _action_name(obj))
+
+
+def invalidate():
+    """Naikkan revisi global; semua entry lama jadi basi dan dibuang."""
+    global _revision
+    _revision += 1
+    _entries.clear()
+
+
+def lookup(obj, bone_name, frame, rev=None):
+    """(world, local) float64 dari cache, atau None kalau belum ada / basi."""
+    entry = _entries.get((obj.name, bone_name, int(frame)))
+    if entry is None or entry[0] != (rev if rev is not None else revision(obj)):
+        return None
+    return entry[1].astype(np.float64), entry[2].astype(np.float64)
+
+
+def store(obj, bone_name, frame, world, local, rev=None):
+    key = (obj.name, bone_name, int(frame))
+    _entries[key] = (rev if rev is not None else revision(obj),
+                     np.asarray(world, dtype=np.float32), np.asarray(local, dtype=np.float32))
+    _entries.move_to_end(key)
+    while len(_entries) > MAX_ENTRIES:
+        _entries.popitem(last=False)
+
+
+@contextmanager
+def suspended():
+    """Abaikan depsgraph update selama sweep frame_set milik tool sendiri."""
+    global _suspended
+    _suspended += 1
+    try:
+        yield
+    finally:
+        _suspended -= 1
+
+
+#============================== HANDLERS ==============================
+@bpy.app.handlers.persistent
+def _on_depsgraph_update(scene, depsgraph):
+    if _suspended or not _entries:
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Action) or update.is_updated_transform or update.is_updated_geometry:
+            invalidate()
+            return
+
+
+@bpy.app.handlers.persistent
+def _on_load(*_args):
+    invalidate()
+
+
+def register():
+    """Dipanggil oleh setiap modul pemakai; handler hanya dipasang sekali."""
+    global _users
+    _users += 1
+    if _on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    if _on_load not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load)
+
+
+def unregister():
+    global _users
+    _users = max(_users - 1, 0)
+    if _users:
+        return
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load)
+    invalidate()
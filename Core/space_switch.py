@@ -0,0 +1,319 @@
+"""
+Space switch Child-Of tanpa operator dan tanpa pergantian mode.
+
+Enable/disable lama memanggil childof_set_inverse + view_layer.update() di
+setiap switch. Di sini setiap switch (frame, influence baru) dikompensasi
+secara analitik: matrix parent Child-Of (target @ inverse) dan transform
+visual owner di semua frame switch di-sample dalam satu sweep, lalu matrix
+lokal baru dihitung di numpy (parent^-1 @ world child), urut waktu dan
+berantai dari basis switch sebelumnya, supaya posisi world owner tidak lompat. Key ditulis massal seperti pola tool lama: key "tahan"
+di frame-1 (nilai lama) dan key baru di frame switch, untuk transform dan
+influence.
+
+Asumsi: owner_space & target_space WORLD (default Child-Of), influence
+diperlakukan sebagai switch 0/1, dan channel yang dimatikan difilter
+memakai euler XYZ.
+"""
+
+import mathutils
+import numpy as np
+
+from Core import bake_engine, fcurve_writer, sample_cache, step_snap
+from Core.fcurve_index import FCurveIndex
+
+
+class SpaceSwitchError(Exception):
+    pass
+
+
+class SwitchJob:
+    """
+    Switch satu constraint Child-Of. obj: object pemilik (armature untuk
+    bone), pose_bone: None untuk constraint object, switches: {frame:
+    influence baru}. set_inverse=True mengisi inverse_matrix dari target di
+    frame switch pertama (pengganti childof_set_inverse).
+    """
+
+    def __init__(self, obj, pose_bone, constraint, switches, set_inverse=False):
+        self.obj = obj
+        self.pose_bone = pose_bone
+        self.constraint = constraint
+        self.switches = {int(frame): float(value) for frame, value in switches.items()}
+        self.set_inverse = set_inverse
+
+    @property
+    def owner(self):
+        return self.pose_bone if self.pose_bone is not None else self.obj
+
+    @property
+    def bone_name(self):
+        return self.pose_bone.name if self.pose_bone is not None else None
+
+    def path(self, prop):
+        prefix = f'pose.bones["{self.pose_bone.name}"].' if self.pose_bone is not None else ""
+        return prefix + prop
+
+    def influence_path(self):
+        return self.path(f'constraints["{self.constraint.name}"].influence')
+
+
+def check_constraint(constraint):
+    """SpaceSwitchError kalau constraint tidak bisa dikompensasi secara analitik."""
+    if constraint.type != 'CHILD_OF':
+        raise SpaceSwitchError(f'"{constraint.name}" bukan constraint Child Of')
+    if constraint.target is None:
+        raise SpaceSwitchError(f'"{constraint.name}" tidak punya target')
+    if constraint.subtarget and constraint.target.type != 'ARMATURE':
+        raise SpaceSwitchError(f'"{constraint.name}": subtarget vertex group belum didukung')
+    if constraint.owner_space != 'WORLD' or constraint.target_space != 'WORLD':
+        raise SpaceSwitchError(f'"{constraint.name}": owner/target space harus World')
+
+
+def _channel_masks(constraint):
+    return {
+        "location": (constraint.use_location_x, constraint.use_location_y, constraint.use_location_z),
+        "rotation": (constraint.use_rotation_x, constraint.use_rotation_y, constraint.use_rotation_z),
+        "scale": (constraint.use_scale_x, constraint.use_scale_y, constraint.use_scale_z),
+    }
+
+
+def _filter(matrices, masks):
+    """Channel yang dimatikan jadi identitas (loc 0, rot 0, scale 1), seperti Child-Of Blender."""
+    identity = np.broadcast_to(np.eye(4), matrices.shape)
+    return step_snap.lock_axes(identity, matrices, masks)
+
+
+def parent_matrices(constraint, target_world, inverse=None):
+    """Matrix parent Child-Of (n, 4, 4) = target @ inverse, setelah filter channel."""
+    inverse = np.array(constraint.inverse_matrix if inverse is None else inverse, dtype=np.float64)
+    masks = _channel_masks(constraint)
+    if all(all(axes) for axes in masks.values()):
+        return target_world @ inverse
+    return _filter(target_world, masks) @ _filter(inverse, masks)
+
+
+def inverse_for(constraint, target_world):
+    """inverse_matrix yang membuat target di frame itu tidak menggeser owner (set inverse)."""
+    masks = _channel_masks(constraint)
+    if not all(all(axes) for axes in masks.values()):
+        target_world = _filter(target_world, masks)
+    return np.linalg.inv(target_world)
+
+
+def compensate(world, local, parent, current_on, held_on, new_on, carry=None):
+    """
+    Matrix lokal (basis) baru di setiap frame switch, diproses urut waktu.
+    world/local: transform visual owner hasil sample kurva lama (n, 4, 4)
+    dengan influence current_on, parent: matrix parent Child-Of. World yang
+    dipertahankan adalah world dengan influence lama held_on; basis baru
+    menghasilkan world itu dengan influence new_on.
+
+    carry[k] True: owner tidak punya key transform di antara switch k-1 dan
+    k, jadi basis yang berlaku sebelum switch k adalah basis baru switch k-1
+    (bukan basis kurva lama yang sudah ditimpa).
+    """
+    # Ruang owner tanpa constraint dan tanpa basis (parent bone / rest):
+    # world visual = space @ local visual
+    space = world @ np.linalg.inv(local)
+    pre = np.where(current_on[:, None, None], np.linalg.solve(parent, world), world)  # world sebelum constraint
+    basis = np.linalg.solve(space, pre)  # basis kurva lama
+    result = np.empty_like(basis)
+    for k in range(len(basis)):
+        before = result[k - 1] if k and carry is not None and carry[k] else basis[k]
+        held = space[k] @ before
+        if held_on[k]:
+            held = parent[k] @ held
+        if new_on[k]:
+            held = np.linalg.solve(parent[k], held)
+        result[k] = np.linalg.solve(space[k], held)
+    return result
+
+
+def _sample_targets(jobs):
+    """Owner dan target semua job untuk satu sweep bake_engine.sample_frames()."""
+    targets = {}
+
+    def add(obj, bone_name):
+        if obj.type == 'ARMATURE':
+            names = targets.setdefault(obj, [])
+            if bone_name and bone_name not in names:
+                names.append(bone_name)
+        else:
+            targets[obj] = None
+
+    for job in jobs:
+        add(job.obj, job.bone_name)
+        add(job.constraint.target, job.constraint.subtarget or None)
+    return targets
+
+
+def _matrices(samples, bone_name):
+    """(world, local) satu bone, atau transform object kalau bone_name None."""
+    if bone_name is not None:
+        row = samples.row(bone_name)
+        return samples.world[:, row], samples.local[:, row]
+    if samples.object_world is not None:
+        return samples.object_world, samples.object_local
+    return samples.world[:, 0], samples.local[:, 0]
+
+
+def _evaluate(action, data_path, index, default, frame):
+    fcurve = action.fcurves.find(data_path, index=index) if action else None
+    return fcurve.evaluate(frame) if fcurve else default
+
+
+def _basis_values(action, job, prop, frame):
+    """Nilai property transform owner di frame (dari F-Curve, atau nilai property kalau tidak di-key)."""
+    current = getattr(job.owner, prop)
+    return [_evaluate(action, job.path(prop), i, current[i], frame) for i in range(len(current))]
+
+
+def _decompose(local, rotation_mode, held_rotation):
+    """Location/rotasi/scale dari matrix basis, rotasi dijaga kontinu dengan key tahan."""
+    loc, quat, scale = mathutils.Matrix(local.tolist()).decompose()
+    if rotation_mode == 'QUATERNION':
+        if quat.dot(mathutils.Quaternion(held_rotation)) < 0.0:
+            quat.negate()
+        rotation = list(quat)
+    elif rotation_mode == 'AXIS_ANGLE':
+        axis, angle = quat.to_axis_angle()
+        rotation = [angle, *axis]
+    else:
+        rotation = list(quat.to_euler(rotation_mode, mathutils.Euler(held_rotation, rotation_mode)))
+    return [list(loc), rotation, list(scale)]
+
+
+def switch_frames(obj, pose_bone, constraint, frame_start, frame_end):
+    """{frame: influence} di key influence dalam range yang mengubah status on/off."""
+    job = SwitchJob(obj, pose_bone, constraint, {})
+    action = obj.animation_data.action if obj.animation_data else None
+    fcurve = action.fcurves.find(job.influence_path()) if action else None
+    if fcurve is None:
+        return {}
+    keys = fcurve_writer.read_keys(fcurve)
+    keys = keys[(keys[:, 0] >= frame_start) & (keys[:, 0] <= frame_end)]
+    switches = {}
+    for frame, value in keys:
+        if (fcurve.evaluate(frame - 1) >= 0.5) != (value >= 0.5):
+            switches[int(round(frame))] = float(value)
+    return switches
+
+
+def apply(context, jobs):
+    """
+    Kompensasi semua switch semua job lalu tulis key transform & influence
+    massal (replace hanya di frame yang ditulis). Kembalikan jumlah key.
+    """
+    jobs = [job for job in jobs if job.switches]
+    for job in jobs:
+        check_constraint(job.constraint)
+    if not jobs:
+        return 0
+
+    frames = sorted(set().union(*(job.switches for job in jobs)))
+    samples = bake_engine.sample_frames(context, _sample_targets(jobs), frames)
+
+    written = 0
+    for job in jobs:
+        constraint = job.constraint
+        owner_samples = samples[job.obj]
+        switch = np.array(sorted(job.switches), dtype=np.int64)
+        rows = np.searchsorted(owner_samples.frames, switch)
+        world, local = (m[rows] for m in _matrices(owner_samples, job.bone_name))
+        target_world = _matrices(samples[constraint.target], constraint.subtarget or None)[0][rows]
+
+        if job.set_inverse:
+            constraint.inverse_matrix = mathutils.Matrix(inverse_for(constraint, target_world[0]).tolist())
+        parent = parent_matrices(constraint, target_world)
+
+        action = fcurve_writer.ensure_action(job.obj)
+        influence_path = job.influence_path()
+        rotation_mode = job.owner.rotation_mode
+        props = ["location", bake_engine.rotation_property(rotation_mode), "scale"]
+
+        # Switch diproses urut waktu: status yang ditahan sebelum switch k adalah
+        # status baru switch k-1, dan tanpa key transform di antaranya basisnya
+        # juga basis baru switch k-1 (kurva lama sudah tidak berlaku)
+        keyed = FCurveIndex(action).bone_frames(job.bone_name, props=props, custom=False)
+        between = (np.searchsorted(keyed, switch, side="left")
+                   - np.searchsorted(keyed, np.roll(switch, 1), side="right"))
+        carry = (between == 0) & (np.arange(len(switch)) > 0)
+        current = np.array([_evaluate(action, influence_path, 0, constraint.influence, f) for f in switch])
+        new = np.array([job.switches[f] for f in switch])
+        held = np.concatenate(([_evaluate(action, influence_path, 0, constraint.influence, switch[0] - 1)], new[:-1]))
+        local_new = compensate(world, local, parent, current >= 0.5, held >= 0.5, new >= 0.5, carry)
+
+        # Key tahan di frame-1 (nilai lama) + key switch, per channel
+        channels = {}
+        influence = ([], [])
+        switch_values = None
+        for i, frame in enumerate(switch):
+            if carry[i]:
+                held_values = switch_values
+            else:
+                held_values = [_basis_values(action, job, prop, frame - 1) for prop in props]
+            switch_values = _decompose(local_new[i], rotation_mode, held_values[1])
+            keys = []
+            # Switch berurutan: frame-1 sudah berisi key switch sebelumnya
+            if frame - 1 not in job.switches:
+                keys.append((frame - 1, held_values, held[i]))
+            keys.append((frame, switch_values, new[i]))
+            for key_frame, values, value in keys:
+                for prop, prop_values in zip(props, values):
+                    for index, v in enumerate(prop_values):
+                        channel = channels.setdefault((prop, index), ([], []))
+                        channel[0].append(key_frame)
+                        channel[1].append(v)
+                influence[0].append(key_frame)
+                influence[1].append(value)
+
+        group = job.bone_name if job.bone_name is not None else bake_engine.OBJECT_GROUP
+        for (prop, index), (key_frames, values) in channels.items():
+            written += fcurve_writer.write_channel(action, job.path(prop), index, key_frames, values, group_name=group)
+        written += fcurve_writer.write_channel(action, influence_path, 0, influence[0], influence[1],
+                                               group_name=job.bone_name)
+
+    # Animasi berubah: sample lama owner (dan yang bergantung padanya) sudah basi
+    sample_cache.invalidate()
+    context.scene.frame_set(context.scene.frame_current)
+    return written
+
+
+#============================== APPLY ==============================
+def keyed_frames(obj, pose_bone, constraint, frame_start, frame_end):
+    """
+    Frame ber-key owner (termasuk key influence / switch) dan target
+    constraint di dalam range, ditambah kedua ujung range.
+    """
+    frames = [FCurveIndex.from_object(obj).bone_frames(pose_bone.name if pose_bone is not None else None),
+              np.array([frame_start, frame_end], dtype=np.int64)]
+    if constraint.target is not None:
+        frames.append(FCurveIndex.from_object(constraint.target).bone_frames(constraint.subtarget or None))
+    frames = np.unique(np.concatenate(frames))
+    return frames[(frames >= frame_start) & (frames <= frame_end)]
+
+
+def apply_over_range(context, obj, pose_bone, constraint, frames):
+    """
+    Hapus Child-Of tanpa mengubah animasi: transform visual owner di frames
+    di-sample satu sweep, constraint (dan key influence-nya) dihapus, lalu
+    basis ditulis massal; key lama di antara frame pertama & terakhir
+    diganti. Kembalikan jumlah key.
+    """
+    job = SwitchJob(obj, pose_bone, constraint, {})
+    samples = bake_engine.sample_frames(context, {obj: [job.bone_name] if pose_bone is not None else None},
+                                        frames)[obj]
+
+    influence_path = job.influence_path()
+    job.owner.constraints.remove(constraint)
+    action = obj.animation_data.action if obj.animation_data else None
+    fcurve = action.fcurves.find(influence_path) if action else None
+    if fcurve is not None:
+        action.fcurves.remove(fcurve)
+
+    if pose_bone is not None:
+        written = bake_engine.write_bone_keys(obj, samples, pose_bone, custom=False)
+    else:
+        written = bake_engine.write_object_keys(obj, samples, custom=False)
+    context.scene.frame_set(context.scene.frame_current)
+    return written
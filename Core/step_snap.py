@@ -0,0 +1,110 @@
+"""
+Step-snap (forward/backward) satu range untuk banyak bone sekaligus.
+
+Transform world setiap bone di frame referensi dikunci ke seluruh range,
+per sumbu kalau diminta (location/scale per komponen, rotasi per sumbu
+euler XYZ seperti tool lama). Matrix world di-sample sekali lewat
+bake_engine (satu sweep, pakai sample_cache), hasilnya dihitung di numpy
+dan key ditulis massal. Bone yang parent-nya ikut di-snap dihitung dari
+pose baru parent tersebut.
+"""
+
+import numpy as np
+
+from Core import bake_engine, transform_math
+
+AXIS_GROUPS = ("location", "rotation", "scale")
+
+
+def _split(matrices):
+    location = matrices[..., :3, 3]
+    scale = np.linalg.norm(matrices[..., :3, :3], axis=-2)
+    rotation = matrices[..., :3, :3] / np.where(scale < 1e-12, 1.0, scale)[..., None, :]
+    return location, rotation, scale
+
+
+def _compose(location, rotation, scale):
+    """T @ R @ diag(S), sama seperti Translation @ rot.to_4x4 @ Diagonal(scale)."""
+    matrices = np.zeros(location.shape[:-1] + (4, 4), dtype=np.float64)
+    matrices[..., :3, :3] = rotation * scale[..., None, :]
+    matrices[..., :3, 3] = location
+    matrices[..., 3, 3] = 1.0
+    return matrices
+
+
+def lock_axes(current, reference, masks=None):
+    """
+    current (..., 4, 4), reference (4, 4) atau broadcast-able. masks: None =
+    seluruh transform referensi; atau {"location"/"rotation"/"scale": bool (3,)}
+    dengan True = sumbu itu diambil dari referensi.
+    """
+    reference = np.broadcast_to(reference, current.shape)
+    if masks is None:
+        return reference.copy()
+
+    cur_loc, cur_rot, cur_scale = _split(current)
+    ref_loc, ref_rot, ref_scale = _split(reference)
+    loc_mask, rot_mask, scale_mask = (np.asarray(masks.get(group, (False,) * 3), dtype=bool) for group in AXIS_GROUPS)
+
+    location = np.where(loc_mask, ref_loc, cur_loc)
+    scale = np.where(scale_mask, ref_scale, cur_scale)
+    if rot_mask.all():
+        rotation = ref_rot
+    elif not rot_mask.any():
+        rotation = cur_rot
+    else:
+        euler = np.where(rot_mask, transform_math.matrix_to_euler_xyz(ref_rot), transform_math.matrix_to_euler_xyz(cur_rot))
+        rotation = transform_math.euler_xyz_to_matrix(euler)
+    return _compose(location, rotation, scale)
+
+
+def _snapped_ancestor(pose_bone, snapped):
+    parent = pose_bone.parent
+    while parent is not None and parent.name not in snapped:
+        parent = parent.parent
+    return parent.name if parent is not None else None
+
+
+def solve_locals(samples, pose_bones, world_new):
+    """
+    Matrix lokal (basis) baru supaya pose_bones (urutan = samples.bones)
+    mencapai world_new (n frame, n bone, 4, 4).
+    """
+    names = samples.bones
+
+    # Ruang pose (armature) lama & baru, dan ruang parent tiap bone (pose parent @ offset rest)
+    obj_inv = np.linalg.inv(samples.object_world)[:, None]
+    pose_old = obj_inv @ samples.world
+    pose_new = obj_inv @ world_new
+    parent_space = pose_old @ np.linalg.inv(samples.local)
+
+    # Parent yang ikut di-snap menggeser ruang parent anaknya
+    rows = {name: i for i, name in enumerate(names)}
+    for i, pose_bone in enumerate(pose_bones):
+        ancestor = _snapped_ancestor(pose_bone, rows)
+        if ancestor is not None:
+            j = rows[ancestor]
+            delta = pose_new[:, j] @ np.linalg.inv(pose_old[:, j])
+            parent_space[:, i] = delta @ parent_space[:, i]
+
+    return np.linalg.solve(parent_space, pose_new)
+
+
+def snap_range(context, obj, pose_bones, frame_start, frame_end, reference_frame, masks=None):
+    """
+    Kunci transform world pose_bones di reference_frame ke frame_start..frame_end
+    lalu tulis key location/rotasi (sesuai rotation_mode)/scale. Kembalikan
+    jumlah key yang ditulis.
+    """
+    names = [pb.name for pb in pose_bones]
+    samples = bake_engine.sample_bones(context, obj, names, frame_start, frame_end)
+    ref = int(np.clip(np.searchsorted(samples.frames, reference_frame), 0, len(samples.frames) - 1))
+
+    world_new = lock_axes(samples.world, samples.world[ref][None], masks)
+    local_new = solve_locals(samples, pose_bones, world_new)
+    snapped = bake_engine.BakeSamples(samples.frames, names, world_new, local_new, {}, samples.object_world)
+
+    written = 0
+    for pose_bone in pose_bones:
+        written += bake_engine.write_bone_keys(obj, snapped, pose_bone, custom=False)
+    return written
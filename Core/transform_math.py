@@ -0,0 +1,90 @@
+"""
+Helper numpy untuk interpolasi transform bone secara massal.
+
+Quaternion memakai urutan Blender (w, x, y, z), satu baris per bone.
+"""
+
+import numpy as np
+
+_SLERP_EPSILON = 1e-6
+
+
+def lerp(a, b, t):
+    """Interpolasi linear per baris; t skalar atau array (n,)."""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+    if t.ndim == 1:
+        t = t[:, None]
+    return a + (b - a) * t
+
+
+def normalize_quaternions(q):
+    q = np.asarray(q, dtype=np.float64)
+    norm = np.linalg.norm(q, axis=-1, keepdims=True)
+    norm[norm < _SLERP_EPSILON] = 1.0
+    return q / norm
+
+
+def slerp(q0, q1, t):
+    """
+    Spherical linear interpolation per baris untuk array quaternion (n, 4).
+    Jalur terpendek dipilih (q1 dibalik kalau dot < 0); untuk sudut sangat
+    kecil dipakai lerp + normalisasi.
+    """
+    q0 = normalize_quaternions(q0)
+    q1 = normalize_quaternions(q1)
+    t = np.broadcast_to(np.asarray(t, dtype=np.float64), q0.shape[:1])[:, None]
+
+    dot = np.sum(q0 * q1, axis=1, keepdims=True)
+    q1 = np.where(dot < 0.0, -q1, q1)
+    dot = np.abs(dot)
+
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.sin(theta)
+    small = sin_theta < _SLERP_EPSILON
+    safe_sin = np.where(small, 1.0, sin_theta)
+
+    w0 = np.where(small, 1.0 - t, np.sin((1.0 - t) * theta) / safe_sin)
+    w1 = np.where(small, t, np.sin(t * theta) / safe_sin)
+    return normalize_quaternions(w0 * q0 + w1 * q1)
+
+
+def slerp_to_identity(q, t):
+    """
+    Skala rotasi quaternion (n, 4) sebesar t terhadap rotasi identitas:
+    t=0 -> identitas, t=1 -> q, t=0.5 -> setengah sudut. Tetap ternormalisasi.
+    """
+    q = np.asarray(q, dtype=np.float64)
+    identity = np.zeros_like(q)
+    identity[:, 0] = 1.0
+    return slerp(identity, q, t)
+
+
+def matrix_to_euler_xyz(rot):
+    """Matrix rotasi (..., 3, 3) -> euler XYZ (..., 3), sama seperti to_euler() default Blender."""
+    rot = np.asarray(rot, dtype=np.float64)
+    sy = np.hypot(rot[..., 0, 0], rot[..., 1, 0])
+    gimbal = sy < _SLERP_EPSILON
+    x = np.where(gimbal, np.arctan2(-rot[..., 1, 2], rot[..., 1, 1]), np.arctan2(rot[..., 2, 1], rot[..., 2, 2]))
+    y = np.arctan2(-rot[..., 2, 0], sy)
+    z = np.where(gimbal, 0.0, np.arctan2(rot[..., 1, 0], rot[..., 0, 0]))
+    return np.stack((x, y, z), axis=-1)
+
+
+def euler_xyz_to_matrix(euler):
+    """Euler XYZ (..., 3) -> matrix rotasi (..., 3, 3) = Rz @ Ry @ Rx."""
+    euler = np.asarray(euler, dtype=np.float64)
+    cx, cy, cz = np.cos(euler[..., 0]), np.cos(euler[..., 1]), np.cos(euler[..., 2])
+    sx, sy, sz = np.sin(euler[..., 0]), np.sin(euler[..., 1]), np.sin(euler[..., 2])
+    rot = np.empty(euler.shape[:-1] + (3, 3), dtype=np.float64)
+    rot[..., 0, 0] = cy * cz
+    rot[..., 0, 1] = sx * sy * cz - cx * sz
+    rot[..., 0, 2] = cx * sy * cz + sx * sz
+    rot[..., 1, 0] = cy * sz
+    rot[..., 1, 1] = sx * sy * sz + cx * cz
+    rot[..., 1, 2] = cx * sy * sz - sx * cz
+    rot[..., 2, 0] = -sy
+    rot[..., 2, 1] = sx * cy
+    rot[..., 2, 2] = cx * cy
+    return rot
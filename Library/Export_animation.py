@@ -1,6 +1,18 @@
 import bpy
 import math
 import os
+import sys
+
+import numpy as np
+
+# Root folder Raha Tools supaya modul bersama (Library, Core) bisa di-import
+_RAHA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _RAHA_ROOT not in sys.path:
+    sys.path.append(_RAHA_ROOT)
+
+from Core import bone_visibility, keyframe_fill
+from Core.fcurve_index import FCurveIndex
+from Library import clip_format, clip_import, content_store, preview_queue
 
 #====================== PROPERTIES ======================
 bpy.types.Scene.use_custom_frame_range = bpy.props.BoolProperty(
@@ -55,60 +67,14 @@ def insert_missing_keyframes():
         return
     
     scene = bpy.context.scene
-    original_start_frame = scene.frame_start
-    original_end_frame = scene.frame_end
+    index = FCurveIndex(action)
+    frames = index.all_frames()
+    if scene.use_custom_frame_range:
+        frames = frames[(frames >= scene.custom_start_frame) & (frames <= scene.custom_end_frame)]
 
-    try:
-        if scene.use_custom_frame_range:
-            scene.frame_start = scene.custom_start_frame
-            scene.frame_end = scene.custom_end_frame
-
-        keyframes = set()
-        for fcurve in action.fcurves:
-            for keyframe in fcurve.keyframe_points:
-                keyframes.add(int(keyframe.co.x))
-
-        for current_frame in sorted(keyframes):
-            bpy.context.scene.frame_set(current_frame)
-            for bone in obj.pose.bones:
-                keyframe_status_euler = [False, False, False]
-                keyframe_status_quat = [False, False, False, False]
-                keyframe_status_loc = [False, False, False]
-                keyframe_status_scale = [False, False, False]
-
-                for fcurve in action.fcurves:
-                    if fcurve.data_path == f'pose.bones["{bone.name}"].rotation_euler':
-                        for keyframe in fcurve.keyframe_points:
-                            if int(keyframe.co.x) == current_frame:
-                                keyframe_status_euler[fcurve.array_index] = True
-                    elif fcurve.data_path == f'pose.bones["{bone.name}"].rotation_quaternion':
-                        for keyframe in fcurve.keyframe_points:
-                            if int(keyframe.co.x) == current_frame:
-                                keyframe_status_quat[fcurve.array_index] = True
-                    elif fcurve.data_path == f'pose.bones["{bone.name}"].location':
-                        for keyframe in fcurve.keyframe_points:
-                            if int(keyframe.co.x) == current_frame:
-                                keyframe_status_loc[fcurve.array_index] = True
-                    elif fcurve.data_path == f'pose.bones["{bone.name}"].scale':
-                        for keyframe in fcurve.keyframe_points:
-                            if int(keyframe.co.x) == current_frame:
-                                keyframe_status_scale[fcurve.array_index] = True
-
-                if 0 < sum(keyframe_status_euler) < 3:
-                    for i in range(3):
-                        if not keyframe_status_euler[i]:
-                            bone.keyframe_insert(data_path="rotation_euler", index=i)
-                if 0 < sum(keyframe_status_loc) < 3:
-                    for i in range(3):
-                        if not keyframe_status_loc[i]:
-                            bone.keyframe_insert(data_path="location", index=i)
-                if 0 < sum(keyframe_status_scale) < 3:
-                    for i in range(3):
-                        if not keyframe_status_scale[i]:
-                            bone.keyframe_insert(data_path="scale", index=i)
-    finally:
-        scene.frame_start = original_start_frame
-        scene.frame_end = original_end_frame
+    # Matrix okupansi frame x channel, diisi sekali dari foreach_get
+    added = keyframe_fill.fill_partial_vector_keys(obj, frames=frames, index=index)
+    print(f"{added} keyframe yang hilang ditambahkan.")
 
 #============================== EXPORT KEYFRAME DATA ===============================
 def export_bone_keyframe_data(context, filepath):
@@ -125,134 +91,63 @@ def export_bone_keyframe_data(context, filepath):
             scene.frame_start = scene.custom_start_frame
             scene.frame_end = scene.custom_end_frame
 
-        selected_bones = [b.name for b in bpy.context.selected_pose_bones]
-        bone_data = {}
-
+        # Clip & preview ditulis ke staging lalu disimpan di store content-addressed
         base_folder = os.path.dirname(filepath)
-        anim_data_folder = os.path.join(base_folder, "ANIM_DATA")
-        preview_folder = os.path.join(base_folder, "Preview")
-
-        os.makedirs(anim_data_folder, exist_ok=True)
-        os.makedirs(preview_folder, exist_ok=True)
-
         file_name = os.path.splitext(os.path.basename(filepath))[0]
-        script_path = os.path.join(anim_data_folder, f"{file_name}.py")
-        playblast_path = os.path.join(preview_folder, f"{file_name}.mp4")
-        screenshot_path = os.path.join(base_folder, f"{file_name}.png")
-
-        for bone in armature_obj.pose.bones:
-            if bone.bone.select:
-                bone_data[bone.name] = {}
-
-                if armature_obj.animation_data and armature_obj.animation_data.action:
-                    action = armature_obj.animation_data.action
-                    for fcurve in action.fcurves:
-                        if fcurve.data_path.startswith(f'pose.bones["{bone.name}"]'):
-                            for keyframe in fcurve.keyframe_points:
-                                frame = int(keyframe.co[0])
-                                if scene.use_custom_frame_range and (frame < scene.custom_start_frame or frame > scene.custom_end_frame):
-                                    continue
-                                if frame not in bone_data[bone.name]:
-                                    bone_data[bone.name][frame] = {}
-                                data_path = fcurve.data_path.split('"]')[-1][1:]
-                                bone_data[bone.name][frame].setdefault(data_path, {})[fcurve.array_index] = keyframe.co[1]
-
-                if bone.keys():
-                    for frame in bone_data[bone.name]:
-                        bone_data[bone.name][frame]["custom_props"] = {}
-                    for prop_name in bone.keys():
-                        if prop_name != "_RNA_UI":
-                            action = armature_obj.animation_data.action
-                            if action:
-                                for fcurve in action.fcurves:
-                                    if fcurve.data_path == f'pose.bones["{bone.name}"]["{prop_name}"]':
-                                        for keyframe in fcurve.keyframe_points:
-                                            frame = int(keyframe.co[0])
-                                            if scene.use_custom_frame_range and (frame < scene.custom_start_frame or frame > scene.custom_end_frame):
-                                                continue
-                                            value = keyframe.co[1]
-                                            bone_data[bone.name][frame]["custom_props"][prop_name] = {
-                                                "value": value,
-                                                "type": get_value_type(bone, prop_name, value)
-                                            }
-
-        if not bone_data:
+        clip_path = content_store.staging_path(base_folder, file_name, clip_format.CLIP_EXT)
+        playblast_path = content_store.staging_path(base_folder, file_name, ".mp4")
+        screenshot_path = content_store.staging_path(base_folder, file_name, ".png")
+
+        index = FCurveIndex.from_object(armature_obj)
+        channels = []
+
+        if index:
+            for bone in armature_obj.pose.bones:
+                if not bone.bone.select:
+                    continue
+                for path, array_index, fcurve in index.fcurves(bone.name):
+                    keys = index.keys(fcurve).copy()
+                    keys[:, 0] = np.floor(keys[:, 0])
+                    if scene.use_custom_frame_range:
+                        in_range = (keys[:, 0] >= scene.custom_start_frame) & (keys[:, 0] <= scene.custom_end_frame)
+                        keys = keys[in_range]
+                    if not len(keys):
+                        continue
+
+                    channel = {"bone": bone.name, "path": path, "index": array_index, "keys": keys}
+                    if path.startswith('["'):
+                        prop_name = path[2:-2]
+                        if prop_name == "_RNA_UI":
+                            continue
+                        channel["type"] = get_value_type(bone, prop_name, float(keys[0, 1]))
+                    channels.append(channel)
+
+        if not channels:
             return {'CANCELLED'}
 
-        with open(script_path, 'w') as file:
-            file.write("import bpy\nimport math\n\nscene = bpy.context.scene\n")
-            file.write("selected_pose_bones = bpy.context.selected_pose_bones\n")
-            file.write("if selected_pose_bones:\n")
-            file.write("    armature_obj = selected_pose_bones[0].id_data\n")
-            file.write("    selected_bones = [bone.name for bone in selected_pose_bones]\n")
-            file.write("    matched_bones = {}\n\n")
-
-            all_frames = sorted({frame for bone_frames in bone_data.values() for frame in bone_frames})
-            prev_frame = None
-            for frame in all_frames:
-                file.write(f"# Frame {frame}\n")
-                if prev_frame is None:
-                    file.write("frame_current = scene.frame_current\nscene.frame_set(frame_current)\nbpy.ops.anim.keyframe_insert()\n")
-                else:
-                    file.write(f"frame_target = frame_current + {frame - prev_frame}\n")
-                    file.write("scene.frame_set(frame_target)\nframe_current = frame_target\n")
-
-                for bone_name, frames in bone_data.items():
-                    if frame in frames:
-                        file.write(f"if '{bone_name}' in selected_bones:\n")
-                        file.write(f"    bone = armature_obj.pose.bones['{bone_name}']\n")
-                        for data_path, value in frames[frame].items():
-                            if data_path == "location":
-                                x, y, z = value.get(0, 0), value.get(1, 0), value.get(2, 0)
-                                file.write(f"    bone.location = ({x}, {y}, {z})\n")
-                                file.write("    bone.keyframe_insert(data_path='location')\n")
-                            elif data_path == "rotation_quaternion":
-                                w, x, y, z = [value.get(i, 0) for i in range(4)]
-                                file.write(f"    bone.rotation_quaternion = ({w}, {x}, {y}, {z})\n")
-                                file.write("    bone.keyframe_insert(data_path='rotation_quaternion')\n")
-                            elif data_path == "rotation_euler":
-                                x, y, z = value.get(0, 0), value.get(1, 0), value.get(2, 0)
-                                file.write(f"    bone.rotation_euler = ({x}, {y}, {z})\n")
-                                file.write("    bone.keyframe_insert(data_path='rotation_euler')\n")
-                            elif data_path == "scale":
-                                x, y, z = value.get(0, 1), value.get(1, 1), value.get(2, 1)
-                                file.write(f"    bone.scale = ({x}, {y}, {z})\n")
-                                file.write("    bone.keyframe_insert(data_path='scale')\n")
-                            elif data_path == "custom_props":
-                                for prop_name, prop_data in value.items():
-                                    val = prop_data["value"]
-                                    typ = prop_data["type"]
-                                    if typ == "bool":
-                                        file.write(f'    bone["{prop_name}"] = {str(bool(val))}\n')
-                                    elif typ == "int":
-                                        file.write(f'    bone["{prop_name}"] = int({val})\n')
-                                    elif typ == "float":
-                                        file.write(f'    bone["{prop_name}"] = float({val})\n')
-                                    elif typ == "str":
-                                        file.write(f'    bone["{prop_name}"] = "{val}"\n')
-                                    elif typ == "list":
-                                        file.write(f'    bone["{prop_name}"] = {list(val)}\n')
-                                    else:
-                                        file.write(f'    bone["{prop_name}"] = {val}\n')
-                                    file.write(f'    bone.keyframe_insert(data_path=\'["{prop_name}"]\')\n')
-                prev_frame = frame
-                file.write("\n")
-
-        # Playblast MP4
-        scene.render.filepath = playblast_path
-        scene.render.image_settings.file_format = 'FFMPEG'
-        scene.render.ffmpeg.format = 'MPEG4'
-        scene.render.ffmpeg.codec = 'H264'
-        scene.render.ffmpeg.audio_codec = 'AAC'
-        bpy.ops.render.opengl(animation=True)
-
-        # Screenshot
-        scene.frame_set(scene.frame_start)
-        original_format = scene.render.image_settings.file_format
-        scene.render.image_settings.file_format = 'PNG'
-        scene.render.filepath = screenshot_path
-        bpy.ops.render.opengl(write_still=True)
-        scene.render.image_settings.file_format = original_format
+        all_frames = np.concatenate([c["keys"][:, 0] for c in channels])
+        # Armature & fps disimpan di manifest (bukan header clip) supaya hash
+        # blob hanya mencakup data keyframe
+        clip_format.write_clip(
+            clip_path,
+            channels,
+            frame_start=int(all_frames.min()),
+            frame_end=int(all_frames.max()),
+        )
+        record = content_store.add(base_folder, file_name, data=clip_path, info={
+            "armature": armature_obj.name,
+            "fps": scene.render.fps / scene.render.fps_base,
+        })
+
+        # Preview MP4 + screenshot dirender di background, export tidak menunggu
+        preview_queue.enqueue(
+            context, file_name,
+            scene.frame_start, scene.frame_end,
+            video_path=playblast_path,
+            image_path=screenshot_path,
+            library_root=base_folder,
+            on_finish=content_store.preview_ingest(base_folder, record["id"], playblast_path, screenshot_path),
+        )
 
     finally:
         scene.frame_start = original_start_frame
@@ -267,21 +162,35 @@ def import_bone_keyframe_data(context, filepath):
     directory, filename = os.path.split(filepath)
     name, ext = os.path.splitext(filename)
 
-    anim_data_dir = os.path.join(directory, "ANIM_DATA")
-
-    if not os.path.exists(anim_data_dir):
-        print(f"Folder ANIM_DATA tidak ditemukan di: {directory}")
+    # Store content-addressed / .rclip diutamakan, script .py lama sebagai fallback
+    data_filepath = clip_format.find_clip_data(directory, name)
+    if not data_filepath:
+        print(f"Data clip {name} tidak ditemukan di: {directory}")
         return {'CANCELLED'}
 
-    script_filepath = os.path.join(anim_data_dir, f"{name}.py")  # Asumsi file script berekstensi .py
+    if data_filepath.endswith(clip_format.CLIP_EXT):
+        try:
+            clip_import.import_clip(context, data_filepath)
+            print(f"Data keyframe dari {data_filepath} berhasil diimpor.")
+            return {'FINISHED'}
+        except Exception as e:
+            print(f"Terjadi error saat mengimpor clip: {e}")
+            return {'CANCELLED'}
 
-    if not os.path.exists(script_filepath):
-        print(f"File script {name}.py tidak ditemukan di: {anim_data_dir}")
+    if not data_filepath.endswith(".py"):
+        print(f"Format {data_filepath} tidak didukung di sini, gunakan Studio Library.")
         return {'CANCELLED'}
+    script_filepath = data_filepath
     
     try:
+        obj = context.object
         with open(script_filepath, 'r') as file:
-            exec(file.read())
+            code = file.read()
+        if obj and obj.type == 'ARMATURE':
+            with bone_visibility.revealed(obj.data):
+                exec(code)
+        else:
+            exec(code)
         print(f"Data keyframe dari {script_filepath} berhasil diimpor.")
         return {'FINISHED'}
     except Exception as e:  # Tangani potensi error saat membaca atau mengeksekusi script
@@ -319,7 +228,12 @@ class ANIMExportBoneKeyframeData(bpy.types.Operator):
     def execute(self, context):
         if self.insert_missing_keyframes:
             insert_missing_keyframes()
-        return export_bone_keyframe_data(context, self.filepath)
+        try:
+            return export_bone_keyframe_data(context, self.filepath)
+        except content_store.ManifestError as e:
+            # Manifest library rusak: export dibatalkan, manifest tidak ditimpa
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
 
     def invoke(self, context, event):
         context.window_manager.fileselect_add(self)
@@ -10,6 +10,16 @@ from bpy_extras.io_utils import ExportHelper, ImportHelper
 from bpy.props import StringProperty, BoolProperty, FloatProperty, EnumProperty
 from bpy.types import Operator, Panel
 from bpy.utils import previews
+import sys
+import numpy as np
+
+# Root folder Raha Tools supaya modul bersama (Core) bisa di-import
+_RAHA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _RAHA_ROOT not in sys.path:
+    sys.path.append(_RAHA_ROOT)
+
+from Core import transform_math
+from Core.fcurve_index import FCurveIndex, is_custom_prop
 
 # Global variables for image previews
 _icons = None
@@ -26,23 +36,156 @@ def flip_selected_pose(context):
     # Paste the pose with flipping enabled
     bpy.ops.pose.paste(flipped=True)
 
+#============================== PERCENTAGE HELPERS ===============================
+# Persentase relatif terhadap rest pose: location/euler -> 0, quaternion ->
+# identitas (slerp, tetap ternormalisasi). Scale dikali langsung seperti tool
+# lama; scale_from_rest=True menskalakan selisihnya dari 1 (opsi "Scale From Rest")
+def _scale_values(prop, values, percentage, scale_from_rest=False):
+    if prop == "scale" and scale_from_rest:
+        return 1.0 + (values - 1.0) * percentage
+    return values * percentage
+
+def _read_points(fcurve):
+    points = fcurve.keyframe_points
+    count = len(points)
+    co = np.empty(count * 2, dtype=np.float32)
+    handle_left = np.empty(count * 2, dtype=np.float32)
+    handle_right = np.empty(count * 2, dtype=np.float32)
+    points.foreach_get("co", co)
+    points.foreach_get("handle_left", handle_left)
+    points.foreach_get("handle_right", handle_right)
+    return co.reshape(-1, 2), handle_left.reshape(-1, 2), handle_right.reshape(-1, 2)
+
+def _key_mask(fcurve, co, frame_range):
+    """Key yang diproses: di dalam frame range, atau key yang terseleksi."""
+    if frame_range is not None:
+        return (co[:, 0] >= frame_range[0]) & (co[:, 0] <= frame_range[1])
+    selected = np.empty(len(co), dtype=bool)
+    fcurve.keyframe_points.foreach_get("select_control_point", selected)
+    return selected
+
+def _write_values(fcurve, co, handle_left, handle_right, mask, new_values):
+    # Handle digeser sebesar perubahan nilai supaya bentuk kurva tetap
+    delta = new_values - co[mask, 1]
+    co[mask, 1] = new_values
+    handle_left[mask, 1] += delta
+    handle_right[mask, 1] += delta
+    points = fcurve.keyframe_points
+    points.foreach_set("co", co.ravel())
+    points.foreach_set("handle_left", handle_left.ravel())
+    points.foreach_set("handle_right", handle_right.ravel())
+    fcurve.update()
+
+def _scale_quaternion_keys(bone, by_index, percentage, frame_range):
+    """Slerp key quaternion ke identitas; komponen tanpa key di frame itu dievaluasi dari kurvanya."""
+    curves = {}
+    frames = []
+    for idx, fcurve in by_index.items():
+        co, handle_left, handle_right = _read_points(fcurve)
+        mask = _key_mask(fcurve, co, frame_range)
+        curves[idx] = (fcurve, co, handle_left, handle_right, mask)
+        frames.append(co[mask, 0])
+    frames = np.unique(np.concatenate(frames)) if frames else np.empty(0, dtype=np.float32)
+    if not len(frames):
+        return 0
+
+    quats = np.empty((len(frames), 4), dtype=np.float64)
+    for idx in range(4):
+        curve = curves.get(idx)
+        if curve is None:
+            quats[:, idx] = bone.rotation_quaternion[idx]
+            continue
+        fcurve, co, _hl, _hr, _mask = curve
+        quats[:, idx] = [fcurve.evaluate(float(f)) for f in frames]
+        pos = np.searchsorted(frames, co[:, 0])
+        keyed = (pos < len(frames)) & (frames[np.minimum(pos, len(frames) - 1)] == co[:, 0])
+        quats[pos[keyed], idx] = co[keyed, 1]
+
+    result = transform_math.slerp_to_identity(quats, percentage)
+
+    count = 0
+    for idx, (fcurve, co, handle_left, handle_right, mask) in curves.items():
+        if not mask.any():
+            continue
+        rows = np.searchsorted(frames, co[mask, 0])
+        _write_values(fcurve, co, handle_left, handle_right, mask, result[rows, idx].astype(np.float32))
+        count += int(mask.sum())
+    return count
+
+def apply_percentage_to_keys(armature, props, custom, percentage, frame_range=None, scale_from_rest=False):
+    """
+    Terapkan persentase ke keyframe bone terpilih sekaligus (foreach_get /
+    foreach_set per F-Curve). frame_range=None: hanya key yang terseleksi.
+    Kembalikan jumlah key yang diubah.
+    """
+    index = FCurveIndex.from_object(armature)
+    count = 0
+    for bone in armature.pose.bones:
+        if not bone.bone.select:
+            continue
+        channels = index.channels(bone.name)
+        for prop in props:
+            by_index = channels.get(prop)
+            if not by_index:
+                continue
+            if prop == "rotation_quaternion":
+                count += _scale_quaternion_keys(bone, by_index, percentage, frame_range)
+                continue
+            for fcurve in by_index.values():
+                co, handle_left, handle_right = _read_points(fcurve)
+                mask = _key_mask(fcurve, co, frame_range)
+                if mask.any():
+                    _write_values(fcurve, co, handle_left, handle_right, mask,
+                                  _scale_values(prop, co[mask, 1], percentage, scale_from_rest))
+                    count += int(mask.sum())
+        if custom:
+            for prop, _idx, fcurve in index.fcurves(bone.name):
+                if not is_custom_prop(prop):
+                    continue
+                co, handle_left, handle_right = _read_points(fcurve)
+                mask = _key_mask(fcurve, co, frame_range)
+                if mask.any():
+                    _write_values(fcurve, co, handle_left, handle_right, mask, co[mask, 1] * percentage)
+                    count += int(mask.sum())
+    return count
+
 class ApplyPercentageOperator(bpy.types.Operator):
     bl_idname = "pose.apply_percentage"
     bl_label = "Apply Percentage to Bones"
+    bl_options = {'REGISTER', 'UNDO'}
     
     def execute(self, context):
         armature = context.object
+        scene = context.scene
         
         # Pastikan objek adalah armature
-        if armature.type != 'ARMATURE':
+        if armature is None or armature.type != 'ARMATURE':
             self.report({'WARNING'}, "Selected object is not an armature")
             return {'CANCELLED'}
         
-        percentage = context.scene.percentage_value / 100  # Konversi persentase menjadi rasio
-        calc_location = context.scene.calc_location
-        calc_rotation = context.scene.calc_rotation
-        calc_scale = context.scene.calc_scale
-        calc_custom_property = context.scene.calc_custom_property
+        percentage = scene.percentage_value / 100  # Konversi persentase menjadi rasio
+        calc_location = scene.calc_location
+        calc_rotation = scene.calc_rotation
+        calc_scale = scene.calc_scale
+        calc_custom_property = scene.calc_custom_property
+
+        # Mode keyframe: semua key di range / key terseleksi diproses sekaligus
+        if scene.percentage_mode != 'POSE':
+            props = []
+            if calc_location:
+                props.append("location")
+            if calc_rotation:
+                props += ["rotation_euler", "rotation_quaternion"]
+            if calc_scale:
+                props.append("scale")
+            frame_range = None
+            if scene.percentage_mode == 'RANGE':
+                frame_range = (min(scene.percentage_frame_start, scene.percentage_frame_end),
+                               max(scene.percentage_frame_start, scene.percentage_frame_end))
+            count = apply_percentage_to_keys(armature, props, calc_custom_property, percentage, frame_range,
+                                             scene.percentage_scale_from_rest)
+            self.report({'INFO'}, f"Percentage applied to {count} keys")
+            return {'FINISHED'}
         
         # Iterasi setiap bone yang terseleksi
         for bone in armature.pose.bones:
@@ -51,27 +194,20 @@ class ApplyPercentageOperator(bpy.types.Operator):
                 
                 if calc_location:
                     # Lokasi bone (transformasi relatif)
-                    bone.location.x *= percentage
-                    bone.location.y *= percentage
-                    bone.location.z *= percentage
+                    bone.location = _scale_values("location", np.array(bone.location), percentage)
 
                 if calc_rotation:
                     # Rotasi bone (Euler)
-                    bone.rotation_euler.x *= percentage
-                    bone.rotation_euler.y *= percentage
-                    bone.rotation_euler.z *= percentage
+                    bone.rotation_euler = _scale_values("rotation_euler", np.array(bone.rotation_euler), percentage)
 
-                    # Rotasi bone (Quaternion)
-                    bone.rotation_quaternion.x *= percentage
-                    bone.rotation_quaternion.y *= percentage
-                    bone.rotation_quaternion.z *= percentage
-                    bone.rotation_quaternion.w *= percentage
+                    # Rotasi bone (Quaternion): slerp ke identitas, bukan dikali per komponen
+                    quat = np.array([bone.rotation_quaternion], dtype=np.float64)
+                    bone.rotation_quaternion = transform_math.slerp_to_identity(quat, percentage)[0]
 
                 if calc_scale:
-                    # Skala bone
-                    bone.scale.x *= percentage
-                    bone.scale.y *= percentage
-                    bone.scale.z *= percentage
+                    # Skala bone (dikali langsung kecuali Scale From Rest aktif)
+                    bone.scale = _scale_values("scale", np.array(bone.scale), percentage,
+                                               scene.percentage_scale_from_rest)
 
                 if calc_custom_property:
                     # Kalkulasi custom property jika ada
@@ -131,6 +267,24 @@ def register():
     bpy.types.Scene.calc_custom_property = bpy.props.BoolProperty(name="Custom Properties", default=False)    
     bpy.types.Scene.set_keyframes = BoolProperty(name="Set Keyframes")
     
+    # Mode apply percentage: pose saat ini atau keyframe sekaligus
+    bpy.types.Scene.percentage_mode = EnumProperty(
+        name="Mode",
+        items=[
+            ('POSE', "Current Pose", "Scale the current pose of selected bones and key it"),
+            ('RANGE', "Frame Range", "Scale all keys of selected bones inside the frame range"),
+            ('SELECTED_KEYS', "Selected Keys", "Scale the selected keys of selected bones"),
+        ],
+        default='POSE'
+    )
+    bpy.types.Scene.percentage_frame_start = bpy.props.IntProperty(name="Start", default=1)
+    bpy.types.Scene.percentage_frame_end = bpy.props.IntProperty(name="End", default=250)
+    bpy.types.Scene.percentage_scale_from_rest = BoolProperty(
+        name="Scale From Rest",
+        description="Scale the difference from 1 instead of multiplying the scale directly",
+        default=False,
+    )
+    
     # Properties
 
 
@@ -143,6 +297,10 @@ def unregister():
     bpy.utils.unregister_class(ApplyPercentageOperator)
 
     
+    del bpy.types.Scene.percentage_mode
+    del bpy.types.Scene.percentage_frame_start
+    del bpy.types.Scene.percentage_frame_end
+    del bpy.types.Scene.percentage_scale_from_rest
     del bpy.types.Scene.script_folder_path
     del bpy.types.Scene.set_keyframes
     del bpy.types.Scene.percentage_value
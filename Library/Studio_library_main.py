@@ -1,16 +1,33 @@
 import bpy
 import os
-from bpy.props import StringProperty, EnumProperty, BoolProperty
+from bpy.props import StringProperty, EnumProperty, BoolProperty, IntProperty, FloatProperty
 from bpy.utils import previews
-import re
 import sys
 import ctypes.wintypes
+from collections import OrderedDict
+
+# Root folder Raha Tools supaya modul bersama (Library, Core) bisa di-import
+_RAHA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _RAHA_ROOT not in sys.path:
+    sys.path.append(_RAHA_ROOT)
+
+from Core import bone_visibility
+from Library import catalog, clip_format, clip_import, content_store, pose_blob, preview_queue, retarget, thumbnails
 
 # Global variables
 _icons = None
 _video_paths = []
 preview_collections = {}
 
+# Entry katalog folder aktif (sebelum filter & paging)
+_library_root = ""
+_library_entries = []
+
+# Jumlah item per halaman dan batas icon yang disimpan di preview collection
+PAGE_SIZE = 40
+ICON_CACHE_SIZE = 200
+_icon_lru = OrderedDict()
+
 def normalize_path(path):
     """Convert any path to absolute, normalized path"""
     if not path:
@@ -50,39 +67,100 @@ def normalize_path(path):
     return os.path.abspath(os.path.normpath(path))
 
 def load_videos_from_path(path):
-    global _video_paths
-    _video_paths.clear()
+    global _library_root
+    _library_entries.clear()
+    _library_root = ""
     
     try:
         norm_path = normalize_path(path)
         if os.path.isdir(norm_path):
-            for file in os.listdir(norm_path):
-                if file.lower().endswith(('.mp4', '.avi', '.mkv', '.mov', '.png', '.jpg', '.jpeg')):
-                    full_path = os.path.join(norm_path, file)
-                    _video_paths.append((file, file, "", load_preview_icon(full_path)))
+            # Katalog incremental: hanya file yang berubah yang dibaca ulang
+            _library_entries.extend(catalog.scan(norm_path))
+            _library_root = norm_path
     except Exception as e:
         print(f"Error loading videos: {e}")
 
-def load_preview_icon(path):
-    global _icons
+    update_visible_items()
+
+def filtered_entries(scene):
+    filter_text = scene.sna_library_filter.strip().lower()
+    if not filter_text:
+        return _library_entries
+    return [entry for entry in _library_entries if filter_text in entry["name"].lower()]
+
+def page_count(scene):
+    return max((len(filtered_entries(scene)) + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+
+def update_visible_items():
+    """Isi enum hanya dengan halaman yang terlihat; icon dimuat untuk halaman ini saja."""
+    _video_paths.clear()
+    scene = bpy.context.scene
+    entries = filtered_entries(scene)
+    page = min(scene.sna_library_page, page_count(scene) - 1)
+    page_entries = entries[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+    # Thumbnail yang belum ada dibuat sekaligus per halaman di worker pool
+    thumbnails.request(_library_root, [entry["thumbnail"] for entry in page_entries if entry["thumbnail"]])
+    for entry in page_entries:
+        # Entry store tanpa thumbnail: preview masih dirender di background
+        icon = load_preview_icon(_library_root, entry["thumbnail"]) if entry["thumbnail"] else 0
+        _video_paths.append((entry["file"], entry["file"], "", icon))
+
+def load_preview_icon(root, file_name):
     try:
-        norm_path = normalize_path(path)
-        if norm_path not in _icons:
-            if os.path.exists(norm_path):
-                _icons.load(norm_path, norm_path, "IMAGE")
-            else:
-                return 0
-        return _icons[norm_path].icon_id
+        key = os.path.join(root, file_name)
+        if key in _icons:
+            _icon_lru.move_to_end(key)
+            return _icons[key].icon_id
+
+        thumb = thumbnails.cached_thumbnail(root, file_name)
+        if thumb is None:
+            # Thumbnail sedang dibuat di background, icon diisi saat siap
+            return 0
+        icon_path, icon_type = thumb
+        if not os.path.exists(icon_path):
+            return 0
+        _icons.load(key, icon_path, icon_type)
+        _icon_lru[key] = None
+
+        # Lepas icon yang paling lama tidak terlihat
+        while len(_icon_lru) > ICON_CACHE_SIZE:
+            old_key, _ = _icon_lru.popitem(last=False)
+            if old_key in _icons:
+                del _icons[old_key]
+        return _icons[key].icon_id
     except Exception as e:
         print(f"Error loading icon: {e}")
         return 0
 
+def release_preview_icon(root, file_name):
+    key = os.path.join(root, file_name)
+    _icon_lru.pop(key, None)
+    if key in _icons:
+        del _icons[key]
+
+def _on_thumbnails_ready(root, file_names):
+    if root != _library_root:
+        return
+    visible = {item[0] for item in _video_paths}
+    if visible.intersection(file_names):
+        update_visible_items()
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'VIEW_3D':
+                    area.tag_redraw()
+
 def sna_videos_enum_items(self, context):
     return [(item[0], item[1], item[2], item[3], i) for i, item in enumerate(_video_paths)]
 
+def sna_update_library_view(self, context):
+    if context.scene.sna_library_page >= page_count(context.scene):
+        context.scene.sna_library_page = 0
+    update_visible_items()
+
 def sna_update_custom_path(self, context):
     try:
         custom_path = normalize_path(bpy.context.scene.sna_custom_path)
+        context.scene.sna_library_page = 0
         load_videos_from_path(custom_path)
         if context.scene.sna_videos:
             context.scene.sna_selected_info = context.scene.sna_videos
@@ -91,6 +169,40 @@ def sna_update_custom_path(self, context):
     except Exception as e:
         print(f"Error updating path: {e}")
 
+def _on_preview_finished(job):
+    """Refresh list library setelah thumbnail hasil render background tersedia."""
+    scene = bpy.context.scene
+    custom_path = normalize_path(scene.sna_custom_path)
+    image_path = job.spec.get("image_path") or ""
+    library_root = job.spec.get("library_root") or os.path.dirname(image_path)
+    if custom_path and normalize_path(library_root) == custom_path:
+        # Icon lama (sebelum render selesai) harus dimuat ulang
+        release_preview_icon(custom_path, os.path.basename(image_path))
+        load_videos_from_path(custom_path)
+
+def selected_pose_blob(context):
+    """Blob pose untuk item library terpilih, atau None kalau item bukan pose .rpose."""
+    custom_path = normalize_path(context.scene.sna_custom_path)
+    entry = catalog.get_entry(custom_path, context.scene.sna_videos) if custom_path else None
+    if not entry or not (entry.get("data") or "").endswith(pose_blob.POSE_EXT):
+        return None
+    return pose_blob.load(os.path.join(custom_path, entry["data"]))
+
+def sna_update_pose_blend(self, context):
+    # Blend interaktif: blob di-cache, pose awal diambil sekali per sesi
+    obj = context.object
+    if not obj or obj.type != 'ARMATURE':
+        return
+    try:
+        blob = selected_pose_blob(context)
+        if blob is None:
+            return
+        bone_names = {pb.name for pb in (context.selected_pose_bones or []) if pb.id_data == obj}
+        if bone_names:
+            pose_blob.blend(obj, blob, bone_names, context.scene.sna_pose_blend / 100.0)
+    except Exception as e:
+        print(f"Error blending pose: {e}")
+
 class WM_OT_SelectBonesFromScript(bpy.types.Operator):
     """Select Auto Bones"""     
     bl_idname = "wm.select_bones_from_script"
@@ -101,27 +213,14 @@ class WM_OT_SelectBonesFromScript(bpy.types.Operator):
         try:
             selected_video = context.scene.sna_videos
             custom_path = normalize_path(context.scene.sna_custom_path)
-            video_name = os.path.splitext(selected_video)[0]
-            
-            anim_data_dir = os.path.join(custom_path, "ANIM_DATA")
-            data_pose_dir = os.path.join(custom_path, "DATA_POSE")
-            
-            script_path = None
-            for folder in [anim_data_dir, data_pose_dir]:
-                if os.path.exists(folder):
-                    temp_path = os.path.join(folder, f"{video_name}.py")
-                    if os.path.exists(temp_path):
-                        script_path = temp_path
-                        break
             
-            if not script_path:
+            # Daftar bone sudah ada di katalog, tidak perlu membaca file clip
+            entry = catalog.get_entry(custom_path, selected_video)
+            if entry is None or not entry.get("data"):
                 self.report({'ERROR'}, "Script not found!")
                 return {'CANCELLED'}
             
-            with open(script_path, 'r') as f:
-                content = f.read()
-            
-            bone_names = re.findall(r"armature_obj\.pose\.bones\[\'([^\']+)\'\]", content)
+            bone_names = entry.get("bones", [])
             if not bone_names:
                 self.report({'WARNING'}, "No bones found.")
                 return {'CANCELLED'}
@@ -134,11 +233,12 @@ class WM_OT_SelectBonesFromScript(bpy.types.Operator):
             bpy.ops.object.mode_set(mode='POSE')
             bpy.ops.pose.select_all(action='DESELECT')
             
+            # Nama bone library dipetakan ke rig aktif (retarget, dicache per rig)
+            bone_map = retarget.get_map(bone_names, [pb.name for pb in armature.pose.bones])
             selected = 0
-            for bone in bone_names:
-                if bone in armature.pose.bones:
-                    armature.pose.bones[bone].bone.select = True
-                    selected += 1
+            for bone in bone_map.values():
+                armature.pose.bones[bone].bone.select = True
+                selected += 1
             
             self.report({'INFO'}, f"Selected {selected} bones.")
             return {'FINISHED'}
@@ -158,6 +258,17 @@ class WM_OT_PlayVideo(bpy.types.Operator):
         custom_path = context.scene.sna_custom_path
         file_path = os.path.join(custom_path, selected_file)
 
+        # Entry di store content-addressed: video dicari lewat manifest
+        stored_video = content_store.resolve(normalize_path(custom_path), os.path.splitext(selected_file)[0], "video")
+        if stored_video:
+            if not os.path.exists(stored_video):
+                self.report({'WARNING'}, "Preview video is not available yet.")
+            elif os.name == 'nt':
+                os.startfile(stored_video)
+            else:
+                self.report({'ERROR'}, "This addon only works on Windows.")
+            return {'FINISHED'}
+
         # Check if the selected file is a video
         if selected_file.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')):
             if os.name == 'nt':
@@ -203,16 +314,7 @@ class WM_OT_ImportAnimation(bpy.types.Operator):
             custom_path = normalize_path(context.scene.sna_custom_path)
             file_name = os.path.splitext(selected)[0]
 
-            anim_data_dir = os.path.join(custom_path, "ANIM_DATA")
-            data_pose_dir = os.path.join(custom_path, "DATA_POSE")
-
-            script_path = None
-            for folder in [anim_data_dir, data_pose_dir]:
-                if os.path.exists(folder):
-                    temp_path = os.path.join(folder, f"{file_name}.py")
-                    if os.path.exists(temp_path):
-                        script_path = temp_path
-                        break
+            script_path = clip_format.find_clip_data(custom_path, file_name)
 
             if not script_path:
                 self.report({'ERROR'}, "Script not found!")
@@ -223,43 +325,26 @@ class WM_OT_ImportAnimation(bpy.types.Operator):
                 self.report({'ERROR'}, "No armature selected!")
                 return {'CANCELLED'}
 
-            arm = obj.data
-            hidden_bones = set()
-            hidden_collections = set()
-
-            if hasattr(arm, "collections_all"):
-                collections = arm.collections_all
-            else:
-                collections = arm.collections
-
-            # Simpan nama collection yang disembunyikan
-            for coll in collections:
-                if not coll.is_visible:
-                    hidden_collections.add(coll.name)
-
-            # Simpan nama bone yang di-hide secara langsung
-            for bone in arm.bones:
-                if bone.hide:
-                    hidden_bones.add(bone.name)
+            # Clip biner: tulis langsung ke F-Curve, tidak perlu exec script
+            if script_path.endswith(clip_format.CLIP_EXT):
+                return self.import_rclip(context, obj, script_path, custom_path, selected)
 
-            # Unhide semua collections
-            for coll in collections:
-                coll.is_visible = True
+            # Pose blob: tulis transform + key secara massal
+            if script_path.endswith(pose_blob.POSE_EXT):
+                bone_names = {pb.name for pb in (context.selected_pose_bones or []) if pb.id_data == obj}
+                count = pose_blob.apply(obj, pose_blob.load(script_path), bone_names,
+                                        factor=context.scene.sna_pose_blend / 100.0,
+                                        frame=context.scene.frame_current)
+                self.report({'INFO'}, f"Pose applied to {count} bones!")
+                return {'FINISHED'}
 
-            # Unhide semua bones
-            for bone in arm.bones:
-                bone.hide = False
+            if context.scene.sna_import_options:
+                self.report({'WARNING'}, "Import options are only supported for .rclip clips.")
 
-            # Jalankan script
-            with open(script_path, 'r') as f:
-                exec(f.read(), {'__name__': '__main__'})
-
-            # Restore kondisi tulang
-            for bone in arm.bones:
-                bone.hide = (bone.name in hidden_bones)
-
-            for coll in collections:
-                coll.is_visible = (coll.name not in hidden_collections)
+            # Script lama memakai operator keyframe_insert: bone harus terlihat
+            with bone_visibility.revealed(obj.data):
+                with open(script_path, 'r') as f:
+                    exec(f.read(), {'__name__': '__main__'})
 
             self.report({'INFO'}, "Animation imported!")
             return {'FINISHED'}
@@ -268,6 +353,35 @@ class WM_OT_ImportAnimation(bpy.types.Operator):
             self.report({'ERROR'}, f"Error: {str(e)}")
             return {'CANCELLED'}
 
+    def import_rclip(self, context, obj, clip_path, custom_path, selected):
+        scene = context.scene
+        selected_bones = {pb.name for pb in (context.selected_pose_bones or []) if pb.id_data == obj}
+
+        kwargs = {}
+        bone_names = selected_bones
+        if scene.sna_import_options:
+            if scene.sna_import_bone_filter.strip():
+                entry = catalog.get_entry(custom_path, selected)
+                clip_bones = entry["bones"] if entry else clip_format.read_clip_header(clip_path).get("bones", [])
+                # Filter dicocokkan ke nama bone rig tujuan (setelah retarget)
+                bone_map = retarget.get_map(clip_bones, [pb.name for pb in obj.pose.bones])
+                bone_names = clip_import.match_bones(bone_map.values(), scene.sna_import_bone_filter)
+                if selected_bones:
+                    bone_names &= selected_bones
+            if scene.sna_import_use_range:
+                kwargs["frame_range"] = (scene.sna_import_frame_start,
+                                         max(scene.sna_import_frame_start, scene.sna_import_frame_end))
+            kwargs["time_offset"] = scene.sna_import_time_offset
+            kwargs["time_scale"] = scene.sna_import_time_scale
+
+        if not bone_names:
+            self.report({'WARNING'}, "No bones to import (select bones or set a bone filter).")
+            return {'CANCELLED'}
+
+        count = clip_import.import_clip(context, clip_path, armature_obj=obj, bone_names=bone_names, **kwargs)
+        self.report({'INFO'}, f"Animation imported! ({count} keys)")
+        return {'FINISHED'}
+
 
 
 class WM_OT_RefreshList(bpy.types.Operator):
@@ -304,9 +418,21 @@ class WM_OT_DeleteVideo(bpy.types.Operator):
             video_path = os.path.join(custom_path, selected)
             video_name = os.path.splitext(selected)[0]
             
+            # Entry store: hapus dari manifest, blob yang tidak dirujuk ikut dihapus
+            removed = content_store.delete(custom_path, video_name)
+            if removed is not None:
+                for rel_path in removed:
+                    release_preview_icon(custom_path, rel_path)
+                    thumbnails.remove_thumbnail(custom_path, rel_path)
+                load_videos_from_path(custom_path)
+                self.report({'INFO'}, "Deleted successfully!")
+                return {'FINISHED'}
+            
             # Delete main file
             if os.path.exists(video_path):
                 os.remove(video_path)
+            release_preview_icon(custom_path, selected)
+            thumbnails.remove_thumbnail(custom_path, selected)
             
             # Delete related files
             for folder in ["ANIM_DATA", "DATA_POSE", "preview"]:
@@ -348,9 +474,21 @@ class WM_OT_RenameVideo(bpy.types.Operator):
             
             new_path = os.path.join(custom_path, self.new_name + file_ext)
             
+            # Entry store: rename cukup mengubah key manifest
+            if content_store.get(custom_path, file_name) is not None:
+                if content_store.get(custom_path, self.new_name) is not None:
+                    self.report({'ERROR'}, f"'{self.new_name}' already exists!")
+                    return {'CANCELLED'}
+                content_store.rename(custom_path, file_name, self.new_name)
+                load_videos_from_path(custom_path)
+                self.report({'INFO'}, "Renamed successfully!")
+                return {'FINISHED'}
+            
             # Rename main file
             if os.path.exists(old_path):
                 os.rename(old_path, new_path)
+            release_preview_icon(custom_path, selected)
+            thumbnails.remove_thumbnail(custom_path, selected)
             
             # Rename related files
             for folder in ["ANIM_DATA", "DATA_POSE", "preview"]:
@@ -370,6 +508,47 @@ class WM_OT_RenameVideo(bpy.types.Operator):
             self.report({'ERROR'}, f"Error: {str(e)}")
             return {'CANCELLED'}
 
+class WM_OT_LibraryPage(bpy.types.Operator):
+    """Library Page"""
+    bl_idname = "wm.library_page"
+    bl_label = "Library Page"
+    bl_description = "Show previous/next page of the library"
+
+    step: IntProperty(default=1)
+
+    def execute(self, context):
+        scene = context.scene
+        page = max(0, min(scene.sna_library_page + self.step, page_count(scene) - 1))
+        if page != scene.sna_library_page:
+            scene.sna_library_page = page
+        return {'FINISHED'}
+
+class WM_OT_CancelPreviewJob(bpy.types.Operator):
+    """Cancel Preview Render"""
+    bl_idname = "wm.cancel_preview_job"
+    bl_label = "Cancel Preview"
+    bl_description = "Cancel background preview render"
+
+    job_id: bpy.props.IntProperty()
+
+    def execute(self, context):
+        job = preview_queue.cancel(self.job_id)
+        if job is None:
+            self.report({'WARNING'}, "Preview job not found.")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Preview '{job.name}' cancelled.")
+        return {'FINISHED'}
+
+class WM_OT_ClearPreviewJobs(bpy.types.Operator):
+    """Clear Finished Preview Jobs"""
+    bl_idname = "wm.clear_preview_jobs"
+    bl_label = "Clear Finished"
+    bl_description = "Remove finished preview jobs from the list"
+
+    def execute(self, context):
+        preview_queue.clear_finished()
+        return {'FINISHED'}
+
 class FLOATING_OT_Open_Export_Animation(bpy.types.Operator):
     bl_idname = "floating.open_export_animation"
     bl_label = "Open Export Panel"
@@ -395,9 +574,18 @@ class VIDEO_PT_Browser(bpy.types.Panel):
 
         layout.separator()
 
+        layout.prop(scene, 'sna_library_filter', text="", icon='VIEWZOOM')
+
         box = layout.box()
         box.template_icon_view(scene, 'sna_videos', show_labels=True, scale=5.0)
 
+        pages = page_count(scene)
+        if pages > 1:
+            row = box.row(align=True)
+            row.operator("wm.library_page", text="", icon='TRIA_LEFT').step = -1
+            row.label(text=f"Page {min(scene.sna_library_page, pages - 1) + 1}/{pages}")
+            row.operator("wm.library_page", text="", icon='TRIA_RIGHT').step = 1
+
         if scene.sna_videos:
             file_name, _ = os.path.splitext(scene.sna_videos)
             box.label(text=f"📝{file_name}",)
@@ -420,6 +608,47 @@ class VIDEO_PT_Browser(bpy.types.Panel):
         row2.operator("wm.import_animation", text="Import", icon='IMPORT')
         row2.operator("floating.open_export_animation", text="Export", icon='EXPORT')
 
+        # Slider blend pose dari pose saat ini ke pose library
+        entry = catalog.get_entry(_library_root, scene.sna_videos) if _library_root and scene.sna_videos else None
+        if entry and (entry.get("data") or "").endswith(pose_blob.POSE_EXT):
+            layout.prop(scene, "sna_pose_blend", text="Pose Blend", slider=True)
+
+        # Opsi import sebagian (hanya untuk clip .rclip)
+        layout.prop(scene, "sna_import_options", text="Import Options")
+        if scene.sna_import_options:
+            box = layout.box()
+            box.prop(scene, "sna_import_bone_filter", text="Bones", icon='BONE_DATA')
+            row = box.row(align=True)
+            row.prop(scene, "sna_import_use_range", text="")
+            sub = row.row(align=True)
+            sub.enabled = scene.sna_import_use_range
+            sub.prop(scene, "sna_import_frame_start", text="Start")
+            sub.prop(scene, "sna_import_frame_end", text="End")
+            row = box.row(align=True)
+            row.prop(scene, "sna_import_time_offset", text="Offset")
+            row.prop(scene, "sna_import_time_scale", text="Scale")
+
+        # Antrian render preview di background
+        jobs = preview_queue.jobs()
+        if jobs:
+            box = layout.box()
+            row = box.row()
+            row.label(text="Preview Render", icon='RENDER_ANIMATION')
+            row.operator("wm.clear_preview_jobs", text="", icon='X')
+            for job in jobs:
+                row = box.row(align=True)
+                if job.status == 'RUNNING':
+                    row.label(text=f"{job.name}: {int(job.progress * 100)}%", icon='TIME')
+                elif job.status == 'QUEUED':
+                    row.label(text=f"{job.name}: queued", icon='SORTTIME')
+                elif job.status == 'DONE':
+                    row.label(text=f"{job.name}: done", icon='CHECKMARK')
+                else:
+                    row.label(text=f"{job.name}: {job.status.lower()}", icon='ERROR')
+                if job.is_active:
+                    op = row.operator("wm.cancel_preview_job", text="", icon='CANCEL')
+                    op.job_id = job.id
+
         layout.separator()
 
 
@@ -434,6 +663,12 @@ class VIDEO_PT_Browser(bpy.types.Panel):
             row = layout.row()
             row.prop(context.scene, "percentage_value", text="Percentage (%)")
             row = layout.row()
+            row.prop(context.scene, "percentage_mode", text="")
+            if context.scene.percentage_mode == 'RANGE':
+                row = layout.row(align=True)
+                row.prop(context.scene, "percentage_frame_start", text="Start")
+                row.prop(context.scene, "percentage_frame_end", text="End")
+            row = layout.row()
             row.operator("pose.apply_percentage", text="Apply Percentage")
             row = layout.row()
 
@@ -442,6 +677,8 @@ class VIDEO_PT_Browser(bpy.types.Panel):
             row.prop(context.scene, "calc_rotation", text="Rotation")
             row.prop(context.scene, "calc_scale", text="Scale")
             row.prop(context.scene, "calc_custom_property", text="Custom Properties")
+            if context.scene.calc_scale:
+                layout.prop(context.scene, "percentage_scale_from_rest")
             layout.operator("object.flip_pose", text="Flip Pose")
 
 
@@ -473,6 +710,65 @@ def register():
         default=False
     )
     
+    bpy.types.Scene.sna_library_filter = StringProperty(
+        name="Filter",
+        description="Show only clips whose name contains this text",
+        default="",
+        options={'TEXTEDIT_UPDATE'},
+        update=sna_update_library_view
+    )
+    
+    bpy.types.Scene.sna_library_page = IntProperty(
+        name="Page",
+        default=0,
+        min=0,
+        update=sna_update_library_view
+    )
+    
+    bpy.types.Scene.sna_pose_blend = FloatProperty(
+        name="Pose Blend",
+        description="Blend from the current pose to the library pose (Import keys the blended pose)",
+        default=100.0,
+        min=0.0,
+        max=100.0,
+        subtype='PERCENTAGE',
+        update=sna_update_pose_blend
+    )
+    
+    bpy.types.Scene.sna_import_options = BoolProperty(
+        name="Import Options",
+        description="Import only part of the clip (frame range, bones) with time offset/scale",
+        default=False
+    )
+    
+    bpy.types.Scene.sna_import_bone_filter = StringProperty(
+        name="Bone Filter",
+        description="Comma separated bone name patterns, e.g. hand*, finger*.L",
+        default=""
+    )
+    
+    bpy.types.Scene.sna_import_use_range = BoolProperty(
+        name="Use Frame Range",
+        description="Import only keys inside this frame range of the clip",
+        default=False
+    )
+    
+    bpy.types.Scene.sna_import_frame_start = IntProperty(name="Clip Start", default=1)
+    bpy.types.Scene.sna_import_frame_end = IntProperty(name="Clip End", default=250)
+    
+    bpy.types.Scene.sna_import_time_offset = FloatProperty(
+        name="Time Offset",
+        description="Extra frame offset applied after the clip is placed at the current frame",
+        default=0.0
+    )
+    
+    bpy.types.Scene.sna_import_time_scale = FloatProperty(
+        name="Time Scale",
+        description="Stretch (>1) or compress (<1) the imported keys in time",
+        default=1.0,
+        min=0.01
+    )
+    
     classes = [
         WM_OT_SelectBonesFromScript,
         WM_OT_PlayVideo,
@@ -480,6 +776,9 @@ def register():
         WM_OT_RefreshList,
         WM_OT_DeleteVideo,
         WM_OT_RenameVideo,
+        WM_OT_LibraryPage,
+        WM_OT_CancelPreviewJob,
+        WM_OT_ClearPreviewJobs,
         FLOATING_OT_Open_Export_Animation,
         VIDEO_PT_Browser
     ]
@@ -487,9 +786,13 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
 
+    preview_queue.finished_callbacks["studio_library"] = _on_preview_finished
+    thumbnails.ready_callbacks["studio_library"] = _on_thumbnails_ready
+
 def unregister():
     global _icons
     previews.remove(_icons)
+    _icon_lru.clear()
     
     classes = [
         WM_OT_SelectBonesFromScript,
@@ -498,17 +801,34 @@ def unregister():
         WM_OT_RefreshList,
         WM_OT_DeleteVideo,
         WM_OT_RenameVideo,
+        WM_OT_LibraryPage,
+        WM_OT_CancelPreviewJob,
+        WM_OT_ClearPreviewJobs,
         FLOATING_OT_Open_Export_Animation,
         VIDEO_PT_Browser
     ]
     
     for cls in classes:
         bpy.utils.unregister_class(cls)
+
+    preview_queue.finished_callbacks.pop("studio_library", None)
+    thumbnails.ready_callbacks.pop("studio_library", None)
+    thumbnails.shutdown()
     
     del bpy.types.Scene.sna_custom_path
     del bpy.types.Scene.sna_videos
     del bpy.types.Scene.sna_selected_info
     del bpy.types.Scene.show_precentage_value_pose
+    del bpy.types.Scene.sna_library_filter
+    del bpy.types.Scene.sna_library_page
+    del bpy.types.Scene.sna_pose_blend
+    del bpy.types.Scene.sna_import_options
+    del bpy.types.Scene.sna_import_bone_filter
+    del bpy.types.Scene.sna_import_use_range
+    del bpy.types.Scene.sna_import_frame_start
+    del bpy.types.Scene.sna_import_frame_end
+    del bpy.types.Scene.sna_import_time_offset
+    del bpy.types.Scene.sna_import_time_scale
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
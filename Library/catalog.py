@@ -0,0 +1,223 @@
+"""
+Katalog Studio Library per folder library.
+
+Isi folder (file lama di root + entry manifest content_store) disimpan di
+file `.raha_catalog.json` di root library: nama, mtime, ukuran, daftar bone,
+frame range dan path thumbnail setiap clip. Saat folder dibuka, katalog
+diperbarui secara incremental dengan os.scandir: hanya file yang
+mtime/ukurannya berubah yang dibaca ulang, sehingga library besar di folder
+share tetap terbuka instan. Semua path di katalog relatif terhadap root
+supaya sama untuk semua komputer yang memakai library itu.
+"""
+
+import json
+import os
+import re
+
+from Library import clip_format, content_store, pose_blob
+
+CATALOG_NAME = ".raha_catalog.json"
+CATALOG_VERSION = 1
+
+MEDIA_EXTS = ('.mp4', '.avi', '.mkv', '.mov', '.png', '.jpg', '.jpeg')
+DATA_FOLDERS = ("ANIM_DATA", "DATA_POSE")
+
+_METADATA_KEYS = ("bones", "frame_start", "frame_end")
+
+_LEGACY_BONE_RE = re.compile(r"armature_obj\.pose\.bones\[\'([^\']+)\'\]")
+_LEGACY_FRAME_RE = re.compile(r"^# Frame (-?\d+)", re.MULTILINE)
+
+# Cache di memori: root -> dict katalog (isi file .raha_catalog.json)
+_catalogs = {}
+
+
+def _stat_key(stat):
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _scan_data_files(root):
+    """
+    Peta nama clip -> (path relatif, [mtime, size]) dari ANIM_DATA/DATA_POSE,
+    dengan prioritas yang sama seperti clip_format.find_clip_data.
+    """
+    found = {}
+    for ext in (clip_format.CLIP_EXT, clip_format.POSE_EXT, ".py"):
+        for folder in DATA_FOLDERS:
+            folder_path = os.path.join(root, folder)
+            try:
+                entries = list(os.scandir(folder_path))
+            except OSError:
+                continue
+            for entry in entries:
+                name, file_ext = os.path.splitext(entry.name)
+                if file_ext.lower() != ext or name in found or not entry.is_file():
+                    continue
+                found[name] = (f"{folder}/{entry.name}", _stat_key(entry.stat()))
+    return found
+
+
+def _read_metadata(filepath):
+    """Bone dan frame range dari file data clip (header .rclip/.rpose atau script .py lama)."""
+    if filepath.endswith(clip_format.CLIP_EXT):
+        header = clip_format.read_clip_header(filepath)
+        return {
+            "bones": header.get("bones", []),
+            "frame_start": header.get("frame_start"),
+            "frame_end": header.get("frame_end"),
+        }
+
+    if filepath.endswith(clip_format.POSE_EXT):
+        # Frame sumber pose tidak ada di blob (hanya di "info" manifest)
+        header = pose_blob.read_pose_header(filepath)
+        return {"bones": header.get("bones", [])}
+
+    with open(filepath, 'r', errors="replace") as f:
+        content = f.read()
+    bones = list(dict.fromkeys(_LEGACY_BONE_RE.findall(content)))
+    frames = [int(f) for f in _LEGACY_FRAME_RE.findall(content)]
+    return {
+        "bones": bones,
+        "frame_start": min(frames) if frames else None,
+        "frame_end": max(frames) if frames else None,
+    }
+
+
+def _load_file(root):
+    try:
+        with open(os.path.join(root, CATALOG_NAME), 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != CATALOG_VERSION or not isinstance(data.get("entries"), dict):
+        return None
+    return data
+
+
+def _save_file(root, data):
+    path = os.path.join(root, CATALOG_NAME)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # Library read-only tetap bisa dipakai, katalog hanya tidak tersimpan
+        print(f"Catalog tidak bisa disimpan: {e}")
+
+
+def scan(root):
+    """
+    Perbarui katalog root secara incremental dan kembalikan daftar entry
+    (dict) terurut nama. Entry: name, file, thumbnail, data, bones,
+    frame_start, frame_end, mtime, size.
+    """
+    data = _catalogs.get(root) or _load_file(root) or {"version": CATALOG_VERSION, "entries": {}}
+    old_entries = data["entries"]
+    entries = {}
+    changed = False
+
+    try:
+        media = [entry for entry in os.scandir(root)
+                 if entry.name.lower().endswith(MEDIA_EXTS) and entry.is_file()]
+    except OSError as e:
+        print(f"Error scanning library: {e}")
+        return []
+
+    data_files = _scan_data_files(root)
+
+    for entry in media:
+        stat = _stat_key(entry.stat())
+        name = os.path.splitext(entry.name)[0]
+        data_rel, data_stat = data_files.get(name, (None, None))
+
+        cached = old_entries.get(entry.name)
+        if (cached and [cached["mtime"], cached["size"]] == stat
+                and cached.get("data") == data_rel and cached.get("data_stat") == data_stat):
+            entries[entry.name] = cached
+            continue
+
+        item = {
+            "name": name,
+            "file": entry.name,
+            "thumbnail": entry.name,
+            "mtime": stat[0],
+            "size": stat[1],
+            "data": data_rel,
+            "data_stat": data_stat,
+            "bones": [],
+            "frame_start": None,
+            "frame_end": None,
+        }
+        if data_rel:
+            try:
+                item.update(_read_metadata(os.path.join(root, data_rel)))
+            except (OSError, ValueError) as e:
+                print(f"Error reading clip data {data_rel}: {e}")
+        entries[entry.name] = item
+        changed = True
+
+    # Entry di store content-addressed (manifest) menimpa file lama bernama sama.
+    # Blob tidak pernah berubah isi, jadi metadata cukup dibaca sekali per blob.
+    by_data = {item.get("data"): item for item in old_entries.values() if item.get("stored")}
+    for name, record in content_store.load_manifest(root).items():
+        file_name = name + ".png"
+        data_rel = record.get("data")
+        item = {
+            "name": name,
+            "file": file_name,
+            "thumbnail": record.get("image"),
+            "video": record.get("video"),
+            "stored": True,
+            "mtime": None,
+            "size": None,
+            "data": data_rel,
+            "data_stat": None,
+            "info": record.get("info", {}),
+            "bones": [],
+            "frame_start": None,
+            "frame_end": None,
+        }
+        cached = old_entries.get(file_name)
+        if cached and cached.get("stored") and all(cached.get(key) == item[key]
+                                                   for key in ("data", "thumbnail", "video", "info")):
+            entries[file_name] = cached
+            continue
+
+        known = by_data.get(data_rel)
+        if known:
+            item.update({key: known.get(key) for key in _METADATA_KEYS})
+        elif data_rel:
+            try:
+                item.update(_read_metadata(os.path.join(root, data_rel)))
+            except (OSError, ValueError) as e:
+                print(f"Error reading clip data {data_rel}: {e}")
+        # Blob pose identik bisa dipakai beberapa entry: frame sumber per entry
+        frame = item["info"].get("frame")
+        if frame is not None:
+            item["frame_start"] = item["frame_end"] = frame
+        entries[file_name] = item
+        changed = True
+
+    if changed or len(entries) != len(old_entries):
+        data = {"version": CATALOG_VERSION, "entries": entries}
+        _save_file(root, data)
+    else:
+        data["entries"] = entries
+    _catalogs[root] = data
+
+    return sorted(entries.values(), key=lambda item: item["file"].lower())
+
+
+def get_entry(root, file_name):
+    """Entry katalog untuk satu file library (scan dulu kalau root belum dimuat)."""
+    if root not in _catalogs:
+        scan(root)
+    return _catalogs.get(root, {}).get("entries", {}).get(file_name)
+
+
+def invalidate(root=None):
+    """Buang cache memori; scan berikutnya tetap incremental dari file katalog."""
+    if root is None:
+        _catalogs.clear()
+    else:
+        _catalogs.pop(root, None)
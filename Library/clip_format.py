@@ -0,0 +1,212 @@
+"""
+Format clip animasi biner (.rclip) untuk Studio Library.
+
+Layout file (little-endian):
+    [0:12]   magic b"RRCL", versi (uint16), flags (uint16), panjang header (uint32)
+    [12:..]  header JSON utf-8 (info clip + daftar channel), di-pad ke kelipatan 16 byte
+    [data]   blok per channel: float32 array (count, 2) berisi pasangan (frame, value),
+             setiap blok mulai di offset kelipatan 16 byte
+
+Offset channel di header relatif terhadap awal bagian data, sehingga setiap
+channel bisa dibaca langsung lewat mmap + numpy tanpa mem-parse file lain.
+Modul ini tidak bergantung pada bpy.
+"""
+
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from Library import content_store
+
+CLIP_EXT = ".rclip"
+# Pose library (Library/pose_blob.py)
+POSE_EXT = ".rpose"
+CLIP_MAGIC = b"RRCL"
+CLIP_VERSION = 1
+
+_PREAMBLE = struct.Struct("<4sHHI")
+_ALIGN = 16
+_KEY_DTYPE = np.dtype("<f4")
+
+
+def _align(size):
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def channel_data_path(bone_name, path):
+    """Gabungkan nama bone + path channel menjadi data_path F-Curve."""
+    if path.startswith("["):
+        return f'pose.bones["{bone_name}"]{path}'
+    return f'pose.bones["{bone_name}"].{path}'
+
+
+#============================== WRITE ==============================
+def write_clip(filepath, channels, **info):
+    """
+    Tulis clip ke filepath.
+
+    channels: list of dict {"bone", "path", "index", "keys"} dengan keys berupa
+    array (n, 2) frame/value. Key tambahan (mis. "type" untuk custom property)
+    ikut disimpan di header. info: metadata clip (frame_start, frame_end, ...);
+    identitas seperti armature / fps disimpan di manifest content_store supaya
+    clip identik tetap menghasilkan blob yang sama.
+    """
+    entries = []
+    blocks = []
+    offset = 0
+    bones = []
+
+    for channel in channels:
+        keys = np.asarray(channel["keys"], dtype=_KEY_DTYPE).reshape(-1, 2)
+        # Key diurutkan per frame supaya pembaca bisa binary search rentang frame
+        keys = np.ascontiguousarray(keys[np.argsort(keys[:, 0], kind="stable")])
+        entry = {k: v for k, v in channel.items() if k != "keys"}
+        entry["count"] = int(keys.shape[0])
+        entry["offset"] = offset
+        entries.append(entry)
+        blocks.append(keys)
+        offset = _align(offset + keys.nbytes)
+        if channel["bone"] not in bones:
+            bones.append(channel["bone"])
+
+    header = dict(info)
+    header["version"] = CLIP_VERSION
+    header["bones"] = bones
+    header["channels"] = entries
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header_bytes))
+    header_bytes += b" " * (data_start - _PREAMBLE.size - len(header_bytes))
+
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(CLIP_MAGIC, CLIP_VERSION, 0, len(header_bytes)))
+        f.write(header_bytes)
+        for entry, keys in zip(entries, blocks):
+            f.seek(data_start + entry["offset"])
+            f.write(keys.tobytes())
+        # Pastikan ukuran file sampai akhir blok terakhir (padding)
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, filepath)
+    return filepath
+
+
+#============================== READ ==============================
+def read_clip_header(filepath):
+    """Baca hanya header JSON clip (tanpa menyentuh data keyframe)."""
+    with open(filepath, "rb") as f:
+        magic, version, _flags, header_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != CLIP_MAGIC:
+            raise ValueError(f"Bukan file clip Raha: {filepath}")
+        if version > CLIP_VERSION:
+            raise ValueError(f"Versi clip {version} belum didukung")
+        header = json.loads(f.read(header_size).decode("utf-8"))
+    header["data_start"] = _PREAMBLE.size + header_size
+    return header
+
+
+def _sample(view, i, frame, channel):
+    """Key (1, 2) di frame, di antara view[i - 1] dan view[i]."""
+    (f0, v0), (f1, v1) = view[i - 1], view[i]
+    if channel.get("type") in ("bool", "int"):
+        # Property diskrit: tahan nilai key sebelumnya (seperti key CONSTANT)
+        value = v0
+    else:
+        value = v0 + (v1 - v0) * (frame - f0) / (f1 - f0)
+    return np.array([[frame, value]], dtype=_KEY_DTYPE)
+
+
+class ClipReader:
+    """
+    Pembaca clip berbasis mmap. Dipakai sebagai context manager supaya file
+    ditutup lagi (penting di Windows sebelum rename / delete).
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.header = read_clip_header(filepath)
+        self._data_start = self.header["data_start"]
+        self._file = open(filepath, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def bones(self):
+        return self.header.get("bones", [])
+
+    @property
+    def channels(self):
+        return self.header.get("channels", [])
+
+    def read(self, channel, frame_range=None):
+        """
+        Kembalikan salinan array (n, 2) frame/value untuk satu channel.
+        frame_range=(start, end): hanya key di rentang itu yang disalin; batas
+        dicari dengan binary search langsung di mmap sehingga blok lain tidak
+        pernah dibaca dari disk. Kalau start / end jatuh di antara dua key,
+        nilai di batas itu di-sample dari key tetangganya dan ditambahkan
+        sebagai key pertama / terakhir, jadi potongan tetap lengkap meskipun
+        rentangnya lebih pendek dari jarak antar key.
+        """
+        count = channel["count"]
+        if not count:
+            return np.empty((0, 2), dtype=_KEY_DTYPE)
+        view = np.frombuffer(self._mm, dtype=_KEY_DTYPE, count=count * 2,
+                             offset=self._data_start + channel["offset"]).reshape(count, 2)
+        if frame_range is None:
+            # Salin supaya mmap bisa ditutup tanpa BufferError
+            return view.copy()
+
+        start, end = frame_range
+        frames = view[:, 0]
+        lo = int(np.searchsorted(frames, start, side="left"))
+        hi = int(np.searchsorted(frames, end, side="right"))
+        keys = [view[lo:hi]]
+        # Batas yang tidak tepat di key dan punya key di kedua sisinya
+        if 0 < lo < count and frames[lo] != start:
+            keys.insert(0, _sample(view, lo, start, channel))
+        if 0 < hi < count and frames[hi - 1] != end:
+            keys.append(_sample(view, hi, end, channel))
+        return np.concatenate(keys)
+
+    def iter_channels(self, bones=None, frame_range=None):
+        """Yield (channel, keys) untuk semua channel, atau hanya bone tertentu."""
+        for channel in self.channels:
+            if bones is not None and channel["bone"] not in bones:
+                continue
+            yield channel, self.read(channel, frame_range)
+
+
+#============================== LIBRARY LOOKUP ==============================
+def find_clip_data(library_root, name):
+    """
+    Cari file data clip: store content-addressed (manifest) dulu, lalu
+    ANIM_DATA / DATA_POSE. File .rclip / .rpose diutamakan, script .py lama
+    dipakai sebagai fallback. Kembalikan path atau None.
+    """
+    stored = content_store.resolve(library_root, name, "data")
+    if stored and os.path.exists(stored):
+        return stored
+    for ext in (CLIP_EXT, POSE_EXT, ".py"):
+        for folder in ("ANIM_DATA", "DATA_POSE"):
+            path = os.path.join(library_root, folder, name + ext)
+            if os.path.exists(path):
+                return path
+    return None
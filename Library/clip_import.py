@@ -0,0 +1,91 @@
+"""
+Import clip .rclip ke armature: setiap channel ditulis langsung ke F-Curve
+action armature secara massal (keyframe_points.add + foreach_set), tanpa
+exec() script dan tanpa scene.frame_set(). Hanya blok channel yang
+dibutuhkan (bone & rentang frame) yang dibaca dari file.
+"""
+
+from fnmatch import fnmatchcase
+
+from Core import fcurve_writer
+from Library import clip_format, retarget
+
+
+def _ensure_custom_prop(pose_bone, channel, first_value):
+    """Buat custom property di bone tujuan kalau belum ada (seperti script lama)."""
+    prop_name = channel["path"][2:-2]
+    if prop_name in pose_bone.keys():
+        return
+    typ = channel.get("type")
+    if typ == "bool":
+        pose_bone[prop_name] = bool(first_value)
+    elif typ == "int":
+        pose_bone[prop_name] = int(first_value)
+    else:
+        pose_bone[prop_name] = float(first_value)
+
+
+def match_bones(bone_names, patterns):
+    """
+    Filter nama bone dengan pola wildcard dipisah koma, tanpa membedakan huruf
+    besar/kecil. Contoh: "hand*, finger*.L".
+    """
+    patterns = [p.strip().lower() for p in patterns.split(",") if p.strip()]
+    if not patterns:
+        return set(bone_names)
+    return {name for name in bone_names
+            if any(fnmatchcase(name.lower(), pattern) for pattern in patterns)}
+
+
+def import_clip(context, filepath, armature_obj=None, bone_names=None, frame_offset=None,
+                frame_range=None, time_offset=0.0, time_scale=1.0):
+    """
+    Terapkan clip ke armature. Default mengikuti perilaku script lama:
+    armature dari bone terpilih, hanya bone terpilih, dan frame pertama clip
+    diletakkan di frame saat ini. Nama bone clip dipetakan ke rig tujuan lewat
+    retarget; bone_names berisi nama bone rig tujuan. Kembalikan jumlah
+    keyframe yang ditulis.
+
+    frame_range=(start, end) hanya mengimpor key di rentang frame clip itu;
+    frame awal rentang menjadi titik jangkar. time_scale meregangkan waktu
+    dari titik jangkar, time_offset menggeser hasil (dalam frame).
+    """
+    if armature_obj is None:
+        selected = context.selected_pose_bones or []
+        if not selected:
+            return 0
+        armature_obj = selected[0].id_data
+        if bone_names is None:
+            bone_names = {pb.name for pb in selected}
+
+    with clip_format.ClipReader(filepath) as reader:
+        anchor = frame_range[0] if frame_range is not None else reader.header.get("frame_start", 0)
+        if frame_offset is None:
+            frame_offset = context.scene.frame_current - anchor
+        frame_offset += time_offset
+
+        action = fcurve_writer.ensure_action(armature_obj)
+        pose_bones = armature_obj.pose.bones
+        written = 0
+
+        # Nama bone clip -> bone rig tujuan (dicache per pasangan rig)
+        bone_map = retarget.get_map(reader.bones, [pb.name for pb in pose_bones])
+        sources = {source for source, target in bone_map.items()
+                   if bone_names is None or target in bone_names}
+
+        for channel, keys in reader.iter_channels(bones=sources, frame_range=frame_range):
+            pose_bone = pose_bones.get(bone_map[channel["bone"]])
+            if pose_bone is None or not len(keys):
+                continue
+            if channel["path"].startswith('["'):
+                _ensure_custom_prop(pose_bone, channel, keys[0, 1])
+
+            frames = anchor + (keys[:, 0] - anchor) * time_scale + frame_offset
+            data_path = clip_format.channel_data_path(pose_bone.name, channel["path"])
+            written += fcurve_writer.write_channel(
+                action, data_path, channel["index"],
+                frames, keys[:, 1],
+                group_name=pose_bone.name,
+            )
+
+    return written
@@ -0,0 +1,292 @@
+"""
+Penyimpanan content-addressed untuk Studio Library.
+
+Data clip (.rclip/.rpose), video preview dan screenshot disimpan sekali per
+isi file di `<library>/.store/<2 huruf hash>/<sha256><ext>`. Nama clip hanya
+ada di manifest `<library>/.raha_manifest.json`:
+
+    {"version": 1, "entries": {"walk": {"id": "3f2a...",
+                                        "data": ".store/ab/ab12...rclip",
+                                        "image": ".store/...png",
+                                        "video": ".store/...mp4",
+                                        "info": {"armature": "Rig", "fps": 24.0}}}}
+
+Hash hanya mencakup data pose/clip; metadata identitas (armature asal, fps)
+disimpan di "info" entry manifest, bukan di blob. "id" dibuat ulang setiap
+export data, jadi preview yang selesai di background tetap menemukan entry-nya
+meskipun sudah di-rename (dan dibuang kalau entry sudah dihapus / ditimpa).
+
+Rename = edit satu key manifest, pose/clip identik dari animator berbeda
+hanya disimpan sekali, dan blob yang tidak lagi dirujuk dihapus saat entry
+dihapus/ditimpa. Manifest dibaca ulang tepat sebelum ditulis (lalu
+os.replace) supaya jendela tabrakan di library share sekecil mungkin.
+File lama (ANIM_DATA / DATA_POSE / Preview / PNG di root) tetap dibaca
+sebagai fallback. Modul ini tidak bergantung pada bpy.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+
+STORE_DIR = ".store"
+STAGING_DIR = "tmp"
+MANIFEST_NAME = ".raha_manifest.json"
+MANIFEST_VERSION = 1
+
+FILE_KINDS = ("data", "image", "video")
+
+_HASH_CHUNK = 1 << 20
+
+# root -> (mtime_ns, entries)
+_manifests = {}
+
+
+class ManifestError(Exception):
+    """Manifest ada tapi tidak bisa dibaca (rusak / versi lain); jangan ditimpa."""
+
+
+def hash_file(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def staging_path(root, name, ext):
+    """Path sementara di dalam store (filesystem sama, jadi put() cukup rename)."""
+    folder = os.path.join(root, STORE_DIR, STAGING_DIR)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"{name}-{uuid.uuid4().hex[:8]}{ext}")
+
+
+def put(root, src_path):
+    """
+    Pindahkan src_path ke store berdasarkan hash isinya. Kalau blob yang sama
+    sudah ada, src_path dihapus saja. Kembalikan path relatif blob.
+    """
+    digest = hash_file(src_path)
+    ext = os.path.splitext(src_path)[1].lower()
+    rel_path = f"{STORE_DIR}/{digest[:2]}/{digest}{ext}"
+    target = os.path.join(root, rel_path)
+    if os.path.exists(target):
+        os.remove(src_path)
+    else:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(src_path, target)
+    return rel_path
+
+
+#============================== MANIFEST ==============================
+def _manifest_path(root):
+    return os.path.join(root, MANIFEST_NAME)
+
+
+def _read_manifest(path):
+    """
+    Entries manifest di path. File yang tidak ada = manifest kosong; file yang
+    tidak bisa dibaca, JSON rusak (mis. tulisan setengah jadi dari mesin lain
+    di library share) atau versi lain memunculkan ManifestError.
+    """
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        raise ManifestError(f"Manifest library tidak bisa dibaca: {path}: {e}") from e
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        raise ManifestError(f"Versi manifest library tidak didukung: {path}")
+    entries = data.get("entries")
+    if not isinstance(entries, dict):
+        raise ManifestError(f"Manifest library tidak valid: {path}")
+    return entries
+
+
+def load_manifest(root):
+    """
+    Dict nama -> record {data, image, video} (path relatif); di-cache per
+    mtime. Untuk tampilan saja: manifest rusak dilaporkan lalu dianggap kosong.
+    """
+    path = _manifest_path(root)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        _manifests.pop(root, None)
+        return {}
+    cached = _manifests.get(root)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        entries = _read_manifest(path)
+    except ManifestError as e:
+        print(e)
+        return {}
+    _manifests[root] = (mtime, entries)
+    return entries
+
+
+def _save_manifest(root, entries):
+    path = _manifest_path(root)
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "entries": entries}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+    _manifests[root] = (os.stat(path).st_mtime_ns, entries)
+
+
+def _edit_manifest(root, edit):
+    # Baca ulang dari disk (bukan cache) tepat sebelum menulis. Manifest rusak
+    # memunculkan ManifestError dan tidak pernah ditimpa dengan isi kosong.
+    _manifests.pop(root, None)
+    entries = dict(_read_manifest(_manifest_path(root)))
+    result = edit(entries)
+    _save_manifest(root, entries)
+    return result, entries
+
+
+def _collect_garbage(root, candidates, entries):
+    """Hapus blob kandidat yang tidak lagi dirujuk entry manapun. Kembalikan yang dihapus."""
+    referenced = {record.get(kind) for record in entries.values() for kind in FILE_KINDS}
+    removed = []
+    for rel_path in candidates:
+        if rel_path and rel_path not in referenced:
+            try:
+                os.remove(os.path.join(root, rel_path))
+                removed.append(rel_path)
+            except OSError:
+                pass
+    return removed
+
+
+#============================== ENTRY API ==============================
+def add(root, name, info=None, **files):
+    """
+    Simpan file (data=..., image=..., video=...: path absolut, biasanya dari
+    staging_path) ke store dan catat di manifest dengan nama name. Field yang
+    tidak diberikan tetap seperti sebelumnya. info: metadata entry (armature,
+    fps, ...) yang tidak ikut di-hash. File data baru memberi entry "id" baru.
+    Kembalikan record manifest.
+
+    ManifestError kalau manifest rusak: file staging dibuang dan manifest
+    tidak ditulis.
+    """
+    try:
+        _read_manifest(_manifest_path(root))
+    except ManifestError:
+        _discard(files.values())
+        raise
+    stored = {kind: put(root, path) for kind, path in files.items()
+              if kind in FILE_KINDS and path and os.path.exists(path)}
+
+    def edit(entries):
+        record = dict(entries.get(name, {}))
+        replaced = [record.get(kind) for kind in stored if record.get(kind) != stored[kind]]
+        record.update(stored)
+        if info:
+            record["info"] = dict(info)
+        if "data" in stored or "id" not in record:
+            record["id"] = uuid.uuid4().hex
+        entries[name] = record
+        return replaced
+
+    replaced, entries = _edit_manifest(root, edit)
+    _collect_garbage(root, replaced, entries)
+    return entries[name]
+
+
+def _find_id(entries, entry_id):
+    return next((name for name, record in entries.items() if record.get("id") == entry_id), None)
+
+
+def attach(root, entry_id, **files):
+    """
+    Seperti add, tapi entry dicari lewat id (nama saat ini, setelah rename).
+    Kalau entry sudah dihapus / ditimpa export lain, file dibuang dan
+    manifest tidak diubah. Kembalikan record manifest atau None.
+    """
+    if _find_id(_read_manifest(_manifest_path(root)), entry_id) is None:
+        _discard(files.values())
+        return None
+    stored = {kind: put(root, path) for kind, path in files.items()
+              if kind in FILE_KINDS and path and os.path.exists(path)}
+
+    def edit(entries):
+        name = _find_id(entries, entry_id)
+        if name is None:
+            # Entry hilang di antara cek dan tulis: blob baru jadi kandidat GC
+            return None, list(stored.values())
+        record = dict(entries[name])
+        replaced = [record.get(kind) for kind in stored if record.get(kind) != stored[kind]]
+        record.update(stored)
+        entries[name] = record
+        return name, replaced
+
+    (name, garbage), entries = _edit_manifest(root, edit)
+    _collect_garbage(root, garbage, entries)
+    return entries[name] if name else None
+
+
+def _discard(paths):
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def get(root, name):
+    return load_manifest(root).get(name)
+
+
+def resolve(root, name, kind):
+    """Path absolut file kind ("data"/"image"/"video") milik name, atau None."""
+    record = get(root, name)
+    rel_path = record.get(kind) if record else None
+    return os.path.join(root, rel_path) if rel_path else None
+
+
+def rename(root, old_name, new_name):
+    """Rename O(1): hanya key manifest yang berubah. Kembalikan False kalau old_name tidak ada."""
+    def edit(entries):
+        if old_name not in entries or new_name in entries:
+            return False
+        entries[new_name] = entries.pop(old_name)
+        return True
+
+    if old_name not in _read_manifest(_manifest_path(root)):
+        return False
+    renamed, _entries = _edit_manifest(root, edit)
+    return renamed
+
+
+def delete(root, name):
+    """
+    Hapus entry dari manifest dan blob yang tidak lagi dirujuk. Kembalikan
+    list path relatif blob yang dihapus, atau None kalau name tidak ada.
+    """
+    if name not in _read_manifest(_manifest_path(root)):
+        return None
+    record, entries = _edit_manifest(root, lambda entries: entries.pop(name, None))
+    if record is None:
+        return None
+    return _collect_garbage(root, [record.get(kind) for kind in FILE_KINDS], entries)
+
+
+def preview_ingest(root, entry_id, video_path, image_path):
+    """
+    Callback on_finish untuk preview_queue: hasil render (di staging) masuk
+    store saat job sukses, dan dibuang kalau gagal / dibatalkan. entry_id
+    ("id" record dari add) dipakai, bukan nama, supaya rename / delete selama
+    render tidak membuat entry yatim.
+    """
+    def on_finish(job):
+        if job.status == 'DONE':
+            try:
+                if attach(root, entry_id, video=video_path, image=image_path) is None:
+                    print(f"Entry preview {entry_id} sudah tidak ada, preview dibuang")
+            except ManifestError as e:
+                _discard((video_path, image_path))
+                print(f"Preview tidak disimpan: {e}")
+            return
+        _discard((video_path, image_path))
+    return on_finish
@@ -0,0 +1,282 @@
+"""
+Pose library sebagai blob transform (.rpose), pengganti script pose .py.
+
+Layout file (little-endian):
+    [0:12]   magic b"RRPS", versi (uint16), flags (uint16), panjang header (uint32)
+    [12:..]  header JSON utf-8 (bones, custom property, hash), di-pad ke 16 byte
+    [data]   float32 array (jumlah bone, 13): location(3), rotation_quaternion(4),
+             rotation_euler(3), scale(3) dalam ruang lokal bone
+
+Hash konten (sha1 dari array + custom property) disimpan di header. Blob yang
+sudah dibaca di-cache per path (mtime/ukuran), jadi slider blend tidak pernah
+membaca file lagi. Apply dan blend ditulis massal lewat foreach_get/foreach_set
+ke seluruh pose.bones.
+"""
+
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+from Core import bake_engine, fcurve_writer, transform_math
+from Library import clip_format, retarget
+
+POSE_EXT = clip_format.POSE_EXT
+POSE_MAGIC = b"RRPS"
+POSE_VERSION = 1
+
+# (property, ukuran) sesuai urutan kolom di array blob
+POSE_CHANNELS = (
+    ("location", 3),
+    ("rotation_quaternion", 4),
+    ("rotation_euler", 3),
+    ("scale", 3),
+)
+POSE_WIDTH = sum(size for _, size in POSE_CHANNELS)
+
+_PREAMBLE = struct.Struct("<4sHHI")
+_ALIGN = 16
+
+# path -> (mtime_ns, size, PoseBlob)
+_cache = {}
+
+# Sesi blend aktif: pose awal diambil sekali, lalu setiap tick slider hanya
+# menginterpolasi array di memori
+_blend_session = {}
+
+
+def _channel_slices():
+    slices = {}
+    start = 0
+    for prop, size in POSE_CHANNELS:
+        slices[prop] = slice(start, start + size)
+        start += size
+    return slices
+
+
+_SLICES = _channel_slices()
+
+
+def _content_hash(data, custom):
+    digest = hashlib.sha1(np.ascontiguousarray(data, dtype="<f4").tobytes())
+    digest.update(json.dumps(custom, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+#============================== BULK POSE IO ==============================
+def read_transforms(pose_bones):
+    """Array (jumlah bone, 13) transform lokal semua pose bone, dibaca per property sekali."""
+    count = len(pose_bones)
+    data = np.empty((count, POSE_WIDTH), dtype=np.float32)
+    for prop, size in POSE_CHANNELS:
+        values = np.empty(count * size, dtype=np.float32)
+        pose_bones.foreach_get(prop, values)
+        data[:, _SLICES[prop]] = values.reshape(count, size)
+    return data
+
+
+def write_transforms(armature_obj, data):
+    pose_bones = armature_obj.pose.bones
+    for prop, _size in POSE_CHANNELS:
+        pose_bones.foreach_set(prop, np.ascontiguousarray(data[:, _SLICES[prop]], dtype=np.float32).ravel())
+    armature_obj.update_tag(refresh={'DATA'})
+
+
+class PoseBlob:
+    def __init__(self, bones, data, custom=None, info=None):
+        self.bones = list(bones)
+        self.data = np.asarray(data, dtype=np.float32).reshape(len(self.bones), POSE_WIDTH)
+        self.custom = custom or {}
+        self.info = info or {}
+        self.hash = _content_hash(self.data, self.custom)
+
+    @classmethod
+    def from_armature(cls, armature_obj, bone_names, **info):
+        pose_bones = armature_obj.pose.bones
+        all_data = read_transforms(pose_bones)
+        rows = [i for i, pb in enumerate(pose_bones) if pb.name in bone_names]
+
+        custom = {}
+        for i in rows:
+            pose_bone = pose_bones[i]
+            props = {}
+            for key, value in pose_bone.items():
+                if key == "_RNA_UI":
+                    continue
+                if hasattr(value, "to_list"):
+                    value = value.to_list()
+                if isinstance(value, (bool, int, float, str, list, tuple)):
+                    props[key] = list(value) if isinstance(value, tuple) else value
+                else:
+                    print(f"Properti {key} pada bone {pose_bone.name} tidak dapat diserialisasi dan akan diabaikan.")
+            if props:
+                custom[pose_bone.name] = props
+
+        return cls([pose_bones[i].name for i in rows], all_data[rows], custom, info)
+
+    def save(self, filepath):
+        header = dict(self.info)
+        header.update(version=POSE_VERSION, bones=self.bones, custom=self.custom, hash=self.hash)
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        data_start = (_PREAMBLE.size + len(header_bytes) + _ALIGN - 1) // _ALIGN * _ALIGN
+        header_bytes += b" " * (data_start - _PREAMBLE.size - len(header_bytes))
+
+        tmp_path = filepath + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_PREAMBLE.pack(POSE_MAGIC, POSE_VERSION, 0, len(header_bytes)))
+            f.write(header_bytes)
+            f.write(np.ascontiguousarray(self.data, dtype="<f4").tobytes())
+        os.replace(tmp_path, filepath)
+        _cache.pop(filepath, None)
+        return filepath
+
+    def match_rows(self, armature_obj, bone_names=None):
+        """
+        (row pose.bones, row blob) untuk bone yang ada di blob, armature, dan
+        bone_names. Nama bone blob dipetakan ke rig tujuan lewat retarget.
+        """
+        bone_map = retarget.get_map(self.bones, [pb.name for pb in armature_obj.pose.bones])
+        blob_rows = {bone_map[name]: i for i, name in enumerate(self.bones) if name in bone_map}
+        rows, src = [], []
+        for i, pose_bone in enumerate(armature_obj.pose.bones):
+            j = blob_rows.get(pose_bone.name)
+            if j is None or (bone_names is not None and pose_bone.name not in bone_names):
+                continue
+            rows.append(i)
+            src.append(j)
+        return np.array(rows, dtype=np.int64), np.array(src, dtype=np.int64)
+
+
+#============================== READ ==============================
+def read_pose_header(filepath):
+    with open(filepath, "rb") as f:
+        magic, version, _flags, header_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != POSE_MAGIC:
+            raise ValueError(f"Bukan file pose Raha: {filepath}")
+        if version > POSE_VERSION:
+            raise ValueError(f"Versi pose {version} belum didukung")
+        header = json.loads(f.read(header_size).decode("utf-8"))
+    header["data_start"] = _PREAMBLE.size + header_size
+    return header
+
+
+def load(filepath):
+    """Baca blob pose (dari cache kalau file tidak berubah)."""
+    stat = os.stat(filepath)
+    cached = _cache.get(filepath)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    header = read_pose_header(filepath)
+    bones = header.pop("bones")
+    custom = header.pop("custom", {})
+    with open(filepath, "rb") as f:
+        f.seek(header.pop("data_start"))
+        data = np.frombuffer(f.read(len(bones) * POSE_WIDTH * 4), dtype="<f4")
+    for key in ("version", "hash"):
+        header.pop(key, None)
+
+    blob = PoseBlob(bones, data, custom, header)
+    _cache[filepath] = (stat.st_mtime_ns, stat.st_size, blob)
+    return blob
+
+
+#============================== APPLY / BLEND ==============================
+def _interpolate(start, target, factor):
+    result = np.empty_like(start)
+    for prop, _size in POSE_CHANNELS:
+        sl = _SLICES[prop]
+        if prop == "rotation_quaternion":
+            result[:, sl] = transform_math.slerp(start[:, sl], target[:, sl], factor)
+        else:
+            result[:, sl] = transform_math.lerp(start[:, sl], target[:, sl], factor)
+    return result
+
+
+def _apply_custom(armature_obj, blob, rows, src, factor, start_custom):
+    pose_bones = armature_obj.pose.bones
+    for i, j in zip(rows, src):
+        pose_bone = pose_bones[int(i)]
+        for key, value in blob.custom.get(blob.bones[int(j)], {}).items():
+            start = start_custom.get((pose_bone.name, key))
+            if isinstance(value, float) and isinstance(start, (int, float)) and not isinstance(start, bool):
+                pose_bone[key] = start + (value - start) * factor
+            elif factor >= 1.0 or start is None:
+                pose_bone[key] = value
+
+
+def end_blend():
+    _blend_session.clear()
+
+
+def blend(armature_obj, blob, bone_names=None, factor=1.0):
+    """
+    Interpolasi dari pose saat sesi dimulai ke blob (factor 0..1). Pose awal
+    diambil ulang kalau blob/armature/bone berubah atau pose diedit manual
+    sejak tick terakhir. Kembalikan jumlah bone yang ditulis.
+    """
+    rows, src = blob.match_rows(armature_obj, bone_names)
+    if not len(rows):
+        return 0
+
+    current = read_transforms(armature_obj.pose.bones)
+    key = (blob.hash, armature_obj.name, tuple(rows.tolist()))
+    written = _blend_session.get("written")
+    if (_blend_session.get("key") != key or written is None
+            or not np.allclose(current[rows], written, atol=1e-5)):
+        pose_bones = armature_obj.pose.bones
+        _blend_session.clear()
+        _blend_session["key"] = key
+        _blend_session["start"] = current[rows].copy()
+        _blend_session["start_custom"] = {
+            (pose_bones[int(i)].name, prop): pose_bones[int(i)].get(prop)
+            for i, j in zip(rows, src) for prop in blob.custom.get(blob.bones[int(j)], {})
+        }
+
+    current[rows] = _interpolate(_blend_session["start"], blob.data[src], factor)
+    write_transforms(armature_obj, current)
+    _apply_custom(armature_obj, blob, rows, src, factor, _blend_session["start_custom"])
+    _blend_session["written"] = current[rows].copy()
+    return len(rows)
+
+
+def insert_keys(armature_obj, bone_names, frame):
+    """
+    Key location/rotasi/scale bone (seperti keyframe_insert script lama) secara
+    massal. Rotasi hanya property yang dipakai rotation_mode bone, dan setiap
+    property ditulis sebagai satu array.
+    """
+    pose_bones = armature_obj.pose.bones
+    data = read_transforms(pose_bones)
+    action = fcurve_writer.ensure_action(armature_obj)
+    frames = [frame]
+    written = 0
+    for i, pose_bone in enumerate(pose_bones):
+        if pose_bone.name not in bone_names:
+            continue
+        for prop in ("location", bake_engine.rotation_property(pose_bone.rotation_mode), "scale"):
+            if prop in _SLICES:
+                values = data[i, _SLICES[prop]]
+            else:
+                # Axis angle tidak ada di kolom blob, ambil langsung dari bone
+                values = np.array(getattr(pose_bone, prop), dtype=np.float32)
+            data_path = clip_format.channel_data_path(pose_bone.name, prop)
+            written += fcurve_writer.write_array(action, data_path, frames, values[None, :],
+                                                 group_name=pose_bone.name)
+    return written
+
+
+def apply(armature_obj, blob, bone_names=None, factor=1.0, frame=None):
+    """
+    Terapkan pose (opsional di-blend dari pose saat ini) lalu key di frame.
+    frame=None: hanya pose, tanpa keyframe. Kembalikan jumlah bone.
+    """
+    count = blend(armature_obj, blob, bone_names, factor)
+    if count and frame is not None:
+        rows, _src = blob.match_rows(armature_obj, bone_names)
+        pose_bones = armature_obj.pose.bones
+        insert_keys(armature_obj, {pose_bones[int(i)].name for i in rows}, frame)
+    end_blend()
+    return count
@@ -0,0 +1,241 @@
+"""
+Antrian render preview (MP4 + thumbnail PNG) untuk Studio Library.
+
+Export data selesai langsung; preview dirender belakangan oleh proses
+`blender -b` terpisah dari salinan file .blend. Status job dipantau lewat
+bpy.app.timers sehingga UI tidak pernah menunggu render selesai.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+import bpy
+
+MAX_RUNNING = 1
+POLL_INTERVAL = 0.5
+
+# Dipanggil dengan (job) setelah job selesai sukses; key = nama pemilik callback
+finished_callbacks = {}
+
+_jobs = []
+_next_id = 1
+
+# Script yang dijalankan di dalam proses blender -b
+_JOB_SCRIPT = r'''
+import json, sys, bpy
+spec = json.load(open(sys.argv[sys.argv.index("--") + 1]))
+scene = bpy.context.scene
+scene.frame_start = spec["frame_start"]
+scene.frame_end = spec["frame_end"]
+scene.render.engine = 'BLENDER_WORKBENCH'
+
+cam = spec.get("viewport_camera")
+if cam:
+    data = bpy.data.cameras.new("RahaPreviewCam")
+    data.lens = cam["lens"]
+    data.sensor_width = cam["sensor_width"]
+    ob = bpy.data.objects.new("RahaPreviewCam", data)
+    scene.collection.objects.link(ob)
+    from mathutils import Matrix
+    ob.matrix_world = Matrix(cam["matrix"])
+    scene.camera = ob
+
+total = scene.frame_end - scene.frame_start + 1
+def _progress(scene, *args):
+    print(f"RAHA_PROGRESS {scene.frame_current - scene.frame_start + 1}/{total}", flush=True)
+bpy.app.handlers.render_write.append(_progress)
+
+if spec.get("video_path"):
+    scene.render.filepath = spec["video_path"]
+    scene.render.image_settings.file_format = 'FFMPEG'
+    scene.render.ffmpeg.format = 'MPEG4'
+    scene.render.ffmpeg.codec = 'H264'
+    scene.render.ffmpeg.audio_codec = 'AAC'
+    bpy.ops.render.render(animation=True)
+
+bpy.app.handlers.render_write.remove(_progress)
+if spec.get("image_path"):
+    scene.frame_set(spec.get("image_frame", scene.frame_start))
+    scene.render.image_settings.file_format = 'PNG'
+    scene.render.filepath = spec["image_path"]
+    bpy.ops.render.render(write_still=True)
+print("RAHA_DONE", flush=True)
+'''
+
+
+class PreviewJob:
+    def __init__(self, name, spec, work_dir):
+        global _next_id
+        self.id = _next_id
+        _next_id += 1
+        self.name = name
+        self.spec = spec
+        self.work_dir = work_dir
+        self.status = 'QUEUED'
+        self.progress = 0.0
+        self.message = ""
+        self.process = None
+        # Dipanggil dengan (job) sekali saat job berakhir (DONE/FAILED/CANCELLED)
+        self.on_finish = None
+
+    @property
+    def is_active(self):
+        return self.status in {'QUEUED', 'RUNNING'}
+
+    def start(self):
+        spec_path = os.path.join(self.work_dir, "job.json")
+        with open(spec_path, "w") as f:
+            json.dump(self.spec, f)
+
+        cmd = [bpy.app.binary_path, "-b", self.spec["blend_path"], "--factory-startup",
+               "--python-expr", _JOB_SCRIPT, "--", spec_path]
+        kwargs = {}
+        if sys.platform == "win32":
+            kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+        self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        text=True, errors="replace", **kwargs)
+        self.status = 'RUNNING'
+        threading.Thread(target=self._read_output, daemon=True).start()
+
+    def _read_output(self):
+        # Thread pembaca stdout: hanya mengubah atribut sederhana, UI membaca lewat timer
+        for line in self.process.stdout:
+            if line.startswith("RAHA_PROGRESS"):
+                done, total = line.split()[1].split("/")
+                self.progress = min(int(done) / max(int(total), 1), 1.0)
+            elif "Error" in line:
+                self.message = line.strip()[:200]
+
+    def cancel(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+        self.status = 'CANCELLED'
+        self.finish()
+
+    def finish(self):
+        if self.on_finish is not None:
+            try:
+                self.on_finish(self)
+            except Exception as e:
+                print(f"Preview finish error: {e}")
+            self.on_finish = None
+        self.cleanup()
+
+    def cleanup(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def _viewport_camera(context):
+    """Posisi viewport aktif, supaya preview sama seperti playblast OpenGL lama."""
+    areas = [context.area] if context.area and context.area.type == 'VIEW_3D' else []
+    if context.screen:
+        areas += [a for a in context.screen.areas if a.type == 'VIEW_3D']
+    for area in areas:
+        space = area.spaces.active
+        r3d = space.region_3d
+        if r3d.view_perspective == 'CAMERA' and context.scene.camera:
+            return None
+        return {
+            "matrix": [list(row) for row in r3d.view_matrix.inverted()],
+            "lens": space.lens,
+            # Viewport non-kamera memakai sensor 2x default (36mm)
+            "sensor_width": 72.0,
+        }
+    return None
+
+
+def enqueue(context, name, frame_start, frame_end, video_path=None, image_path=None, image_frame=None,
+            library_root=None, on_finish=None):
+    """
+    Simpan salinan .blend lalu antrikan render preview. Kembalikan PreviewJob.
+    on_finish(job) dipanggil sekali saat job berakhir apapun statusnya,
+    sebelum finished_callbacks.
+    """
+    work_dir = tempfile.mkdtemp(prefix="raha_preview_")
+    blend_path = os.path.join(work_dir, "preview.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True, check_existing=False)
+
+    spec = {
+        "blend_path": blend_path,
+        "frame_start": int(frame_start),
+        "frame_end": int(frame_end),
+        "video_path": video_path,
+        "image_path": image_path,
+        "image_frame": int(frame_start if image_frame is None else image_frame),
+        "viewport_camera": _viewport_camera(context),
+        "library_root": library_root,
+    }
+    job = PreviewJob(name, spec, work_dir)
+    job.on_finish = on_finish
+    _jobs.append(job)
+    if not bpy.app.timers.is_registered(_poll):
+        bpy.app.timers.register(_poll, first_interval=0.1)
+    return job
+
+
+def jobs():
+    return list(_jobs)
+
+
+def get_job(job_id):
+    return next((job for job in _jobs if job.id == job_id), None)
+
+
+def cancel(job_id):
+    job = get_job(job_id)
+    if job and job.is_active:
+        job.cancel()
+    return job
+
+
+def clear_finished():
+    _jobs[:] = [job for job in _jobs if job.is_active]
+
+
+def _tag_redraw():
+    wm = bpy.context.window_manager
+    for window in (wm.windows if wm else []):
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+def _poll():
+    for job in _jobs:
+        if job.status != 'RUNNING' or job.process.poll() is None:
+            continue
+        outputs = [job.spec.get("video_path"), job.spec.get("image_path")]
+        if job.process.returncode == 0 and all(os.path.exists(p) for p in outputs if p):
+            job.status = 'DONE'
+            job.progress = 1.0
+            job.finish()
+            for callback in list(finished_callbacks.values()):
+                try:
+                    callback(job)
+                except Exception as e:
+                    print(f"Preview callback error: {e}")
+        else:
+            job.status = 'FAILED'
+            job.message = job.message or f"Blender keluar dengan kode {job.process.returncode}"
+            job.finish()
+
+    running = sum(1 for job in _jobs if job.status == 'RUNNING')
+    for job in _jobs:
+        if running >= MAX_RUNNING:
+            break
+        if job.status == 'QUEUED':
+            try:
+                job.start()
+                running += 1
+            except OSError as e:
+                job.status = 'FAILED'
+                job.message = str(e)
+                job.finish()
+
+    _tag_redraw()
+    return POLL_INTERVAL if any(job.is_active for job in _jobs) else None
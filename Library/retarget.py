@@ -0,0 +1,120 @@
+"""
+Peta nama bone untuk memakai clip/pose library di rig dengan penamaan lain.
+
+Urutan pencocokan per bone sumber (setiap bone target hanya dipakai sekali):
+    1. nama persis sama
+    2. sama tanpa beda huruf besar/kecil
+    3. sama setelah suffix/prefix sisi dinormalisasi (.L / _L / -L / Left / L_ ...)
+    4. sama setelah prefix rig dibuang (DEF-, ORG-, CTRL-, mixamorig:, namespace:)
+    5. fuzzy (difflib) pada nama ternormalisasi, dengan sisi yang harus sama
+
+Hasil dicache per pasangan (signature rig sumber, signature rig target),
+sehingga import berulang ke rig yang sama tidak menghitung ulang apapun.
+Modul ini tidak bergantung pada bpy.
+"""
+
+import difflib
+import hashlib
+import re
+
+FUZZY_CUTOFF = 0.85
+
+_RIG_PREFIX_RE = re.compile(r"^(?:[^:|]+[:|])?(?:def|org|mch|ctrl|ctl|drv|jnt|bn|bone|mixamorig)[-_.:]?",
+                            re.IGNORECASE)
+_NAMESPACE_RE = re.compile(r"^[^:|]+[:|]")
+# Sisi satu huruf wajib pakai pemisah ("hand.L"), supaya "Shoulder"/"Ball" tidak terbaca sisi
+_SIDE_SUFFIX_RE = re.compile(r"(?:[-_. ](l|r)|[-_. ]?(left|right))(\.\d+)?$", re.IGNORECASE)
+_SIDE_PREFIX_RE = re.compile(r"^(?:(l|r)[-_. ]|(left|right)[-_. ]?)", re.IGNORECASE)
+_SEPARATOR_RE = re.compile(r"[-_. ]+")
+
+# (signature sumber, signature target) -> {bone sumber: bone target}
+_map_cache = {}
+
+
+def rig_signature(bone_names):
+    """Hash pendek dari himpunan nama bone (urutan tidak berpengaruh)."""
+    digest = hashlib.sha1("\n".join(sorted(bone_names)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _split_side(name):
+    """'hand.L' -> ('hand', 'l'); 'Left_Arm' -> ('arm', 'l'); 'spine' -> ('spine', '')."""
+    side = ""
+    match = _SIDE_SUFFIX_RE.search(name)
+    if match and match.start() > 0:
+        side = (match.group(1) or match.group(2))[0].lower()
+        name = name[:match.start()] + (match.group(3) or "")
+    else:
+        match = _SIDE_PREFIX_RE.match(name)
+        if match and match.end() < len(name):
+            side = (match.group(1) or match.group(2))[0].lower()
+            name = name[match.end():]
+    return _SEPARATOR_RE.sub("_", name.lower()).strip("_"), side
+
+
+def _side_key(name):
+    base, side = _split_side(name)
+    return f"{base}|{side}"
+
+
+def _stripped_key(name):
+    name = _NAMESPACE_RE.sub("", name)
+    name = _RIG_PREFIX_RE.sub("", name) or name
+    return _side_key(name)
+
+
+def build_map(source_bones, target_bones):
+    """Kembalikan dict {bone sumber: bone target} untuk bone yang bisa dicocokkan."""
+    targets = list(target_bones)
+    free = set(targets)
+    mapping = {}
+
+    def assign(key_func):
+        index = {}
+        for target in targets:
+            if target in free:
+                index.setdefault(key_func(target), target)
+        for source in source_bones:
+            if source in mapping:
+                continue
+            target = index.get(key_func(source))
+            if target is not None and target in free:
+                mapping[source] = target
+                free.discard(target)
+
+    assign(lambda name: name)
+    assign(str.lower)
+    assign(_side_key)
+    assign(_stripped_key)
+
+    # Fuzzy hanya untuk sisa, dan sisi (L/R/tengah) harus sama
+    remaining = [source for source in source_bones if source not in mapping]
+    if remaining and free:
+        by_key = {}
+        for target in free:
+            by_key.setdefault(_stripped_key(target), target)
+        for source in remaining:
+            key = _stripped_key(source)
+            side = key.rsplit("|", 1)[1]
+            candidates = [k for k in by_key if k.rsplit("|", 1)[1] == side and by_key[k] in free]
+            match = difflib.get_close_matches(key, candidates, n=1, cutoff=FUZZY_CUTOFF)
+            if match:
+                target = by_key[match[0]]
+                mapping[source] = target
+                free.discard(target)
+
+    return mapping
+
+
+def get_map(source_bones, target_bones):
+    """build_map dengan cache per pasangan signature rig."""
+    key = (rig_signature(source_bones), rig_signature(target_bones))
+    mapping = _map_cache.get(key)
+    if mapping is None:
+        mapping = build_map(source_bones, target_bones)
+        _map_cache[key] = mapping
+    return mapping
+
+
+def clear_cache():
+    _map_cache.clear()
@@ -0,0 +1,198 @@
+"""
+Thumbnail kecil untuk Studio Library.
+
+Gambar preview asli (screenshot render) diperkecil sekali per clip ke
+`<library>/.thumbs/<nama>-<hash path>.png` (blob store: `<hash isi>.png`) dan
+dipakai ulang selama file asli tidak berubah. Icon preview Blender dimuat dari file kecil ini, bukan dari PNG
+resolusi penuh.
+
+Thumbnail yang belum ada dibuat di luar main thread: worker pool menjalankan
+proses `blender -b` pembantu per batch (decode + downscale PNG/JPG), lalu
+hasilnya diserahkan kembali ke UI lewat bpy.app.timers. Selama thumbnail
+belum siap, icon item tersebut dibiarkan kosong dan viewport tidak pernah
+menunggu.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+
+from Library import content_store
+
+THUMB_DIR = ".thumbs"
+THUMB_SIZE = 128
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg')
+VIDEO_EXTS = ('.mp4', '.avi', '.mkv', '.mov')
+
+MAX_WORKERS = 2
+BATCH_SIZE = 24
+POLL_INTERVAL = 0.25
+
+# Dipanggil di main thread dengan (root, [file_name, ...]) saat thumbnail siap
+ready_callbacks = {}
+
+_executor = None
+_results = queue.Queue()
+# (root, file_name) yang sedang dibuat / gagal dibuat (hanya diubah di main thread)
+_pending = set()
+_failed = set()
+
+# Script yang dijalankan di dalam proses blender -b pembantu
+_WORKER_SCRIPT = r'''
+import json, sys, bpy
+jobs = json.load(open(sys.argv[sys.argv.index("--") + 1]))
+for source, target, size in jobs:
+    try:
+        image = bpy.data.images.load(source, check_existing=False)
+        width, height = image.size
+        scale = size / max(width, height, 1)
+        if scale < 1.0:
+            image.scale(max(int(width * scale), 1), max(int(height * scale), 1))
+        image.filepath_raw = target
+        image.file_format = 'PNG'
+        image.save()
+        bpy.data.images.remove(image)
+    except Exception as e:
+        print(f"RAHA_THUMB_FAIL {source}: {e}", flush=True)
+'''
+
+
+def thumb_path(root, file_name):
+    """
+    Path thumbnail untuk file_name (relatif terhadap root). Blob store
+    (".store/ab/<hash>.png") sudah unik lewat hash isinya; file lain diberi
+    hash path relatifnya supaya walk.png di root dan di subfolder tidak
+    berbagi thumbnail.
+    """
+    rel_path = os.path.relpath(os.path.join(root, file_name), root).replace(os.sep, "/")
+    stem = os.path.splitext(os.path.basename(rel_path))[0]
+    if not rel_path.startswith(content_store.STORE_DIR + "/"):
+        stem = f"{stem}-{hashlib.sha1(rel_path.encode('utf-8')).hexdigest()[:12]}"
+    return os.path.join(root, THUMB_DIR, stem + ".png")
+
+
+def _is_stale(source, target):
+    try:
+        return os.path.getmtime(target) < os.path.getmtime(source)
+    except OSError:
+        return True
+
+
+def _run_batch(binary_path, root, file_names):
+    """Worker thread: buat thumbnail satu batch lewat proses blender -b terpisah."""
+    jobs = [(os.path.join(root, name), thumb_path(root, name), THUMB_SIZE) for name in file_names]
+    done, failed = [], []
+    try:
+        os.makedirs(os.path.join(root, THUMB_DIR), exist_ok=True)
+        fd, spec_path = tempfile.mkstemp(prefix="raha_thumbs_", suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(jobs, f)
+        try:
+            kwargs = {}
+            if sys.platform == "win32":
+                kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+            subprocess.run(
+                [binary_path, "-b", "--factory-startup", "--python-expr", _WORKER_SCRIPT, "--", spec_path],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False, **kwargs,
+            )
+        finally:
+            os.remove(spec_path)
+    except OSError as e:
+        print(f"Thumbnail worker error: {e}")
+
+    for name, (source, target, _size) in zip(file_names, jobs):
+        (failed if _is_stale(source, target) else done).append(name)
+    _results.put((root, done, failed))
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="raha_thumbs")
+    return _executor
+
+
+def request(root, file_names):
+    """Antrikan pembuatan thumbnail untuk file yang belum punya / thumbnail-nya usang."""
+    todo = []
+    for name in file_names:
+        key = (root, name)
+        if key in _pending or key in _failed or not name.lower().endswith(IMAGE_EXTS):
+            continue
+        if _is_stale(os.path.join(root, name), thumb_path(root, name)):
+            todo.append(name)
+            _pending.add(key)
+    if not todo:
+        return
+
+    executor = _get_executor()
+    for i in range(0, len(todo), BATCH_SIZE):
+        executor.submit(_run_batch, bpy.app.binary_path, root, todo[i:i + BATCH_SIZE])
+    if not bpy.app.timers.is_registered(_poll):
+        bpy.app.timers.register(_poll, first_interval=POLL_INTERVAL)
+
+
+def _poll():
+    # Main thread: serahkan hasil worker ke UI
+    while True:
+        try:
+            root, done, failed = _results.get_nowait()
+        except queue.Empty:
+            break
+        for name in done + failed:
+            _pending.discard((root, name))
+        _failed.update((root, name) for name in failed)
+        for callback in list(ready_callbacks.values()):
+            try:
+                callback(root, done + failed)
+            except Exception as e:
+                print(f"Thumbnail callback error: {e}")
+    return POLL_INTERVAL if _pending else None
+
+
+def cached_thumbnail(root, file_name):
+    """
+    Kembalikan (path, tipe preview) untuk icon sebuah file library, atau None
+    kalau thumbnail gambar belum siap (pembuatannya dijadwalkan di background).
+    Kalau thumbnail gagal dibuat (mis. folder read-only) file asli dipakai.
+    """
+    source = os.path.join(root, file_name)
+    if file_name.lower().endswith(VIDEO_EXTS):
+        return source, 'MOVIE'
+    if not file_name.lower().endswith(IMAGE_EXTS):
+        return source, 'IMAGE'
+
+    target = thumb_path(root, file_name)
+    if not _is_stale(source, target):
+        return target, 'IMAGE'
+    if (root, file_name) in _failed:
+        return source, 'IMAGE'
+    request(root, [file_name])
+    return None
+
+
+def remove_thumbnail(root, file_name):
+    """Hapus thumbnail cache milik satu file (dipanggil saat delete/rename)."""
+    _failed.discard((root, file_name))
+    try:
+        os.remove(thumb_path(root, file_name))
+    except OSError:
+        pass
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    if bpy.app.timers.is_registered(_poll):
+        bpy.app.timers.unregister(_poll)
+    _pending.clear()
@@ -1,42 +1,14 @@
 import bpy
+import os
+import sys
 from bpy.props import StringProperty
 
+# Root folder Raha Tools supaya modul bersama (Core) bisa di-import
+_RAHA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _RAHA_ROOT not in sys.path:
+    sys.path.append(_RAHA_ROOT)
 
-# =========================
-# Helper Functions
-# =========================
-
-def get_childof_constraint_by_name(pbone_or_obj, name):
-    """Cari constraint Child Of sesuai nama di PoseBone atau Object."""
-    if not pbone_or_obj or not hasattr(pbone_or_obj, "constraints"):
-        return None
-    for c in pbone_or_obj.constraints:
-        if c.type == 'CHILD_OF' and c.name == name:
-            return c
-    return None
-
-def get_constraint(context, cname):
-    """Cari constraint Child Of dari pose bone atau object aktif sesuai nama."""
-    obj = context.object
-    if context.mode == "POSE" and context.active_pose_bone:
-        return get_childof_constraint_by_name(context.active_pose_bone, cname)
-    elif obj and obj.type != "ARMATURE":
-        return get_childof_constraint_by_name(obj, cname)
-    return None
-
-def get_constraint(context, constraint_name):
-    obj = context.object
-    if obj is None:
-        return None
-    
-    # Kalau pose bone dipilih
-    if context.mode == 'POSE':
-        bone = context.active_pose_bone
-        if bone:
-            return bone.constraints.get(constraint_name)
-    
-    # Kalau object biasa
-    return obj.constraints.get(constraint_name)
+from Core import constraint_registry, sample_cache, space_switch
 
 
 # ========================================= ENABLE =============================================================
@@ -129,24 +101,21 @@ class OBJECT_OT_ENABLE(bpy.types.Operator):
 
 # ===================================================== DISABLE =======================================================
 
-def disable_constraint(obj, const, frame):
-    if isinstance(obj, bpy.types.PoseBone):
-        matrix_final = obj.matrix
-    else:
-        matrix_final = obj.matrix_world
+def switch_job(owner, const, switches, set_inverse=False):
+    """SwitchJob space_switch untuk PoseBone atau Object."""
+    if isinstance(owner, bpy.types.PoseBone):
+        return space_switch.SwitchJob(owner.id_data, owner, const, switches, set_inverse)
+    return space_switch.SwitchJob(owner, None, const, switches, set_inverse)
 
-    insert_keyframe(obj, frame=frame - 1)
-    insert_keyframe_constraint(const, frame=frame - 1)
+def timeline_range(scene):
+    """Range timeline (preview range kalau aktif)."""
+    if scene.use_preview_range:
+        return scene.frame_preview_start, scene.frame_preview_end
+    return scene.frame_start, scene.frame_end
 
-    const.influence = 0
-    if isinstance(obj, bpy.types.PoseBone):
-        obj.matrix = matrix_final
-    else:
-        obj.matrix_world = matrix_final
-
-    insert_keyframe(obj, frame=frame)
-    insert_keyframe_constraint(const, frame=frame)
-    return
+def disable_constraint(obj, const, frame):
+    """Influence 0 di frame (key tahan di frame-1), transform dikompensasi tanpa lompat."""
+    return space_switch.apply(bpy.context, [switch_job(obj, const, {frame: 0.0})])
 
 def get_rotation_mode(obj):
     if obj.rotation_mode in ("euler", "AXIS_ANGLE"):
@@ -175,39 +144,6 @@ def get_last_raha_parent_constraint(obj):
     if const.name.startswith("parent_child") and const.influence == 1:
         return const
 
-def insert_keyframe(obj, frame):
-    try:
-        if isinstance(obj, bpy.types.PoseBone):
-            arm = obj.id_data
-            arm.keyframe_insert(data_path='pose.bones["' + obj.name + '"].location', frame=frame)
-            if obj.rotation_mode == "QUATERNION":
-                arm.keyframe_insert(data_path='pose.bones["' + obj.name + '"].rotation_quaternion', frame=frame)
-            elif obj.rotation_mode == "AXIS_ANGLE":
-                arm.keyframe_insert(data_path='pose.bones["' + obj.name + '"].rotation_axis_angle', frame=frame)
-            else:
-                arm.keyframe_insert(data_path='pose.bones["' + obj.name + '"].rotation_euler', frame=frame)
-            arm.keyframe_insert(data_path='pose.bones["' + obj.name + '"].scale', frame=frame)
-        else:
-            obj.keyframe_insert(data_path="location", frame=frame)
-            if obj.rotation_mode == "QUATERNION":
-                obj.keyframe_insert(data_path="rotation_quaternion", frame=frame)
-            elif obj.rotation_mode == "AXIS_ANGLE":
-                obj.keyframe_insert(data_path="rotation_axis_angle", frame=frame)
-            else:
-                obj.keyframe_insert(data_path="rotation_euler", frame=frame)
-            obj.keyframe_insert(data_path="scale", frame=frame)
-    except Exception:
-        try:
-            obj.keyframe_insert(data_path="location", frame=frame)
-        except Exception:
-            pass
-
-def insert_keyframe_constraint(constraint, frame):
-    try:
-        constraint.keyframe_insert(data_path="influence", frame=frame)
-    except Exception:
-        pass
-
 def dp_keyframe_insert_obj(obj):
     obj.keyframe_insert(data_path="location")
     if obj.rotation_mode == "QUATERNION":
@@ -299,24 +235,36 @@ def dp_create_raha_parent_pbone(op):
     # parent = bone aktif
     parent_obj = obj
     parent_bone = active_pbone.name
+    frame = bpy.context.scene.frame_current
 
+    jobs = []
     for child_pbone in selected_pbones:
         child_obj = child_pbone.id_data  # armature object si child
-        child_name = child_pbone.name
 
         # cek apakah constraint sudah ada
         cname = f"RAHAparent_{parent_obj.name}_{parent_bone}"
         cons = child_pbone.constraints.get(cname)
-        if not cons:
+        created = cons is None
+        if created:
             cons = child_pbone.constraints.new('CHILD_OF')
             cons.name = cname
+            # mulai dari off, switch on di frame ini ditulis space_switch
+            cons.influence = 0.0
 
         # set target dengan benar
         cons.target = parent_obj
         cons.subtarget = parent_bone
 
-        # refresh matrix agar konsisten
-        bpy.context.view_layer.update()
+        # inverse dihitung analitik untuk constraint baru (pengganti childof_set_inverse)
+        jobs.append(space_switch.SwitchJob(child_obj, child_pbone, cons, {frame: 1.0}, set_inverse=created))
+
+    # Constraint baru belum terlihat oleh handler depsgraph, sample lama dibuang
+    sample_cache.invalidate()
+    try:
+        space_switch.apply(bpy.context, jobs)
+    except space_switch.SpaceSwitchError as e:
+        op.report({'ERROR'}, str(e))
+        return {'CANCELLED'}
 
     # info print
     op.report({'INFO'}, 
@@ -378,14 +326,17 @@ class raha_parent_OT_create(bpy.types.Operator):
                 self.report({"ERROR"}, "Armature objects must be in Pose mode.")
                 return {"CANCELLED"}
             obj = bpy.context.active_pose_bone
-            const = get_last_raha_parent_constraint(obj)
+        const = get_last_raha_parent_constraint(obj)
+        try:
             if const:
                 disable_constraint(obj, const, frame)
+        except space_switch.SpaceSwitchError as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
+
+        if context.active_object.type == "ARMATURE":
             dp_create_raha_parent_pbone(self)
         else:
-            const = get_last_raha_parent_constraint(obj)
-            if const:
-                disable_constraint(obj, const, frame)
             dp_create_raha_parent_obj(self)
 
         return {"FINISHED"}
@@ -455,7 +406,8 @@ class CHILD_OT_insert_influence_keyframe(bpy.types.Operator):
 # ======================================== CHILD OFF ===========================================
 
 def get_parent_child_constraints(bone):
-    return [c for c in bone.constraints if c.type == 'CHILD_OF' and c.name.startswith("parent_child")]
+    """Child-Of buatan Raha (prefix parent_child) milik object / pose bone, lewat cache registry."""
+    return [c for c in constraint_registry.child_of(bone) if c.name.startswith("parent_child")]
 
 def get_childof_constraint_by_name(bone, cname):
     for constraint in bone.constraints:
@@ -469,6 +421,15 @@ class RAHA_OT_apply_constraint(bpy.types.Operator):
     bl_options = {"REGISTER", "UNDO"}
 
     constraint_name: bpy.props.StringProperty()
+    mode: bpy.props.EnumProperty(
+        name="Apply",
+        items=[
+            ('CURRENT', "Current Frame", "Keep the transform at the current frame only"),
+            ('RANGE', "Frame Range", "Bake every frame of the timeline range, then remove the constraint"),
+            ('KEYED', "Keyed Frames", "Bake only keyed and switch frames in the timeline range, then remove the constraint"),
+        ],
+        default='CURRENT'
+    )
 
     def _find_childof_constraint(self, owner, cname):
         """Cari CHILD_OF constraint yang namanya cocok atau diawali cname."""
@@ -490,12 +451,42 @@ class RAHA_OT_apply_constraint(bpy.types.Operator):
             target.keyframe_insert(data_path="rotation_euler", frame=frame)
         target.keyframe_insert(data_path="scale", frame=frame)
 
+    def _apply_range(self, context, cname):
+        """Bake transform visual di range timeline (semua frame / frame ber-key) lalu hapus constraint."""
+        if context.mode == "POSE" and context.active_pose_bone:
+            owner = context.active_pose_bone
+        elif context.mode == "OBJECT" and context.object:
+            owner = context.object
+        else:
+            self.report({'ERROR'}, "No active bone or object selected.")
+            return {'CANCELLED'}
+
+        const = self._find_childof_constraint(owner, cname)
+        if not const:
+            self.report({'WARNING'}, f'Constraint "{cname}" not found.')
+            return {'CANCELLED'}
+
+        frame_start, frame_end = timeline_range(context.scene)
+        job = switch_job(owner, const, {})
+        if self.mode == 'KEYED':
+            frames = space_switch.keyed_frames(job.obj, job.pose_bone, const, frame_start, frame_end)
+        else:
+            frames = range(frame_start, frame_end + 1)
+        name = const.name
+        written = space_switch.apply_over_range(context, job.obj, job.pose_bone, const, frames)
+
+        self.report({'INFO'}, f'Applied "{name}" over frame {frame_start}-{frame_end} ({written} keys).')
+        return {'FINISHED'}
+
     def execute(self, context):
         cname = (self.constraint_name or "").strip()
         if not cname:
             self.report({'ERROR'}, "Constraint name is empty.")
             return {'CANCELLED'}
 
+        if self.mode != 'CURRENT':
+            return self._apply_range(context, cname)
+
         auto_key = context.scene.tool_settings.use_keyframe_insert_auto
         frame = context.scene.frame_current
 
@@ -681,162 +672,31 @@ class RAHA_OT_enable_constraint(bpy.types.Operator):
 
     constraint_name: StringProperty()
 
-    def _find_constraint_global(self, cname, context):
-        """Cari constraint bernama cname di:
-           - active pose bone, semua pose bones di active armature, atau semua armature di scene (BONE)
-           - active object, atau semua objects di scene (OBJECT)
-           Kembalikan (constraint, owner, owner_type, armature_object_if_bone)
-        """
-        # POSE-first (search within active armature first)
-        try:
-            if context.mode == 'POSE':
-                arm = context.object
-                if arm and arm.type == 'ARMATURE':
-                    # aktif bone
-                    active_pb = context.active_pose_bone
-                    if active_pb:
-                        c = active_pb.constraints.get(cname)
-                        if c:
-                            return c, active_pb, 'BONE', arm
-                    # search this armature's pose bones
-                    for pb in arm.pose.bones:
-                        c = pb.constraints.get(cname)
-                        if c:
-                            return c, pb, 'BONE', arm
-                # fallback: search all armatures in scene
-                for ob in bpy.data.objects:
-                    if ob.type == 'ARMATURE':
-                        for pb in ob.pose.bones:
-                            c = pb.constraints.get(cname)
-                            if c:
-                                return c, pb, 'BONE', ob
-        except Exception:
-            pass
-
-        # OBJECT mode / general object search
-        try:
-            obj = context.object
-            if obj:
-                c = obj.constraints.get(cname)
-                if c:
-                    return c, obj, 'OBJECT', obj
-            # fallback: search all objects
-            for ob in bpy.data.objects:
-                c = ob.constraints.get(cname)
-                if c:
-                    return c, ob, 'OBJECT', ob
-        except Exception:
-            pass
-
-        return None, None, None, None
-
     def execute(self, context):
         cname = (self.constraint_name or "").strip()
         if not cname:
             self.report({'ERROR'}, "Constraint name is empty.")
             return {'CANCELLED'}
 
-        # simpan keadaan awal supaya bisa restore
-        orig_active = context.object
-        orig_mode = context.mode
-
-        const, owner, otype, arm_obj = self._find_constraint_global(cname, context)
+        const, owner, otype, arm_obj = constraint_registry.find(cname, context)
         if not const:
             self.report({'WARNING'}, f'Constraint \"{cname}\" not found.')
             return {'CANCELLED'}
+        if otype not in ('BONE', 'OBJECT'):
+            self.report({'ERROR'}, "Found constraint but owner type unknown.")
+            return {'CANCELLED'}
 
+        # Influence 1 di frame ini, transform dikompensasi analitik (tanpa set inverse / ganti mode)
         frame = context.scene.frame_current
-
-        # POSE OWNER (PoseBone)
-        if otype == 'BONE' and isinstance(owner, bpy.types.PoseBone):
-            bone = owner
-            arm = arm_obj  # armature object where bone lives
-            # simpan world matrix bone sebelum perubahan
-            try:
-                prev_matrix_world = (arm.matrix_world @ bone.matrix).copy()
-            except Exception:
-                prev_matrix_world = None
-
-            insert_keyframe(bone, frame=frame - 1)
-            insert_keyframe_constraint(const, frame=frame - 1)
-
-            const.influence = 1.0
-            context.view_layer.update()
-
-            # pastikan armature itu aktif & di Pose mode sebelum set inverse
-            try:
-                if context.object != arm:
-                    bpy.context.view_layer.objects.active = arm
-                bpy.ops.object.mode_set(mode='POSE')
-                bpy.ops.constraint.childof_set_inverse(constraint=const.name, owner='BONE')
-            except Exception:
-                # jangan crash kalau operator gagal
-                pass
-
-            # restore transform supaya tidak lompat
-            try:
-                if prev_matrix_world is not None:
-                    bone.matrix = arm.matrix_world.inverted() @ prev_matrix_world
-            except Exception:
-                pass
-
-            insert_keyframe(bone, frame=frame)
-            insert_keyframe_constraint(const, frame=frame)
-
-            # restore original active / mode
-            try:
-                if orig_active and orig_active != arm:
-                    bpy.context.view_layer.objects.active = orig_active
-                    bpy.ops.object.mode_set(mode=orig_mode)
-            except Exception:
-                pass
-
-            return {'FINISHED'}
-
-        # OBJECT OWNER
-        elif otype == 'OBJECT' and isinstance(owner, bpy.types.Object):
-            obj = owner
-            try:
-                prev_matrix = obj.matrix_world.copy()
-            except Exception:
-                prev_matrix = None
-
-            insert_keyframe(obj, frame=frame - 1)
-            insert_keyframe_constraint(const, frame=frame - 1)
-
-            const.influence = 1.0
-            context.view_layer.update()
-
-            try:
-                if context.object != obj:
-                    bpy.context.view_layer.objects.active = obj
-                bpy.ops.object.mode_set(mode='OBJECT')
-                bpy.ops.constraint.childof_set_inverse(constraint=const.name, owner='OBJECT')
-            except Exception:
-                pass
-
-            try:
-                if prev_matrix is not None:
-                    obj.matrix_world = prev_matrix
-            except Exception:
-                pass
-
-            insert_keyframe(obj, frame=frame)
-            insert_keyframe_constraint(const, frame=frame)
-
-            try:
-                if orig_active and orig_active != obj:
-                    bpy.context.view_layer.objects.active = orig_active
-                    bpy.ops.object.mode_set(mode=orig_mode)
-            except Exception:
-                pass
-
-            return {'FINISHED'}
-
-        else:
-            self.report({'ERROR'}, "Found constraint but owner type unknown.")
+        try:
+            space_switch.apply(context, [switch_job(owner, const, {frame: 1.0})])
+        except space_switch.SpaceSwitchError as e:
+            self.report({'ERROR'}, str(e))
             return {'CANCELLED'}
 
+        self.report({'INFO'}, f'Enabled "{const.name}".')
+        return {'FINISHED'}
+
 
 class RAHA_OT_disable_constraint(bpy.types.Operator):
     bl_idname = "raha_parent.disable"
@@ -851,56 +711,21 @@ class RAHA_OT_disable_constraint(bpy.types.Operator):
     def poll(cls, context):
         return context.mode in ("OBJECT", "POSE")
 
-    def _find_constraint_global(self, cname, context):
-        # reuse same search logic sebagai enable
-        try:
-            if context.mode == 'POSE':
-                arm = context.object
-                if arm and arm.type == 'ARMATURE':
-                    active_pb = context.active_pose_bone
-                    if active_pb:
-                        c = active_pb.constraints.get(cname)
-                        if c:
-                            return c, active_pb, 'BONE', arm
-                    for pb in arm.pose.bones:
-                        c = pb.constraints.get(cname)
-                        if c:
-                            return c, pb, 'BONE', arm
-                for ob in bpy.data.objects:
-                    if ob.type == 'ARMATURE':
-                        for pb in ob.pose.bones:
-                            c = pb.constraints.get(cname)
-                            if c:
-                                return c, pb, 'BONE', ob
-        except Exception:
-            pass
-
-        try:
-            obj = context.object
-            if obj:
-                c = obj.constraints.get(cname)
-                if c:
-                    return c, obj, 'OBJECT', obj
-            for ob in bpy.data.objects:
-                c = ob.constraints.get(cname)
-                if c:
-                    return c, ob, 'OBJECT', ob
-        except Exception:
-            pass
-
-        return None, None, None, None
-
     def execute(self, context):
         frame = context.scene.frame_current
         cname = (self.constraint_name or "").strip()
 
         # SINGLE named constraint path
         if cname:
-            const, owner, otype, arm_obj = self._find_constraint_global(cname, context)
+            const, owner, otype, arm_obj = constraint_registry.find(cname, context)
             if not const:
                 self.report({"WARNING"}, f'Constraint "{cname}" not found.')
                 return {"CANCELLED"}
-            disable_constraint(owner, const, frame)
+            try:
+                disable_constraint(owner, const, frame)
+            except space_switch.SpaceSwitchError as e:
+                self.report({"ERROR"}, str(e))
+                return {"CANCELLED"}
             self.report({"INFO"}, f'Disabled \"{const.name}\".')
             return {"FINISHED"}
 
@@ -910,7 +735,7 @@ class RAHA_OT_disable_constraint(bpy.types.Operator):
             self.report({"ERROR"}, "Nothing selected.")
             return {"CANCELLED"}
 
-        counter = 0
+        jobs = []
         for obj in objects:
             # cari CHILD_OF terakhir pada owner (dukungan untuk PoseBone & Object)
             last = None
@@ -924,13 +749,56 @@ class RAHA_OT_disable_constraint(bpy.types.Operator):
 
             if last is None:
                 continue
-            disable_constraint(obj, last, frame)
-            counter += 1
+            jobs.append(switch_job(obj, last, {frame: 0.0}))
 
-        self.report({"INFO"}, f"{counter} constraints were disabled.")
+        # Semua owner dikompensasi dalam satu sweep
+        try:
+            space_switch.apply(context, jobs)
+        except space_switch.SpaceSwitchError as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
+
+        self.report({"INFO"}, f"{len(jobs)} constraints were disabled.")
         return {"FINISHED"}
 
 
+class RAHA_OT_space_switch_range(bpy.types.Operator):
+    bl_idname = "raha.space_switch_range"
+    bl_label = "Fix Switches (Range)"
+    bl_description = "Recompute transform compensation at every influence switch in the timeline range"
+    bl_options = {"REGISTER", "UNDO"}
+
+    constraint_name: StringProperty()
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode in ("OBJECT", "POSE")
+
+    def execute(self, context):
+        cname = (self.constraint_name or "").strip()
+        # Owner diambil dari lookup yang sama dengan constraint-nya
+        const, owner, _otype, _obj = constraint_registry.find(cname, context)
+        if not const or owner is None:
+            self.report({'WARNING'}, f'Constraint "{cname}" not found.')
+            return {'CANCELLED'}
+
+        frame_start, frame_end = timeline_range(context.scene)
+        job = switch_job(owner, const, {})
+        job.switches = space_switch.switch_frames(job.obj, job.pose_bone, const, frame_start, frame_end)
+        if not job.switches:
+            self.report({'INFO'}, f"No influence switch in frame {frame_start}-{frame_end}.")
+            return {'CANCELLED'}
+
+        try:
+            space_switch.apply(context, [job])
+        except space_switch.SpaceSwitchError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"{len(job.switches)} switches compensated for \"{const.name}\".")
+        return {'FINISHED'}
+
+
 class RAHA_OT_clear_constraint_keys(bpy.types.Operator):
     bl_idname = "raha.clear_constraint_keys"
     bl_label = "Clear Keys (Parent)"
@@ -1007,13 +875,6 @@ class VIEW3D_PT_Raha_Parents(bpy.types.Panel):
     bl_category = "Raha_Tools"
     bl_ui_units_x = 10
 
-    def get_parent_child_constraints(target):
-        """Ambil constraint Child Of dari object atau pose bone"""
-        if hasattr(target, "constraints"):
-            return [c for c in target.constraints if c.type == 'CHILD_OF']
-        return []
-
-
     def draw(self, context):
         layout = self.layout
         obj = context.object
@@ -1056,6 +917,8 @@ class VIEW3D_PT_Raha_Parents(bpy.types.Panel):
                 op.constraint_name = c.name
                 op = row.operator("raha_parent.disable", text="Disable", icon="UNLINKED")
                 op.constraint_name = c.name
+                op = row.operator("raha.space_switch_range", text="", icon="FILE_REFRESH")
+                op.constraint_name = c.name
                 row = box.row(align=False)                
                 op = row.operator("raha.set_inverse_single", text="", icon="ARROW_LEFTRIGHT")
                 op.constraint_name = c.name
@@ -1063,6 +926,9 @@ class VIEW3D_PT_Raha_Parents(bpy.types.Panel):
                 op.constraint_name = c.name
                 op = row.operator("raha.apply_constraint_single", text="", icon="CHECKMARK")
                 op.constraint_name = c.name
+                op = row.operator("raha.apply_constraint_single", text="", icon="RENDER_ANIMATION")
+                op.constraint_name = c.name
+                op.mode = 'RANGE'
                 op = row.operator("raha.clear_constraint_keys", text="", icon="KEYTYPE_GENERATED_VEC")
                 op.constraint_name = c.name
 
@@ -1085,6 +951,7 @@ classes = (
     RAHA_OT_delete_constraint,
     RAHA_OT_enable_constraint,
     RAHA_OT_disable_constraint,
+    RAHA_OT_space_switch_range,
     RAHA_OT_clear_constraint_keys,
     RAHA_OT_clear_constraint_key_current,
     CHILD_OT_insert_influence_keyframe,   # <-- TAMBAHKAN INI
@@ -1095,6 +962,8 @@ classes = (
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
+    sample_cache.register()
+    constraint_registry.register()
 
 def unregister():
     for cls in reversed(classes):
@@ -1102,6 +971,8 @@ def unregister():
             bpy.utils.unregister_class(cls)
         except Exception:
             pass
+    sample_cache.unregister()
+    constraint_registry.unregister()
 
 if __name__ == "__main__":
     register()
@@ -1,48 +1,88 @@
 import bpy
-import mathutils
+import os
+import sys
 
-stored_matrix_world = None
-stored_matrices = {}
-original_keyframes = {}  # Untuk menyimpan keyframe asli
+# Root folder Raha Tools supaya modul bersama (Core) bisa di-import
+_RAHA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _RAHA_ROOT not in sys.path:
+    sys.path.append(_RAHA_ROOT)
 
-# Fungsi untuk mendapatkan semua keyframe dari sebuah bone
-def get_bone_keyframes(bone):
-    keyframes = set()
-    
-    # Cek location
-    if bone.id_data.animation_data and bone.id_data.animation_data.action:
-        for fcurve in bone.id_data.animation_data.action.fcurves:
-            if fcurve.data_path.startswith(f'pose.bones["{bone.name}"]'):
-                for point in fcurve.keyframe_points:
-                    keyframes.add(int(point.co[0]))
-    
-    return sorted(keyframes)
+from Core import bake_engine, key_reduction, sample_cache
+from Core.fcurve_index import FCurveIndex
 
-# Fungsi untuk menghapus keyframe di frame yang tidak diinginkan
-def clean_keyframes(bone, keep_frames):
-    if not bone.id_data.animation_data or not bone.id_data.animation_data.action:
-        return
+stored_matrix_world = None
+original_keyframes = {}  # Untuk menyimpan keyframe asli
 
-    action = bone.id_data.animation_data.action
+def _remove_constraints(operator, owner, label):
+    if owner.constraints:
+        for constraint in reversed(owner.constraints):
+            owner.constraints.remove(constraint)
+        operator.report({'INFO'}, f"Semua constraint pada {label} telah dihapus.")
+
+
+def bake_targets(operator, context, targets):
+    """
+    Bake banyak target dalam satu sweep frame lalu tulis key per action.
+    targets: {object: list pose bone} untuk armature, {object: None} untuk
+    transform object. Opsi diambil dari properti scene Smart Bake.
+    """
+    scene = context.scene
+    start_frame = scene.start_frame
+    end_frame = scene.end_frame
+    options = dict(location=scene.bake_location, rotation=scene.bake_rotation,
+                   scale=scene.bake_scale, custom=scene.bake_custom_props)
+
+    # Jika auto clean key diaktifkan, simpan keyframe asli per (object, bone)
+    original_keyframes.clear()
+    if scene.auto_clean_keys:
+        for obj, bones in targets.items():
+            index = FCurveIndex.from_object(obj)
+            for name in ([bone.name for bone in bones] if bones is not None else [None]):
+                original_keyframes[(obj.name, name)] = [int(f) for f in index.bone_frames(name)]
+
+    if not scene.bake_scale:
+        for obj, bones in targets.items():
+            for owner in (bones if bones is not None else [obj]):
+                for constraint in owner.constraints:
+                    if constraint.type == 'CHILD_OF':
+                        constraint.use_scale_x = False
+                        constraint.use_scale_y = False
+                        constraint.use_scale_z = False
+                        operator.report({'INFO'}, f"Nonaktifkan scale pada constraint {constraint.name} di {owner.name}.")
+
+    # Satu sweep frame untuk semua target, key ditulis setelahnya
+    samples = bake_engine.sample(context, {obj: [bone.name for bone in bones] if bones is not None else None
+                                           for obj, bones in targets.items()},
+                                 start_frame, end_frame, custom_props=scene.bake_custom_props)
+
+    count = 0
+    for obj, bones in targets.items():
+        if bones is None:
+            bake_engine.write_object_keys(obj, samples[obj], **options)
+            owners = [(None, obj)]
+        else:
+            for bone in bones:
+                bake_engine.write_bone_keys(obj, samples[obj], bone, **options)
+            owners = [(bone.name, bone) for bone in bones]
 
-    # Dapatkan semua frame yang ada sekarang
-    current_frames = get_bone_keyframes(bone)
+        for name, owner in owners:
+            label = f"bone {name}" if name is not None else f"object {obj.name}"
 
-    # Frame yang perlu dihapus = current_frames - keep_frames
-    frames_to_delete = set(current_frames) - set(keep_frames)
+            # Auto clean: reduksi key hasil bake (RDP) hanya di channel yang di-bake, key asli tetap dipertahankan
+            keep_frames = original_keyframes.get((obj.name, name))
+            if scene.auto_clean_keys and keep_frames is not None:
+                props = bake_engine.baked_props(samples[obj], name, owner.rotation_mode, **options)
+                removed = key_reduction.reduce_bone(obj, name, start_frame, end_frame, scene.clean_tolerance,
+                                                    props=props, keep_frames=keep_frames)
+                operator.report({'INFO'}, f"{removed} keyframe pada {label} telah dibersihkan")
 
-    for frame in frames_to_delete:
-        bone.keyframe_delete(data_path="location", frame=frame)
-        bone.keyframe_delete(data_path="rotation_quaternion", frame=frame)
-        bone.keyframe_delete(data_path="rotation_euler", frame=frame)
-        bone.keyframe_delete(data_path="scale", frame=frame)
+            # Hapus constraint jika diaktifkan
+            if scene.delete_constraints:
+                _remove_constraints(operator, owner, label)
+        count += len(owners)
 
-        # Custom properties → hapus hanya jika memang ada fcurve-nya
-        for prop in bone.keys():
-            if prop not in "_RNA_UI":
-                path = f'pose.bones["{bone.name}"]["{prop}"]'
-                if any(fc.data_path == path for fc in action.fcurves):
-                    bone.keyframe_delete(data_path=f'["{prop}"]', frame=frame)
+    scene.frame_set(scene.frame_current)
+    return count
 
 
 class RahaSmartBake(bpy.types.Operator):
@@ -52,129 +92,12 @@ class RahaSmartBake(bpy.types.Operator):
     
     def execute(self, context):
         obj = context.object
-        scene = context.scene
-        start_frame = scene.start_frame
-        end_frame = scene.end_frame
-        
-        # Ambil status checkbox
-        bake_location = scene.bake_location
-        bake_rotation = scene.bake_rotation
-        bake_scale = scene.bake_scale
-        bake_custom_props = scene.bake_custom_props
-        delete_constraints = scene.delete_constraints
-        auto_clean_keys = scene.auto_clean_keys  # Checkbox baru
         
         if obj and obj.type == 'ARMATURE' and obj.mode == 'POSE':
             selected_bones = context.selected_pose_bones
             if selected_bones:
-                # Jika auto clean key diaktifkan, simpan keyframe asli
-                if auto_clean_keys:
-                    original_keyframes.clear()
-                    for bone in selected_bones:
-                        original_keyframes[bone.name] = get_bone_keyframes(bone)
-                
-                if not bake_scale:
-                    for bone in selected_bones:
-                        for constraint in bone.constraints:
-                            if constraint.type == 'CHILD_OF':
-                                constraint.use_scale_x = False
-                                constraint.use_scale_y = False
-                                constraint.use_scale_z = False
-                                self.report({'INFO'}, f"Nonaktifkan scale pada constraint {constraint.name} di bone {bone.name}.")
-
-                for bone in selected_bones:
-                    for frame in range(start_frame, end_frame + 1):
-                        scene.frame_set(frame)
-                        
-                        matrix = obj.matrix_world @ bone.matrix
-                        location, rotation, scale = matrix.decompose()
-                        stored_matrices[bone.name] = {
-                            "matrix": [list(row) for row in matrix],
-                            "location": list(location),
-                            "rotation": list(rotation),
-                            "scale": list(scale)
-                        }
-                        
-                        scene.frame_set(frame + 1)
-                        
-                        if bake_location:
-                            bone.keyframe_insert(data_path="location", index=-1)
-                        if bake_rotation:
-                            bone.keyframe_insert(data_path="rotation_quaternion", index=-1)
-                            bone.keyframe_insert(data_path="rotation_euler", index=-1)
-                        if bake_scale:
-                            bone.keyframe_insert(data_path="scale", index=-1)
-                        if bake_custom_props:
-                            for prop in bone.keys():
-                                if prop not in "_RNA_UI":
-                                    try:
-                                        bone.keyframe_insert(data_path=f'["{prop}"]')
-                                    except TypeError:
-                                        # Skip kalau properti ini tidak bisa dianimasikan
-                                        pass
-
-                        
-                        scene.frame_set(frame)
-                        
-                        matrix_data = stored_matrices[bone.name]["matrix"]
-                        location_data = stored_matrices[bone.name]["location"]
-                        rotation_data = stored_matrices[bone.name]["rotation"]
-                        scale_data = stored_matrices[bone.name]["scale"]
-                        
-                        new_matrix = mathutils.Matrix.Translation(location_data) @ rotation.to_matrix().to_4x4()
-                        new_matrix = new_matrix @ mathutils.Matrix.Scale(scale_data[0], 4, (1, 0, 0))
-                        new_matrix = new_matrix @ mathutils.Matrix.Scale(scale_data[1], 4, (0, 1, 0))
-                        new_matrix = new_matrix @ mathutils.Matrix.Scale(scale_data[2], 4, (0, 0, 1))
-                        
-                        bone.matrix = obj.matrix_world.inverted() @ new_matrix
-                        
-                        if bake_location:
-                            bone.keyframe_insert(data_path="location", index=-1)
-                        if bake_rotation:
-                            bone.keyframe_insert(data_path="rotation_quaternion", index=-1)
-                            bone.keyframe_insert(data_path="rotation_euler", index=-1)
-                        if bake_scale:
-                            bone.keyframe_insert(data_path="scale", index=-1)
-                        if bake_custom_props:
-                            for prop in bone.keys():
-                                if prop not in "_RNA_UI":
-                                    try:
-                                        bone.keyframe_insert(data_path=f'["{prop}"]')
-                                    except TypeError:
-                                        # Skip kalau properti ini tidak bisa dianimasikan
-                                        pass
-
-                                
-                    scene.frame_set(end_frame + 1)
-                    if bake_location:
-                        bone.keyframe_delete(data_path="location")
-                    if bake_rotation:
-                        bone.keyframe_delete(data_path="rotation_quaternion")
-                        bone.keyframe_delete(data_path="rotation_euler")
-                    if bake_scale:
-                        bone.keyframe_delete(data_path="scale")
-                    if bake_custom_props:
-                        for prop in bone.keys():
-                            if prop not in "_RNA_UI":
-                                try:
-                                    bone.keyframe_insert(data_path=f'["{prop}"]')
-                                except TypeError:
-                                    # Skip kalau properti ini tidak bisa dianimasikan
-                                    pass
-                   
-                    
-                    # Auto clean keyframes jika diaktifkan
-                    if auto_clean_keys and bone.name in original_keyframes:
-                        clean_keyframes(bone, original_keyframes[bone.name])
-                        self.report({'INFO'}, f"Keyframe pada bone {bone.name} telah dibersihkan")
-                    
-                    # Hapus constraint jika diaktifkan
-                    if delete_constraints and bone.constraints:
-                        for constraint in reversed(bone.constraints):
-                            bone.constraints.remove(constraint)
-                        self.report({'INFO'}, f"Semua constraint pada bone {bone.name} telah dihapus.")
-
-                self.report({'INFO'}, f"Smart Bake selesai untuk {len(selected_bones)} bone.")
+                count = bake_targets(self, context, {obj: list(selected_bones)})
+                self.report({'INFO'}, f"Smart Bake selesai untuk {count} bone.")
             else:
                 self.report({'WARNING'}, "Tidak ada bone yang dipilih.")
         else:
@@ -182,6 +105,31 @@ class RahaSmartBake(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class RahaSmartBakeSelected(bpy.types.Operator):
+    """Smart bake semua object terpilih sekaligus: bone terpilih tiap armature (semua bone kalau tidak ada yang dipilih) dan transform object lain"""
+    bl_idname = "object.smart_bake_selected"
+    bl_label = "Smart Bake Selected Objects"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        targets = {}
+        for obj in context.selected_objects:
+            if obj.type == 'ARMATURE':
+                # Seleksi bone dibaca langsung dari data bone, tanpa masuk Pose Mode
+                bones = [pb for pb in obj.pose.bones if pb.bone.select] or list(obj.pose.bones)
+                targets[obj] = bones
+            else:
+                targets[obj] = None
+
+        if not targets:
+            self.report({'WARNING'}, "Tidak ada object yang dipilih.")
+            return {'CANCELLED'}
+
+        count = bake_targets(self, context, targets)
+        self.report({'INFO'}, f"Smart Bake selesai untuk {count} bone/object di {len(targets)} object.")
+        return {'FINISHED'}
+
+
 class RahaBoneBakePanel(bpy.types.Panel):
     bl_label = "Smart Bake"
     bl_idname = "OBJECT_PT_bone_bake"
@@ -212,18 +160,23 @@ class RahaBoneBakePanel(bpy.types.Panel):
         
         box.prop(scene, "delete_constraints", text="Delete Constraints After Bake")
         box.prop(scene, "auto_clean_keys", text="Auto Clean Keyframes")  # Checkbox baru
-        box.operator("object.smart_bake", text="Bake Animation", icon='RENDER_ANIMATION')              
+        if scene.auto_clean_keys:
+            box.prop(scene, "clean_tolerance", text="Tolerance")
+        box.operator("object.smart_bake", text="Bake Animation", icon='RENDER_ANIMATION')
+        box.operator("object.smart_bake_selected", text="Bake Selected Objects", icon='OUTLINER_OB_GROUP_INSTANCE')              
 
 
 classes = [
 
     RahaSmartBake,
+    RahaSmartBakeSelected,
     RahaBoneBakePanel
 ]
 
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
+    sample_cache.register()
     
     bpy.types.Scene.start_frame = bpy.props.IntProperty(name="Start Frame", default=1)
     bpy.types.Scene.end_frame = bpy.props.IntProperty(name="End Frame", default=250)
@@ -239,13 +192,21 @@ def register():
     )
     bpy.types.Scene.auto_clean_keys = bpy.props.BoolProperty(
         name="Auto Clean Keyframes",
-        description="Remember original keyframes and clean up after baking",
+        description="Reduce baked keys within the tolerance, keeping the original keyframes",
         default=False
-    )   
+    )
+    bpy.types.Scene.clean_tolerance = bpy.props.FloatProperty(
+        name="Clean Tolerance",
+        description="Maximum value error allowed when removing baked keys",
+        default=0.001,
+        min=0.0,
+        precision=4
+    )
     
 def unregister():
     for cls in classes:
         bpy.utils.unregister_class(cls)
+    sample_cache.unregister()
     
     del bpy.types.Scene.start_frame
     del bpy.types.Scene.end_frame
@@ -253,6 +214,9 @@ def unregister():
     del bpy.types.Scene.bake_rotation
     del bpy.types.Scene.bake_scale
     del bpy.types.Scene.bake_custom_props
+    del bpy.types.Scene.delete_constraints
+    del bpy.types.Scene.auto_clean_keys
+    del bpy.types.Scene.clean_tolerance
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
@@ -1,125 +1,171 @@
 import bpy
 import mathutils
+import numpy as np
+import os
+import sys
+
+# Root folder Raha Tools supaya modul bersama (Core) bisa di-import
+_RAHA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _RAHA_ROOT not in sys.path:
+    sys.path.append(_RAHA_ROOT)
+
+from Core import bake_engine, sample_cache, step_snap
+
+#============================== MATRIX SLOTS ==============================
+# Slot fake constraint disimpan di scene (ikut tersimpan di .blend): satu
+# slot = matrix world satu bone di satu frame, dikelompokkan per nama slot
+# (mis. "Kaki kiri" berisi beberapa frame kontak).
+class RahaMatrixSlot(bpy.types.PropertyGroup):
+    name: bpy.props.StringProperty(name="Slot")
+    armature: bpy.props.StringProperty(name="Armature")
+    bone: bpy.props.StringProperty(name="Bone")
+    frame: bpy.props.IntProperty(name="Frame")
+    # Matrix world row-major; dibaca massal lewat foreach_get("matrix")
+    matrix: bpy.props.FloatVectorProperty(name="Matrix", size=16)
+
+
+class RAHA_UL_matrix_slots(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.label(text=item.name, icon='CONSTRAINT_BONE')
+        row.label(text=item.bone)
+        row.label(text=f"@{item.frame}")
+
+
+def slot_matrices(slots):
+    """Semua matrix slot sebagai array (n, 4, 4), satu foreach_get."""
+    data = np.empty(len(slots) * 16, dtype=np.float64)
+    slots.foreach_get("matrix", data)
+    return data.reshape(-1, 4, 4)
+
+
+def save_slots(context, obj, pose_bones, slot_name):
+    """Simpan matrix world pose_bones di frame saat ini ke slot_name (slot yang sama ditimpa)."""
+    scene = context.scene
+    slots = scene.raha_matrix_slots
+    frame = scene.frame_current
+    samples = bake_engine.current_samples(context, obj, [pb.name for pb in pose_bones])
+
+    existing = {(slot.name, slot.armature, slot.bone, slot.frame): i for i, slot in enumerate(slots)}
+    for i, name in enumerate(samples.bones):
+        index = existing.get((slot_name, obj.name, name, frame))
+        if index is None:
+            slot = slots.add()
+            slot.name, slot.armature, slot.bone, slot.frame = slot_name, obj.name, name, frame
+            index = len(slots) - 1
+        slots[index].matrix = samples.world[0, i].ravel()
+    scene.raha_matrix_slot_index = index
+    return len(samples.bones)
+
+
+def _pick_slot(candidates, frame):
+    """Slot di frame terdekat sebelum/sama dengan frame, kalau tidak ada yang terdekat sesudahnya."""
+    before = [c for c in candidates if c[1] <= frame]
+    if before:
+        return max(before, key=lambda c: c[1])[0]
+    return min(candidates, key=lambda c: c[1])[0]
+
+
+def resolve_slots(scene, slot_name, obj, pose_bones):
+    """
+    Index slot untuk setiap bone: slot bone itu sendiri di grup slot_name.
+    Grup yang hanya berisi satu bone berlaku untuk semua bone (paste universal).
+    """
+    frame = scene.frame_current
+    group = [(i, slot) for i, slot in enumerate(scene.raha_matrix_slots) if slot.name == slot_name]
+    by_bone = {}
+    for i, slot in group:
+        by_bone.setdefault(slot.bone, []).append((i, slot.frame, slot.armature == obj.name))
+    single = len(by_bone) == 1
+
+    result = []
+    for pose_bone in pose_bones:
+        candidates = by_bone.get(pose_bone.name)
+        if candidates is None and single:
+            candidates = next(iter(by_bone.values()))
+        if not candidates:
+            result.append(None)
+            continue
+        # Slot dari armature yang sama didahulukan
+        same_rig = [c for c in candidates if c[2]] or candidates
+        result.append(_pick_slot(same_rig, frame))
+    return result
+
+
+def apply_slots(operator, context, mirror_matrix=None):
+    """Terapkan grup slot aktif ke semua bone terpilih sekaligus (key kalau Auto Key aktif)."""
+    scene = context.scene
+    slots = scene.raha_matrix_slots
+    if not slots or not (0 <= scene.raha_matrix_slot_index < len(slots)):
+        operator.report({'ERROR'}, "Tidak ada matrix yang disimpan")
+        return None
+    if context.mode != 'POSE':
+        operator.report({'ERROR'}, "Harus di Pose Mode")
+        return None
+
+    obj = context.active_object
+    bones = context.selected_pose_bones or [context.active_pose_bone]
+    slot_name = slots[scene.raha_matrix_slot_index].name
+    indices = resolve_slots(scene, slot_name, obj, bones)
+    bones = [pb for pb, i in zip(bones, indices) if i is not None]
+    indices = [i for i in indices if i is not None]
+    if not bones:
+        operator.report({'ERROR'}, f"Slot '{slot_name}' tidak punya matrix untuk bone terpilih")
+        return None
+
+    reference = slot_matrices(slots)[indices]
+    if mirror_matrix is not None:
+        reference = mirror_matrix @ reference @ mirror_matrix
+
+    samples = bake_engine.current_samples(context, obj, [pb.name for pb in bones])
+    world_new = step_snap.lock_axes(samples.world[0], reference, axis_masks(scene))[None]
+    local_new = step_snap.solve_locals(samples, bones, world_new)
+    for i, pose_bone in enumerate(bones):
+        pose_bone.matrix_basis = mathutils.Matrix(local_new[0, i].tolist())
+
+    # Kalau autokey aktif → insert keyframe (massal, channel rotasi sesuai rotation_mode)
+    autokey = scene.tool_settings.use_keyframe_insert_auto
+    if autokey:
+        applied = bake_engine.BakeSamples(samples.frames, samples.bones, world_new, local_new, {},
+                                          samples.object_world)
+        for pose_bone in bones:
+            bake_engine.write_bone_keys(obj, applied, pose_bone, custom=False)
+    return len(bones), autokey
 
-stored_matrix_world = None
-stored_matrices = {}
 
 class RahaSaveBoneMatrix(bpy.types.Operator):
     bl_idname = "pose.raha_save_bone_matrix"
     bl_label = "Save Fake Constraint (Universal)"
-    bl_description = "Save active bone's world matrix to apply to other bones"
+    bl_description = "Save world matrices of the selected bones at this frame into the named slot"
+    bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        global stored_matrix_world
         if context.mode != 'POSE' or not context.active_pose_bone:
             self.report({'ERROR'}, "Harus di Pose Mode dengan bone aktif")
             return {'CANCELLED'}
 
         obj = context.active_object
-        bone = context.active_pose_bone
-        stored_matrix_world = obj.matrix_world @ bone.matrix
+        bones = context.selected_pose_bones or [context.active_pose_bone]
+        slot_name = context.scene.raha_matrix_slot_name or "Slot"
+        count = save_slots(context, obj, bones, slot_name)
 
-        self.report({'INFO'}, f"Matrix world bone '{bone.name}' tersimpan!")
+        self.report({'INFO'}, f"Matrix world {count} bone tersimpan di slot '{slot_name}'!")
         return {'FINISHED'}
 
 
 class RahaApplyBoneMatrix(bpy.types.Operator):
     bl_idname = "pose.raha_apply_bone_matrix"
     bl_label = "Apply Fake Constraint (Universal)"
-    bl_description = "Apply saved world matrix to active or selected bones (auto keyframe if Auto Key is on)"
+    bl_description = "Apply the active slot's world matrices to the selected bones (auto keyframe if Auto Key is on)"
+    bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        global stored_matrix_world
-        scene = context.scene
-        if stored_matrix_world is None:
-            self.report({'ERROR'}, "Tidak ada matrix yang disimpan")
+        result = apply_slots(self, context)
+        if result is None:
             return {'CANCELLED'}
 
-        if context.mode != 'POSE':
-            self.report({'ERROR'}, "Harus di Pose Mode")
-            return {'CANCELLED'}
-
-        obj = context.active_object
-        bones = context.selected_pose_bones or [context.active_pose_bone]
-
-        autokey = context.scene.tool_settings.use_keyframe_insert_auto
-        frame = context.scene.frame_current
-
-        for bone in bones:
-            # Dapatkan transformasi saat ini dari bone
-            current_matrix = obj.matrix_world @ bone.matrix
-            current_location, current_rotation, current_scale = current_matrix.decompose()
-            
-            # Dapatkan transformasi yang disimpan
-            saved_location, saved_rotation, saved_scale = stored_matrix_world.decompose()
-            
-            # Apply custom axis settings
-            new_location = mathutils.Vector()
-            new_rotation = mathutils.Quaternion()
-            new_scale = mathutils.Vector()
-            
-            if scene.apply_custom_axis:
-                # Apply location berdasarkan custom axis
-                if scene.apply_location:
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"location_axis_{axis}"):
-                            new_location[i] = saved_location[i]
-                        else:
-                            new_location[i] = current_location[i]
-                else:
-                    new_location = current_location
-                    
-                # Apply rotation berdasarkan custom axis
-                if scene.apply_rotation:
-                    # Convert ke Euler untuk pemilihan axis yang lebih mudah
-                    current_euler = current_rotation.to_euler()
-                    saved_euler = saved_rotation.to_euler()
-                    
-                    new_euler = mathutils.Euler()
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"rotation_axis_{axis}"):
-                            new_euler[i] = saved_euler[i]
-                        else:
-                            new_euler[i] = current_euler[i]
-                    
-                    new_rotation = new_euler.to_quaternion()
-                else:
-                    new_rotation = current_rotation
-                    
-                # Apply scale berdasarkan custom axis
-                if scene.apply_scale:
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"scale_axis_{axis}"):
-                            new_scale[i] = saved_scale[i]
-                        else:
-                            new_scale[i] = current_scale[i]
-                else:
-                    new_scale = current_scale
-            else:
-                # Mode normal - apply semua
-                new_location = saved_location
-                new_rotation = saved_rotation
-                new_scale = saved_scale
-            
-            # Bangun matrix baru
-            new_matrix = mathutils.Matrix.Translation(new_location)
-            new_matrix @= new_rotation.to_matrix().to_4x4()
-            new_matrix @= mathutils.Matrix.Diagonal(new_scale).to_4x4()
-            
-            # Convert ke local space
-            local_matrix = obj.matrix_world.inverted() @ new_matrix
-            bone.matrix = local_matrix
-
-            # Kalau autokey aktif → insert keyframe
-            if autokey:
-                bone.keyframe_insert(data_path="location", frame=frame)
-                if bone.rotation_mode == 'QUATERNION':
-                    bone.keyframe_insert(data_path="rotation_quaternion", frame=frame)
-                else:
-                    bone.keyframe_insert(data_path="rotation_euler", frame=frame)
-                bone.keyframe_insert(data_path="scale", frame=frame)
-
-        msg = f"Matrix diterapkan ke {len(bones)} bone"
+        count, autokey = result
+        msg = f"Matrix diterapkan ke {count} bone"
         if autokey:
             msg += " + keyframe dimasukkan"
         self.report({'INFO'}, msg)
@@ -129,7 +175,8 @@ class RahaApplyBoneMatrix(bpy.types.Operator):
 class RahaApplyBoneMatrixMirror(bpy.types.Operator):
     bl_idname = "pose.raha_apply_bone_matrix_mirror"
     bl_label = "Apply Fake Constraint (Mirror)"
-    bl_description = "Apply saved world matrix with mirror on selected axis (auto keyframe if Auto Key is on)"
+    bl_description = "Apply the active slot's world matrices with mirror on selected axis (auto keyframe if Auto Key is on)"
+    bl_options = {'REGISTER', 'UNDO'}
     
     mirror_axis: bpy.props.EnumProperty(
         name="Mirror Axis",
@@ -146,230 +193,84 @@ class RahaApplyBoneMatrixMirror(bpy.types.Operator):
         return context.window_manager.invoke_props_dialog(self)
     
     def execute(self, context):
-        global stored_matrix_world
-        scene = context.scene
-        if stored_matrix_world is None:
-            self.report({'ERROR'}, "No matrix saved")
-            return {'CANCELLED'}
+        # Buat mirror matrix
+        mirror_mat = np.eye(4)
+        mirror_mat["XYZ".index(self.mirror_axis), "XYZ".index(self.mirror_axis)] = -1.0
 
-        if context.mode != 'POSE':
-            self.report({'ERROR'}, "Must be in Pose Mode")
+        result = apply_slots(self, context, mirror_mat)
+        if result is None:
             return {'CANCELLED'}
 
-        obj = context.active_object
-        bones = context.selected_pose_bones or [context.active_pose_bone]
-
-        # Buat mirror matrix
-        if self.mirror_axis == 'X':
-            mirror_mat = mathutils.Matrix.Scale(-1, 4, (1, 0, 0))
-        elif self.mirror_axis == 'Y':
-            mirror_mat = mathutils.Matrix.Scale(-1, 4, (0, 1, 0))
-        else:  # Z
-            mirror_mat = mathutils.Matrix.Scale(-1, 4, (0, 0, 1))
-        
-        autokey = context.scene.tool_settings.use_keyframe_insert_auto
-        frame = context.scene.frame_current
-
-        for bone in bones:
-            # Dapatkan transformasi saat ini
-            current_matrix = obj.matrix_world @ bone.matrix
-            current_location, current_rotation, current_scale = current_matrix.decompose()
-            
-            # Buat mirrored matrix
-            mirrored_world = mirror_mat @ stored_matrix_world @ mirror_mat
-            saved_location, saved_rotation, saved_scale = mirrored_world.decompose()
-            
-            # Apply custom axis settings
-            new_location = mathutils.Vector()
-            new_rotation = mathutils.Quaternion()
-            new_scale = mathutils.Vector()
-            
-            if scene.apply_custom_axis:
-                if scene.apply_location:
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"location_axis_{axis}"):
-                            new_location[i] = saved_location[i]
-                        else:
-                            new_location[i] = current_location[i]
-                else:
-                    new_location = current_location
-                    
-                if scene.apply_rotation:
-                    # Convert ke Euler untuk pemilihan axis
-                    current_euler = current_rotation.to_euler()
-                    saved_euler = saved_rotation.to_euler()
-                    
-                    new_euler = mathutils.Euler()
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"rotation_axis_{axis}"):
-                            new_euler[i] = saved_euler[i]
-                        else:
-                            new_euler[i] = current_euler[i]
-                    
-                    new_rotation = new_euler.to_quaternion()
-                else:
-                    new_rotation = current_rotation
-                    
-                if scene.apply_scale:
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"scale_axis_{axis}"):
-                            new_scale[i] = saved_scale[i]
-                        else:
-                            new_scale[i] = current_scale[i]
-                else:
-                    new_scale = current_scale
-            else:
-                new_location = saved_location
-                new_rotation = saved_rotation
-                new_scale = saved_scale
-            
-            # Bangun matrix baru
-            new_matrix = mathutils.Matrix.Translation(new_location)
-            new_matrix @= new_rotation.to_matrix().to_4x4()
-            new_matrix @= mathutils.Matrix.Diagonal(new_scale).to_4x4()
-            
-            local_matrix = obj.matrix_world.inverted() @ new_matrix
-            bone.matrix = local_matrix
-
-            if autokey:
-                bone.keyframe_insert(data_path="location", frame=frame)
-                if bone.rotation_mode == 'QUATERNION':
-                    bone.keyframe_insert(data_path="rotation_quaternion", frame=frame)
-                else:
-                    bone.keyframe_insert(data_path="rotation_euler", frame=frame)
-                bone.keyframe_insert(data_path="scale", frame=frame)
-
-        msg = f"Mirrored matrix applied to {len(bones)} bones (Axis: {self.mirror_axis})"
+        count, autokey = result
+        msg = f"Mirrored matrix applied to {count} bones (Axis: {self.mirror_axis})"
         if autokey:
             msg += " + keyframe inserted"
         self.report({'INFO'}, msg)
         return {'FINISHED'}
 
 
-class RahaForwardAnimation(bpy.types.Operator):
-    """Save transformation at start frame then apply it forward to end frame with keyframes"""
-    bl_idname = "object.forward_animation"
-    bl_label = "Forward"
-    
+class RahaRemoveMatrixSlot(bpy.types.Operator):
+    bl_idname = "pose.raha_remove_matrix_slot"
+    bl_label = "Remove Matrix Slot"
+    bl_description = "Remove the active fake constraint slot"
+    bl_options = {'REGISTER', 'UNDO'}
+
     def execute(self, context):
-        obj = context.object
         scene = context.scene
-        start_frame = scene.start_frame
-        end_frame = scene.end_frame
-
-        if not (obj and obj.type == 'ARMATURE' and obj.mode == 'POSE'):
-            self.report({'WARNING'}, "Harap masuk ke Pose Mode dan pilih armature aktif.")
+        index = scene.raha_matrix_slot_index
+        if not (0 <= index < len(scene.raha_matrix_slots)):
             return {'CANCELLED'}
+        scene.raha_matrix_slots.remove(index)
+        scene.raha_matrix_slot_index = min(index, len(scene.raha_matrix_slots) - 1)
+        return {'FINISHED'}
 
-        active_pb = context.active_pose_bone
-        if not active_pb:
-            self.report({'WARNING'}, "Tidak ada bone aktif.")
-            return {'CANCELLED'}
 
-        bone = obj.pose.bones.get(active_pb.name)
-        if not bone:
-            self.report({'WARNING'}, "Bone aktif tidak ditemukan.")
-            return {'CANCELLED'}
+def axis_masks(scene):
+    """Mask sumbu dari setting Custom Axis (None = semua transform dikunci)."""
+    if not scene.apply_custom_axis:
+        return None
+    masks = {}
+    for group in ("location", "rotation", "scale"):
+        enabled = getattr(scene, f"apply_{group}")
+        masks[group] = [enabled and getattr(scene, f"{group}_axis_{axis}") for axis in "xyz"]
+    return masks
 
-        # simpan frame saat ini supaya bisa dikembalikan
-        current_frame = scene.frame_current
-
-        # pindah ke start_frame dan ambil transform yang dievaluasi di frame itu
-        scene.frame_set(start_frame)
-        depsgraph = context.evaluated_depsgraph_get()
-        obj_eval = obj.evaluated_get(depsgraph)
-        bone_eval = obj_eval.pose.bones.get(bone.name)
-        if not bone_eval:
-            scene.frame_set(current_frame)
-            self.report({'ERROR'}, f"Gagal mengevaluasi bone '{bone.name}' pada frame {start_frame}.")
-            return {'CANCELLED'}
 
-        # Simpan transformasi awal
-        start_matrix = obj_eval.matrix_world @ bone_eval.matrix
-        start_location, start_rotation, start_scale = start_matrix.decompose()
-        
-        stored_matrices[bone.name] = {
-            "location": list(start_location),
-            "rotation": list(start_rotation),
-            "scale": list(start_scale)
-        }
-
-        # Terapkan ke semua frame dalam rentang
-        for f in range(start_frame, end_frame + 1):
-            scene.frame_set(f)
-            
-            # Dapatkan transformasi saat ini
-            current_matrix = obj.matrix_world @ bone.matrix
-            current_location, current_rotation, current_scale = current_matrix.decompose()
-            
-            # Apply custom axis settings
-            new_location = mathutils.Vector()
-            new_rotation = mathutils.Quaternion()
-            new_scale = mathutils.Vector()
-            
-            if scene.apply_custom_axis:
-                # Location
-                if scene.apply_location:
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"location_axis_{axis}"):
-                            new_location[i] = start_location[i]
-                        else:
-                            new_location[i] = current_location[i]
-                else:
-                    new_location = current_location
-                
-                # Rotation
-                if scene.apply_rotation:
-                    # Convert ke Euler untuk pemilihan axis
-                    current_euler = current_rotation.to_euler()
-                    start_euler = start_rotation.to_euler()
-                    
-                    new_euler = mathutils.Euler()
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"rotation_axis_{axis}"):
-                            new_euler[i] = start_euler[i]
-                        else:
-                            new_euler[i] = current_euler[i]
-                    
-                    new_rotation = new_euler.to_quaternion()
-                else:
-                    new_rotation = current_rotation
-                
-                # Scale
-                if scene.apply_scale:
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"scale_axis_{axis}"):
-                            new_scale[i] = start_scale[i]
-                        else:
-                            new_scale[i] = current_scale[i]
-                else:
-                    new_scale = current_scale
-            else:
-                # Mode normal
-                new_location = start_location
-                new_rotation = start_rotation
-                new_scale = start_scale
-            
-            # Bangun matrix baru
-            new_matrix = mathutils.Matrix.Translation(new_location)
-            new_matrix @= new_rotation.to_matrix().to_4x4()
-            new_matrix @= mathutils.Matrix.Diagonal(new_scale).to_4x4()
-            
-            bone.matrix = obj.matrix_world.inverted() @ new_matrix
+def run_range_snap(operator, context, use_end_frame):
+    """Snap semua bone terpilih ke transform di start (forward) / end (backward) frame."""
+    obj = context.object
+    scene = context.scene
+    start_frame = scene.start_frame
+    end_frame = scene.end_frame
 
-            # Insert keyframes
-            bone.keyframe_insert(data_path="location", frame=f)
-            if bone.rotation_mode == 'QUATERNION':
-                bone.keyframe_insert(data_path="rotation_quaternion", frame=f)
-            else:
-                bone.keyframe_insert(data_path="rotation_euler", frame=f)
-            bone.keyframe_insert(data_path="scale", frame=f)
+    if not (obj and obj.type == 'ARMATURE' and obj.mode == 'POSE'):
+        operator.report({'WARNING'}, "Harap masuk ke Pose Mode dan pilih armature aktif.")
+        return {'CANCELLED'}
 
-        # kembalikan ke frame semula
-        scene.frame_set(current_frame)
+    bones = context.selected_pose_bones or ([context.active_pose_bone] if context.active_pose_bone else [])
+    if not bones:
+        operator.report({'WARNING'}, "Tidak ada bone aktif.")
+        return {'CANCELLED'}
+    if end_frame < start_frame:
+        operator.report({'WARNING'}, "End frame harus lebih besar dari start frame.")
+        return {'CANCELLED'}
 
-        self.report({'INFO'}, "Forward animation applied.")
-        return {'FINISHED'}
+    reference_frame = end_frame if use_end_frame else start_frame
+    step_snap.snap_range(context, obj, bones, start_frame, end_frame, reference_frame, axis_masks(scene))
+    scene.frame_set(scene.frame_current)
+    return {'FINISHED'}
+
+
+class RahaForwardAnimation(bpy.types.Operator):
+    """Save transformation at start frame then apply it forward to end frame with keyframes"""
+    bl_idname = "object.forward_animation"
+    bl_label = "Forward"
+    
+    def execute(self, context):
+        result = run_range_snap(self, context, use_end_frame=False)
+        if result == {'FINISHED'}:
+            self.report({'INFO'}, "Forward animation applied.")
+        return result
 
 
 class RahaBackwardAnimation(bpy.types.Operator):
@@ -378,108 +279,10 @@ class RahaBackwardAnimation(bpy.types.Operator):
     bl_label = "Backward"
     
     def execute(self, context):
-        obj = context.object
-        scene = context.scene
-        start_frame = scene.start_frame
-        end_frame = scene.end_frame
-        
-        if not (obj and obj.type == 'ARMATURE' and obj.mode == 'POSE'):
-            self.report({'WARNING'}, "Harap masuk ke Pose Mode dan pilih armature aktif.")
-            return {'CANCELLED'}
-
-        active_pb = context.active_pose_bone
-        if not active_pb:
-            self.report({'WARNING'}, "Tidak ada bone aktif.")
-            return {'CANCELLED'}
-
-        bone = obj.pose.bones.get(active_pb.name)
-        if not bone:
-            self.report({'WARNING'}, "Bone aktif tidak ditemukan.")
-            return {'CANCELLED'}
-
-        current_frame = scene.frame_current
-
-        # Simpan transformasi akhir
-        scene.frame_set(end_frame)
-        end_matrix = obj.matrix_world @ bone.matrix
-        end_location, end_rotation, end_scale = end_matrix.decompose()
-        
-        stored_matrices[bone.name] = {
-            "location": list(end_location),
-            "rotation": list(end_rotation),
-            "scale": list(end_scale)
-        }
-
-        # Terapkan mundur ke semua frame
-        for f in range(end_frame, start_frame - 1, -1):
-            scene.frame_set(f)
-            
-            # Dapatkan transformasi saat ini
-            current_matrix = obj.matrix_world @ bone.matrix
-            current_location, current_rotation, current_scale = current_matrix.decompose()
-            
-            # Apply custom axis settings
-            new_location = mathutils.Vector()
-            new_rotation = mathutils.Quaternion()
-            new_scale = mathutils.Vector()
-            
-            if scene.apply_custom_axis:
-                if scene.apply_location:
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"location_axis_{axis}"):
-                            new_location[i] = end_location[i]
-                        else:
-                            new_location[i] = current_location[i]
-                else:
-                    new_location = current_location
-                    
-                if scene.apply_rotation:
-                    # Convert ke Euler untuk pemilihan axis
-                    current_euler = current_rotation.to_euler()
-                    end_euler = end_rotation.to_euler()
-                    
-                    new_euler = mathutils.Euler()
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"rotation_axis_{axis}"):
-                            new_euler[i] = end_euler[i]
-                        else:
-                            new_euler[i] = current_euler[i]
-                    
-                    new_rotation = new_euler.to_quaternion()
-                else:
-                    new_rotation = current_rotation
-                    
-                if scene.apply_scale:
-                    for i, axis in enumerate(['x', 'y', 'z']):
-                        if getattr(scene, f"scale_axis_{axis}"):
-                            new_scale[i] = end_scale[i]
-                        else:
-                            new_scale[i] = current_scale[i]
-                else:
-                    new_scale = current_scale
-            else:
-                new_location = end_location
-                new_rotation = end_rotation
-                new_scale = end_scale
-            
-            # Bangun matrix baru
-            new_matrix = mathutils.Matrix.Translation(new_location)
-            new_matrix @= new_rotation.to_matrix().to_4x4()
-            new_matrix @= mathutils.Matrix.Diagonal(new_scale).to_4x4()
-            
-            bone.matrix = obj.matrix_world.inverted() @ new_matrix
-
-            # Insert keyframes
-            bone.keyframe_insert(data_path="location", frame=f)
-            if bone.rotation_mode == 'QUATERNION':
-                bone.keyframe_insert(data_path="rotation_quaternion", frame=f)
-            else:
-                bone.keyframe_insert(data_path="rotation_euler", frame=f)
-            bone.keyframe_insert(data_path="scale", frame=f)
-
-        scene.frame_set(current_frame)
-        self.report({'INFO'}, "Backward animation applied.")
-        return {'FINISHED'}
+        result = run_range_snap(self, context, use_end_frame=True)
+        if result == {'FINISHED'}:
+            self.report({'INFO'}, "Backward animation applied.")
+        return result
 
 
 class RahaBoneMatrixPanel(bpy.types.Panel):
@@ -530,6 +333,10 @@ class RahaBoneMatrixPanel(bpy.types.Panel):
         # Section 1: Fake Constraints
 
         box.label(text="Fake Constraints & StepSnap :")
+        box.prop(scene, "raha_matrix_slot_name", text="Slot")
+        row = box.row()
+        row.template_list("RAHA_UL_matrix_slots", "", scene, "raha_matrix_slots", scene, "raha_matrix_slot_index", rows=3)
+        row.operator("pose.raha_remove_matrix_slot", text="", icon='X')
         row = box.row(align=True)
         row.operator("pose.raha_save_bone_matrix", text="Save", icon="COPYDOWN")
         row.operator("pose.raha_apply_bone_matrix", text="Paste", icon="PASTEDOWN")
@@ -549,9 +356,12 @@ class RahaBoneMatrixPanel(bpy.types.Panel):
 
 
 classes = [
+    RahaMatrixSlot,
+    RAHA_UL_matrix_slots,
     RahaSaveBoneMatrix,
     RahaApplyBoneMatrix,
     RahaApplyBoneMatrixMirror,
+    RahaRemoveMatrixSlot,
     RahaForwardAnimation,
     RahaBackwardAnimation,
     RahaBoneMatrixPanel
@@ -560,6 +370,16 @@ classes = [
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
+    sample_cache.register()
+    
+    # Slot fake constraint (tersimpan di .blend)
+    bpy.types.Scene.raha_matrix_slots = bpy.props.CollectionProperty(type=RahaMatrixSlot)
+    bpy.types.Scene.raha_matrix_slot_index = bpy.props.IntProperty(name="Active Slot", default=-1)
+    bpy.types.Scene.raha_matrix_slot_name = bpy.props.StringProperty(
+        name="Slot Name",
+        description="Name of the slot that Save writes into",
+        default="Slot"
+    )
     
     # Frame range properties
     bpy.types.Scene.start_frame = bpy.props.IntProperty(name="Start Frame", default=1)
@@ -602,8 +422,12 @@ def register():
 def unregister():
     for cls in classes:
         bpy.utils.unregister_class(cls)
+    sample_cache.unregister()
     
     # Hapus properties
+    del bpy.types.Scene.raha_matrix_slots
+    del bpy.types.Scene.raha_matrix_slot_index
+    del bpy.types.Scene.raha_matrix_slot_name
     del bpy.types.Scene.start_frame
     del bpy.types.Scene.end_frame
     del bpy.types.Scene.apply_custom_axis
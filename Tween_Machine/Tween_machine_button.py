@@ -1,4 +1,13 @@
 import bpy
+import os
+import sys
+
+# Root folder Raha Tools supaya modul bersama (Core) bisa di-import
+_RAHA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _RAHA_ROOT not in sys.path:
+    sys.path.append(_RAHA_ROOT)
+
+from Core.fcurve_index import FCurveIndex
 
 #Operator untuk menjalankan pose breakdown dengan faktor tertentu
 class PoseBreakdownOperator(bpy.types.Operator):
@@ -23,25 +32,24 @@ class PoseBreakdownOperator(bpy.types.Operator):
                 self.report({'WARNING'}, "No bones selected.")
                 return {'CANCELLED'}
             
+            index = FCurveIndex(action)
+
             # Hapus keyframe pada current frame untuk bone yang diseleksi
             for bone in selected_bones:
-                bone_name = bone.name
-                for fcurve in action.fcurves:
-                    if fcurve.data_path.startswith(f'pose.bones["{bone_name}"].'):
-                        for kp in fcurve.keyframe_points:
-                            if kp.co.x == current_frame:
-                                fcurve.keyframe_points.remove(kp)
-                                break  # Keluar setelah menemukan keyframe yang sesuai
+                for prop, array_index, fcurve in index.fcurves(bone.name, custom=False):
+                    hits = (index.keys(fcurve)[:, 0] == current_frame).nonzero()[0]
+                    if len(hits):
+                        fcurve.keyframe_points.remove(fcurve.keyframe_points[int(hits[0])])
+                        index.refresh_keys(fcurve)
             
             # Perbarui tampilan agar perubahan terlihat
             bpy.context.scene.frame_set(current_frame)
             
             # Cari keyframe sebelum dan sesudah
-            keyframes = [kp.co.x for fcurve in action.fcurves for kp in fcurve.keyframe_points]
-            keyframes = sorted(set(keyframes))
+            keyframes = index.all_frames()
 
-            prev_frame = max([k for k in keyframes if k <= current_frame], default=None)
-            next_frame = min([k for k in keyframes if k > current_frame], default=None)
+            prev_frame = max([int(k) for k in keyframes if k <= current_frame], default=None)
+            next_frame = min([int(k) for k in keyframes if k > current_frame], default=None)
 
             if prev_frame is None or next_frame is None:
                 self.report({'WARNING'}, "No valid keyframes found around the current frame.")
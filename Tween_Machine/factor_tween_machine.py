@@ -1,84 +1,61 @@
 import bpy
+import os
+import sys
+
+import numpy as np
+
+# Root folder Raha Tools supaya modul bersama (Core) bisa di-import
+_RAHA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _RAHA_ROOT not in sys.path:
+    sys.path.append(_RAHA_ROOT)
+
+from Core.fcurve_index import FCurveIndex
 
 def apply_pose_breakdowner(context, factor):
     obj = context.object
     if obj and obj.type == 'ARMATURE' and obj.mode == 'POSE':
+        index = FCurveIndex.from_object(obj)
+        if not index:
+            return
+        current_frame = context.scene.frame_current
+
         # Pertama update semua fcurves untuk keyframe yang ada
         for bone in context.selected_pose_bones:
-            action = obj.animation_data.action
-            if action:
-                fcurves = action.fcurves
-                for fcurve in fcurves:
-                    if fcurve.data_path.startswith(f'pose.bones["{bone.name}"]'):
-                        # Cari keyframe sebelumnya dan berikutnya
-                        prev_key, next_key = None, None
-                        for keyframe in fcurve.keyframe_points:
-                            if keyframe.co[0] < context.scene.frame_current:
-                                prev_key = keyframe
-                            elif keyframe.co[0] > context.scene.frame_current:
-                                next_key = keyframe
-                                break
-
-                        if prev_key and next_key:
-                            prev_value = prev_key.co[1]
-                            next_value = next_key.co[1]
-                            
-                            # Hitung nilai baru dengan ekstrapolasi
-                            new_value = prev_value + (next_value - prev_value) * factor
-                            
-                            # Cari keyframe di frame saat ini
-                            existing_key = None
-                            for k in fcurve.keyframe_points:
-                                if k.co[0] == context.scene.frame_current:
-                                    existing_key = k
-                                    break
-                            
-                            # Update atau insert keyframe
-                            if existing_key:
-                                existing_key.co[1] = new_value
-                            else:
-                                fcurve.keyframe_points.insert(
-                                    context.scene.frame_current, 
-                                    new_value, 
-                                    options={'FAST'}
-                                )
-                            fcurve.update()
-        
+            for prop, array_index, fcurve in index.fcurves(bone.name):
+                frames = index.keys(fcurve)[:, 0]
+
+                # Cari keyframe sebelumnya dan berikutnya
+                prev_idx = int(np.searchsorted(frames, current_frame, side='left')) - 1
+                next_idx = int(np.searchsorted(frames, current_frame, side='right'))
+                if prev_idx < 0 or next_idx >= len(frames):
+                    continue
+
+                points = fcurve.keyframe_points
+                prev_value = points[prev_idx].co[1]
+                next_value = points[next_idx].co[1]
+
+                # Hitung nilai baru dengan ekstrapolasi
+                new_value = prev_value + (next_value - prev_value) * factor
+
+                # Update atau insert keyframe
+                if next_idx - prev_idx == 2:
+                    points[prev_idx + 1].co[1] = new_value
+                else:
+                    points.insert(current_frame, new_value, options={'FAST'})
+                    index.refresh_keys(fcurve)
+                fcurve.update()
+
         # Kedua, update nilai pose bone secara langsung
+        bone_paths = [
+            'location', 'rotation_quaternion', 'rotation_euler',
+            'scale', 'rotation_axis_angle'
+        ]
         for bone in context.selected_pose_bones:
-            # Dapatkan nilai property yang ingin diubah
-            bone_paths = [
-                'location', 'rotation_quaternion', 'rotation_euler', 
-                'scale', 'rotation_axis_angle'
-            ]
-            
-            for path in bone_paths:
+            for path, array_index, fcurve in index.fcurves(bone.name, props=bone_paths):
                 try:
-                    # Cari fcurve untuk property ini
-                    data_path = f'pose.bones["{bone.name}"].{path}'
-                    fcurve = None
-                    for fc in obj.animation_data.action.fcurves:
-                        if fc.data_path == data_path:
-                            fcurve = fc
-                            break
-                    
-                    if fcurve:
-                        # Evaluasi nilai di frame saat ini
-                        value = fcurve.evaluate(context.scene.frame_current)
-                        
-                        # Terapkan ke bone
-                        if path == 'location':
-                            bone.location = value
-                        elif path == 'rotation_quaternion':
-                            bone.rotation_quaternion = value
-                        elif path == 'rotation_euler':
-                            bone.rotation_euler = value
-                        elif path == 'scale':
-                            bone.scale = value
-                        elif path == 'rotation_axis_angle':
-                            bone.rotation_axis_angle = value
-                            
-                except:
+                    # Evaluasi nilai di frame saat ini lalu terapkan ke bone
+                    getattr(bone, path)[array_index] = fcurve.evaluate(current_frame)
+                except (AttributeError, IndexError, TypeError):
                     continue
 
 
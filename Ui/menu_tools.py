@@ -8,6 +8,14 @@ import atexit
 import shutil
 import getpass
 import ctypes
+import sys
+
+# Root folder Raha Tools supaya modul bersama (Core) bisa di-import
+_RAHA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _RAHA_ROOT not in sys.path:
+    sys.path.append(_RAHA_ROOT)
+
+from Core import constraint_registry
 
 #============================ Download image ===========================
 # Konstanta dan variabel global
@@ -265,9 +273,9 @@ class RAHA_PT_Tools_For_Animation(bpy.types.Panel):
     preview_collection = None 
     
     def get_parent_child_constraints(self, target):
-        """Ambil constraint Child Of dari object atau pose bone"""
+        """Ambil constraint Child Of dari object atau pose bone (di-cache constraint_registry)"""
         if hasattr(target, "constraints"):
-            return [c for c in target.constraints if c.type == 'CHILD_OF']
+            return constraint_registry.child_of(target)
         return []    
 
     def draw(self, context):
@@ -460,6 +468,8 @@ class RAHA_PT_Tools_For_Animation(bpy.types.Panel):
                     op.constraint_name = c.name
                     op = row.operator("raha_parent.disable", text="Disable", icon="UNLINKED")
                     op.constraint_name = c.name
+                    op = row.operator("raha.space_switch_range", text="", icon="FILE_REFRESH")
+                    op.constraint_name = c.name
 
                     # Row inverse & apply/clear/trash
                     row = box.row(align=False)
@@ -469,6 +479,9 @@ class RAHA_PT_Tools_For_Animation(bpy.types.Panel):
                     op.constraint_name = c.name
                     op = row.operator("raha.apply_constraint_single", text="", icon="CHECKMARK")
                     op.constraint_name = c.name
+                    op = row.operator("raha.apply_constraint_single", text="", icon="RENDER_ANIMATION")
+                    op.constraint_name = c.name
+                    op.mode = 'RANGE'
                     op = row.operator("raha.clear_constraint_keys", text="", icon="KEYTYPE_GENERATED_VEC")
                     op.constraint_name = c.name
                     op = row.operator("raha.delete_constraint_single", text="", icon="TRASH")
@@ -564,6 +577,11 @@ class RAHA_PT_Tools_For_Animation(bpy.types.Panel):
             # Section 1: Fake Constraints
 
             box.label(text="Fake Constraints & StepSnap :")
+            if hasattr(scene, "raha_matrix_slots"):
+                box.prop(scene, "raha_matrix_slot_name", text="Slot")
+                row = box.row()
+                row.template_list("RAHA_UL_matrix_slots", "", scene, "raha_matrix_slots", scene, "raha_matrix_slot_index", rows=3)
+                row.operator("pose.raha_remove_matrix_slot", text="", icon='X')
             row = box.row(align=True)
             row.operator("pose.raha_save_bone_matrix", text="Save", icon="COPYDOWN")
             row.operator("pose.raha_apply_bone_matrix", text="Paste", icon="PASTEDOWN")
@@ -779,6 +797,7 @@ class FLOATING_OT_open_playblast(bpy.types.Operator):
     
 #============================================== Register ========================================    
 def register():
+    constraint_registry.register()
     
     global preview_collections
     bpy.types.Scene.show_tween_machine = bpy.props.BoolProperty(
@@ -876,6 +895,7 @@ def register():
 
 
 def unregister():
+    constraint_registry.unregister()
   
     
     bpy.utils.unregister_class(RAHA_OT_InfoPopup)
@@ -0,0 +1,134 @@
+"""
+Test store content-addressed Studio Library (Library/content_store).
+
+content_store tidak bergantung pada bpy, jadi semua test memakai folder
+library sementara sungguhan.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Library import content_store  # noqa: E402
+
+
+class ContentStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+
+    def tearDown(self):
+        content_store._manifests.pop(self.root, None)
+        self._tmp.cleanup()
+
+    def _stage(self, name, ext, data):
+        path = content_store.staging_path(self.root, name, ext)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def _exists(self, rel_path):
+        return os.path.exists(os.path.join(self.root, rel_path))
+
+    def _manifest_text(self):
+        with open(os.path.join(self.root, content_store.MANIFEST_NAME)) as f:
+            return f.read()
+
+    def _write_manifest(self, text):
+        with open(os.path.join(self.root, content_store.MANIFEST_NAME), "w") as f:
+            f.write(text)
+
+    def test_add_dedupes_identical_data(self):
+        walk = content_store.add(self.root, "walk", data=self._stage("walk", ".rclip", b"keys"),
+                                 info={"armature": "RigA"})
+        run = content_store.add(self.root, "run", data=self._stage("run", ".rclip", b"keys"),
+                                info={"armature": "RigB"})
+        self.assertEqual(walk["data"], run["data"])
+        self.assertTrue(self._exists(walk["data"]))
+        self.assertEqual(content_store.get(self.root, "walk")["info"], {"armature": "RigA"})
+        self.assertNotEqual(walk["id"], run["id"])
+        # File staging sudah dipindah / dibuang
+        self.assertEqual(os.listdir(os.path.join(self.root, content_store.STORE_DIR, content_store.STAGING_DIR)), [])
+
+    def test_overwrite_collects_unreferenced_blob(self):
+        old = content_store.add(self.root, "walk", data=self._stage("walk", ".rclip", b"v1"))
+        new = content_store.add(self.root, "walk", data=self._stage("walk", ".rclip", b"v2"))
+        self.assertFalse(self._exists(old["data"]))
+        self.assertTrue(self._exists(new["data"]))
+
+    def test_rename(self):
+        record = content_store.add(self.root, "walk", data=self._stage("walk", ".rclip", b"keys"))
+        content_store.add(self.root, "run", data=self._stage("run", ".rclip", b"other"))
+        self.assertFalse(content_store.rename(self.root, "walk", "run"))
+        self.assertFalse(content_store.rename(self.root, "missing", "jog"))
+        self.assertTrue(content_store.rename(self.root, "walk", "jog"))
+        self.assertIsNone(content_store.get(self.root, "walk"))
+        self.assertEqual(content_store.get(self.root, "jog"), record)
+
+    def test_delete_keeps_shared_blobs(self):
+        walk = content_store.add(self.root, "walk", data=self._stage("walk", ".rclip", b"keys"),
+                                 image=self._stage("walk", ".png", b"walk image"))
+        content_store.add(self.root, "run", data=self._stage("run", ".rclip", b"keys"))
+        removed = content_store.delete(self.root, "walk")
+        self.assertEqual(removed, [walk["image"]])
+        self.assertTrue(self._exists(walk["data"]))
+        self.assertFalse(self._exists(walk["image"]))
+        self.assertEqual(content_store.delete(self.root, "run"), [walk["data"]])
+        self.assertFalse(self._exists(walk["data"]))
+        self.assertIsNone(content_store.delete(self.root, "run"))
+
+    def test_missing_manifest_is_empty(self):
+        self.assertEqual(content_store.load_manifest(self.root), {})
+        self.assertIsNone(content_store.delete(self.root, "walk"))
+
+    def _assert_manifest_kept(self, text):
+        self._write_manifest(text)
+        staged = self._stage("walk", ".rclip", b"keys")
+        # Tampilan tetap jalan (kosong), tapi tidak ada penulisan
+        self.assertEqual(content_store.load_manifest(self.root), {})
+        with self.assertRaises(content_store.ManifestError):
+            content_store.add(self.root, "walk", data=staged)
+        with self.assertRaises(content_store.ManifestError):
+            content_store.rename(self.root, "walk", "run")
+        with self.assertRaises(content_store.ManifestError):
+            content_store.delete(self.root, "walk")
+        self.assertFalse(os.path.exists(staged))
+        self.assertEqual(self._manifest_text(), text)
+
+    def test_corrupt_manifest_is_not_overwritten(self):
+        content_store.add(self.root, "walk", data=self._stage("walk", ".rclip", b"keys"))
+        # Tulisan setengah jadi dari mesin lain di library share
+        self._assert_manifest_kept(self._manifest_text()[:20])
+
+    def test_unknown_version_is_not_overwritten(self):
+        self._assert_manifest_kept(json.dumps({"version": content_store.MANIFEST_VERSION + 1,
+                                               "entries": {"walk": {"data": ".store/ab/ab.rclip"}}}))
+
+    def test_preview_follows_rename(self):
+        record = content_store.add(self.root, "walk", data=self._stage("walk", ".rclip", b"keys"))
+        on_finish = content_store.preview_ingest(self.root, record["id"], self._stage("walk", ".mp4", b"video"),
+                                                 self._stage("walk", ".png", b"image"))
+        content_store.rename(self.root, "walk", "jog")
+        on_finish(types.SimpleNamespace(status='DONE'))
+        self.assertEqual(list(content_store.load_manifest(self.root)), ["jog"])
+        jog = content_store.get(self.root, "jog")
+        self.assertTrue(self._exists(jog["video"]))
+        self.assertTrue(self._exists(jog["image"]))
+
+    def test_preview_of_deleted_entry_is_discarded(self):
+        record = content_store.add(self.root, "walk", data=self._stage("walk", ".rclip", b"keys"))
+        video = self._stage("walk", ".mp4", b"video")
+        on_finish = content_store.preview_ingest(self.root, record["id"], video, None)
+        content_store.delete(self.root, "walk")
+        on_finish(types.SimpleNamespace(status='DONE'))
+        self.assertEqual(content_store.load_manifest(self.root), {})
+        self.assertFalse(os.path.exists(video))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Test reduksi key (Core/key_reduction) tanpa Blender.
+
+Kalau bpy tidak tersedia (di luar Blender), modul bpy diganti stub minimal
+dan F-Curve memakai objek palsu yang cukup untuk fcurve_writer.
+"""
+
+import os
+import sys
+import types
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import bpy  # noqa: F401
+except ImportError:
+    bpy = types.ModuleType("bpy")
+    bpy.app = types.SimpleNamespace(handlers=types.SimpleNamespace(
+        persistent=lambda f: f, depsgraph_update_post=[], load_post=[]))
+    bpy.context = types.SimpleNamespace(preferences=types.SimpleNamespace(edit=types.SimpleNamespace(
+        keyframe_new_interpolation_type='BEZIER', keyframe_new_handle_type='AUTO_CLAMPED')))
+    sys.modules["bpy"] = bpy
+
+from Core import key_reduction  # noqa: E402
+from Core.fcurve_index import FCurveIndex  # noqa: E402
+
+
+class _Point:
+    def __init__(self):
+        self.co = [0.0, 0.0]
+        self.handle_left = [0.0, 0.0]
+        self.handle_right = [0.0, 0.0]
+        self.interpolation = 'BEZIER'
+        self.handle_left_type = 'AUTO_CLAMPED'
+        self.handle_right_type = 'AUTO_CLAMPED'
+
+
+class _Points(list):
+    def add(self, count):
+        self.extend(_Point() for _ in range(count))
+
+    def remove(self, point, fast=False):
+        list.remove(self, point)
+
+    def foreach_get(self, attr, buf):
+        if attr not in ("co", "handle_left", "handle_right"):
+            raise TypeError(attr)
+        buf[:] = np.array([getattr(p, attr) for p in self], dtype=np.float32).ravel()
+
+    def foreach_set(self, attr, buf):
+        if attr not in ("co", "handle_left", "handle_right"):
+            raise TypeError(attr)
+        for point, value in zip(self, np.asarray(buf).reshape(-1, 2)):
+            setattr(point, attr, [float(v) for v in value])
+
+
+class _FCurve:
+    def __init__(self, data_path, array_index, keys):
+        self.data_path = data_path
+        self.array_index = array_index
+        self.keyframe_points = _Points()
+        self.keyframe_points.add(len(keys))
+        for point, key in zip(self.keyframe_points, keys):
+            point.co = [float(key[0]), float(key[1])]
+
+    def update(self):
+        pass
+
+
+def _object(fcurves):
+    action = types.SimpleNamespace(fcurves=fcurves)
+    return types.SimpleNamespace(name="Rig", animation_data=types.SimpleNamespace(action=action))
+
+
+class ReduceBoneTest(unittest.TestCase):
+    def test_keep_frames_from_bone_frames(self):
+        # Key "asli" di frame 1, 5, 10 lalu hasil bake garis lurus di setiap frame
+        frames = np.arange(1, 11)
+        fcurves = [_FCurve('pose.bones["hand"].location', i, np.column_stack((frames, frames * (i + 1))))
+                   for i in range(3)]
+        obj = _object(fcurves)
+        keep = FCurveIndex.from_object(_object([_FCurve('pose.bones["hand"].location', 0,
+                                                        [(1, 0), (5, 0), (10, 0)])])).bone_frames("hand")
+        self.assertIsInstance(keep, np.ndarray)
+
+        removed = key_reduction.reduce_bone(obj, "hand", 1, 10, 1e-4, keep_frames=keep)
+
+        self.assertEqual(removed, 7 * 3)
+        for fcurve in fcurves:
+            self.assertEqual([p.co[0] for p in fcurve.keyframe_points], [1.0, 5.0, 10.0])
+            # Toleransi diukur terhadap garis lurus, jadi key yang tersisa harus LINEAR
+            self.assertEqual({p.interpolation for p in fcurve.keyframe_points}, {'LINEAR'})
+
+    def test_props_limit_reduced_channels(self):
+        frames = np.arange(1, 11)
+        baked = _FCurve('pose.bones["hand"].location', 0, np.column_stack((frames, frames)))
+        authored = _FCurve('pose.bones["hand"]["ik_fk"]', 0, np.column_stack((frames, frames)))
+        removed = key_reduction.reduce_bone(_object([baked, authored]), "hand", 1, 10, 1e-4, props=["location"])
+        self.assertEqual(removed, 8)
+        self.assertEqual(len(authored.keyframe_points), 10)
+
+    def test_keep_frames_none(self):
+        frames = np.arange(1, 11)
+        fcurves = [_FCurve('pose.bones["hand"].location', 0, np.column_stack((frames, frames)))]
+        removed = key_reduction.reduce_bone(_object(fcurves), "hand", 1, 10, 1e-4)
+        self.assertEqual(removed, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()